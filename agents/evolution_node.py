@@ -260,7 +260,7 @@ class EvolutionNode:
         
         # 2. 임시 파일 쓰기 및 재인덱싱
         write_file(target_file, new_code)
-        indexer.scan_project()
+        indexer.update([target_file])
         after_stats = indexer.calculate_health_score()
         
         # 3. 점수 비교
@@ -269,7 +269,7 @@ class EvolutionNode:
         if not improved:
             logger.warning(f"📉 Simulation rejected: Health score would drop from {before_stats['score']} to {after_stats['score']}")
             write_file(target_file, original_code) # 원복
-            indexer.scan_project() # 인덱스 복구
+            indexer.update([target_file]) # 인덱스 복구
         else:
             logger.info(f"📈 Simulation passed: Health score {before_stats['score']} -> {after_stats['score']}")
             
@@ -140,8 +140,7 @@ class SwarmAgent:
             }))
 
         # 병렬 호출 실행
-        loop = asyncio.get_running_loop()
-        raw_results = await loop.run_in_executor(None, mq_bus.call_remote_nodes_parallel, requests)
+        raw_results = await mq_bus.call_remote_nodes_parallel_async(requests)
         
         responses = []
         for i, res in enumerate(raw_results):
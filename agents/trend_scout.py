@@ -181,16 +181,19 @@ class TrendScoutAgent:
                 self.radar_data["patterns"] = patterns
                 self._save_radar()
                 
-                # [Knowledge Base Integration] 최신 트렌드를 장기 기억 저장소에 통합
+                # [Knowledge Base Integration] 최신 트렌드를 장기 기억 저장소에 통합 (배치 임베딩)
+                knowledge_texts, knowledge_meta = [], []
                 for m in models:
                     if isinstance(m, dict) and "name" in m:
-                        knowledge_text = f"최신 모델 정보: {m.get('name')}는 {m.get('status')} 상태이며, 특징은 다음과 같다: {m.get('note')}"
-                        self.ltm.memorize(knowledge_text, {"source": "TrendScout", "type": "model", "topic": m.get('name')})
+                        knowledge_texts.append(f"최신 모델 정보: {m.get('name')}는 {m.get('status')} 상태이며, 특징은 다음과 같다: {m.get('note')}")
+                        knowledge_meta.append({"source": "TrendScout", "type": "model", "topic": m.get('name')})
                 
                 for p in patterns:
                     if isinstance(p, dict) and "topic" in p:
-                        knowledge_text = f"신규 에이전트 패턴: {p.get('topic')} - {p.get('summary')}"
-                        self.ltm.memorize(knowledge_text, {"source": "TrendScout", "type": "pattern", "topic": p.get('topic')})
+                        knowledge_texts.append(f"신규 에이전트 패턴: {p.get('topic')} - {p.get('summary')}")
+                        knowledge_meta.append({"source": "TrendScout", "type": "pattern", "topic": p.get('topic')})
+                if knowledge_texts:
+                    self.ltm.memorize_many(knowledge_texts, knowledge_meta)
 
                 # 알림용 요약 메시지 생성
                 notifications = []
@@ -18,6 +18,43 @@ class Settings(BaseSettings):
     
     LLM_BACKEND: str = "hybrid" # gemini, ollama, openai, hybrid
     GORTEX_ENV: str = "local" # local, distributed
+    REDIS_URL: str = "redis://localhost:6379/0"
+
+    MQ_PUBLISH_WINDOW: float = 0.005 # Redis 이벤트 발행 버퍼링 구간 (초, 0이면 즉시 발행)
+    MQ_PUBLISH_BATCH_SIZE: int = 256 # 버퍼에 이 수 이상 쌓이면 즉시 파이프라인 발행
+    MQ_RPC_CLAIM_IDLE: float = 60.0 # 이 시간(초) 이상 응답 없는 원격 노드 요청은 다른 워커가 회수
+    MQ_RPC_MAX_DELIVERIES: int = 3 # 최대 재전달 횟수 (초과 시 실패 처리)
+    MQ_RPC_RESULT_TTL: int = 3600 # 요청별 결과 키 보존 시간 (초)
+    MQ_RPC_STREAM_MAXLEN: int = 10000 # 요청 스트림 대략적 최대 길이
+    MQ_QUEUE_MAXSIZE: int = 10000 # 작업 큐별 최대 대기 작업 수 (초과 시 enqueue 대기/거절)
+    MQ_LOCAL_WORKERS: int = 0 # 로컬 모드에서 원격 노드 호출을 처리할 프로세스 내 워커 수 (0이면 비활성)
+    MQ_WORKER_HEARTBEAT: float = 10.0 # 워커 하트비트 주기 (초)
+    MQ_WORKER_TTL: float = 30.0 # 이 시간(초) 동안 하트비트가 없는 워커는 레지스트리에서 제거 (하트비트 주기의 3배 이상 권장)
+    MQ_AFFINITY_ROUTING: bool = True # 같은 스레드의 원격 노드 요청을 일관 해싱으로 같은 워커에 배정
+    MQ_WORKER_MAX_ACTIVE: int = 2 # 워커가 이 수 이상 작업 중이면 포화로 보고 다음 워커로 넘김
+    MQ_WORKER_MAX_CPU: float = 90.0 # 워커 CPU 사용률(%)이 이 이상이면 포화로 간주
+    MQ_STATE_DELTA: bool = True # 원격 노드 요청 시 상태를 기준 스냅샷 + 변경분으로 전송
+    MQ_STATE_CACHE_SIZE: int = 64 # 마스터/워커가 기억하는 기준 스냅샷 수
+    MQ_STATE_TTL: int = 3600 # Redis에 저장되는 기준 스냅샷 보존 시간 (초)
+    MQ_CODEC: str = "json" # 버스 페이로드 직렬화 방식 (json, msgpack: msgpack 패키지 필요)
+    MQ_COMPRESSION: str = "none" # 큰 페이로드 압축 방식 (none, zstd: zstandard 패키지, lz4: lz4 패키지 필요)
+    MQ_COMPRESS_THRESHOLD: int = 32768 # 이 크기(바이트) 이상의 페이로드만 압축
+
+    LTM_ANN_THRESHOLD: int = 20000 # 이 크기 이상의 LTM 샤드는 IVF 근사 검색 사용
+    LTM_ANN_NPROBE: int = 8 # IVF 탐색 리스트 수 (클수록 재현율↑, 지연↑)
+    LTM_EMBED_CACHE_SIZE: int = 4096 # 임베딩 LRU 캐시 최대 항목 수
+    LTM_EMBED_BATCH_SIZE: int = 100 # 임베딩 API 배치 요청 크기
+    LTM_FLUSH_INTERVAL: float = 5.0 # 사용 횟수 갱신 지연 기록 주기 (초)
+    LTM_FLUSH_THRESHOLD: int = 64 # 이 수 이상 갱신이 쌓이면 즉시 기록
+
+    STORAGE_SWEEP_INTERVAL: float = 60.0 # SQLite 만료 키 정리 주기 (초, 0이면 읽을 때만 만료 처리)
+    STORAGE_SWEEP_BATCH: int = 500 # 만료 키 정리 시 트랜잭션당 삭제할 최대 행 수
+    STORAGE_VACUUM_PAGES: int = 0 # 정리 후 incremental VACUUM으로 반환할 최대 페이지 수 (0이면 비활성)
+    STORAGE_CACHE_SIZE: int = 1024 # 샤드/LTM 항목을 담는 프로세스 내 LRU 캐시 크기 (0이면 비활성)
+    STORAGE_CACHE_TTL: float = 30.0 # 캐시 항목 최대 보존 시간 (초, 무효화 이벤트 유실 대비)
+
+    INDEXER_PARALLEL_THRESHOLD: int = 200 # 재파싱 파일이 이 수 이상이면 프로세스 풀로 파싱
+    INDEXER_WORKERS: int = 0 # 인덱서 파싱 프로세스 수 (0이면 CPU 코어 수)
 
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", extra="ignore")
 
@@ -0,0 +1,116 @@
+import base64
+import json
+import logging
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None
+
+from gortex.config.settings import settings
+
+logger = logging.getLogger("GortexCodec")
+
+# Framed payloads look like "gx2:<codec>:<compression>:<base64 body>".
+# Unframed text is plain JSON, which keeps the JSON codec readable in redis-cli and
+# lets any reader decode payloads written before codecs existed. base64 is C-backed;
+# "gx1:" frames (pure-Python base85, several times slower) are still decoded.
+_HEADER_PREFIX = "gx2:"
+_LEGACY_HEADERS = {"gx1:": base64.b85decode}
+
+
+def _json_dumps(obj: Any) -> bytes:
+    return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+
+def _json_loads(data: bytes) -> Any:
+    return json.loads(data)
+
+
+def _serializers() -> Dict[str, Tuple[Callable[[Any], bytes], Callable[[bytes], Any]]]:
+    table = {"json": (_json_dumps, _json_loads)}
+    if msgpack is not None:
+        table["msgpack"] = (lambda obj: msgpack.packb(obj, use_bin_type=True),
+                            lambda data: msgpack.unpackb(data, raw=False, strict_map_key=False))
+    return table
+
+
+def _compressors() -> Dict[str, Tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]]:
+    table = {"none": (bytes, bytes)}
+    if zstandard is not None:
+        table["zstd"] = (zstandard.ZstdCompressor(level=3).compress, zstandard.ZstdDecompressor().decompress)
+    if lz4_frame is not None:
+        table["lz4"] = (lz4_frame.compress, lz4_frame.decompress)
+    return table
+
+
+class MessageCodec:
+    """
+    Encodes bus payloads (events, queued tasks, remote node requests and results) to text.
+    The serializer and compressor are chosen by the writer and recorded in the frame
+    header, so readers decode whatever they receive regardless of their own settings.
+    """
+    def __init__(self, codec: str = "json", compression: str = "none", compress_threshold: int = 32768):
+        self._serializers = _serializers()
+        self._compressors = _compressors()
+        if codec not in self._serializers:
+            logger.warning(f"Codec '{codec}' unavailable (missing package?). Falling back to json.")
+            codec = "json"
+        compression = compression or "none"
+        if compression not in self._compressors:
+            logger.warning(f"Compression '{compression}' unavailable (missing package?). Sending uncompressed.")
+            compression = "none"
+        self.codec = codec
+        self.compression = compression
+        self.compress_threshold = compress_threshold
+
+    @classmethod
+    def from_settings(cls) -> "MessageCodec":
+        return cls(settings.MQ_CODEC, settings.MQ_COMPRESSION, settings.MQ_COMPRESS_THRESHOLD)
+
+    def encode(self, obj: Any) -> str:
+        body = self._serializers[self.codec][0](obj)
+        compression = "none"
+        if self.compression != "none" and len(body) >= self.compress_threshold:
+            body = self._compressors[self.compression][0](body)
+            compression = self.compression
+        if self.codec == "json" and compression == "none":
+            return body.decode("utf-8")
+        return f"{_HEADER_PREFIX}{self.codec}:{compression}:{base64.b64encode(body).decode('ascii')}"
+
+    def decode(self, data: Union[str, bytes]) -> Any:
+        if isinstance(data, bytes):
+            data = data.decode("utf-8")
+        header = data[:len(_HEADER_PREFIX)]
+        if header == _HEADER_PREFIX:
+            b2a = base64.b64decode
+        elif header in _LEGACY_HEADERS:
+            b2a = _LEGACY_HEADERS[header]
+        else:
+            return json.loads(data)
+        codec, compression, body = data[len(header):].split(":", 2)
+        if codec not in self._serializers or compression not in self._compressors:
+            raise ValueError(f"Cannot decode '{codec}/{compression}' payload: codec package not installed")
+        raw = self._compressors[compression][1](b2a(body))
+        return self._serializers[codec][1](raw)
+
+
+_default_codec: Optional[MessageCodec] = None
+
+
+def get_codec() -> MessageCodec:
+    global _default_codec
+    if _default_codec is None:
+        _default_codec = MessageCodec.from_settings()
+    return _default_codec
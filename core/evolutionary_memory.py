@@ -79,21 +79,35 @@ class EvolutionaryMemory:
             except Exception as e:
                 logger.error(f"Migration failed: {e}")
 
-        for cat in ["coding", "research", "design", "general"]:
-            self.shards[cat] = self._load_shard(cat)
+        self.shards.update(self._load_shards(["coding", "research", "design", "general"]))
 
     def _load_shard(self, category: str) -> List[Dict[str, Any]]:
+        return self._load_shards([category])[category]
+
+    def _load_shards(self, categories: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """여러 샤드를 Storage에서 한 번의 mget으로 로드 (없는 샤드는 레거시 파일에서)"""
         # Storage Provider Abstraction (Redis or Local/SQLite)
         from gortex.core.mq import mq_bus
-        key = f"gortex:memory:shard:{category}"
+        keys = [f"gortex:memory:shard:{category}" for category in categories]
+        values = [None] * len(categories)
         try:
-            data_str = mq_bus.storage.get(key)
-            if data_str:
-                logger.debug(f"Loaded '{category}' shard from Storage.")
-                return json.loads(data_str)
+            values = mq_bus.storage.mget(keys)
         except Exception as e:
-            logger.warning(f"Failed to load shard from Storage: {e}")
-        
+            logger.warning(f"Failed to load shards from Storage: {e}")
+
+        shards = {}
+        for category, data_str in zip(categories, values):
+            if data_str:
+                try:
+                    shards[category] = json.loads(data_str)
+                    logger.debug(f"Loaded '{category}' shard from Storage.")
+                    continue
+                except Exception as e:
+                    logger.warning(f"Failed to load shard from Storage: {e}")
+            shards[category] = self._load_legacy_shard(category)
+        return shards
+
+    def _load_legacy_shard(self, category: str) -> List[Dict[str, Any]]:
         # Legacy File Fallback (Migration support only, prioritized Storage)
         path = os.path.join(self.base_dir, f"{category}_shard.json")
         if os.path.exists(path):
@@ -186,9 +200,10 @@ class EvolutionaryMemory:
         search_cats = {target_cat, "general"}
         
         matching_rules = []
+        # 실시간 동기화: 항상 Storage에서 최신 샤드를 읽어옴 (변경되지 않은 샤드는 CachedStorage가 메모리에서 반환)
+        latest = self._load_shards(sorted(search_cats))
         for cat in search_cats:
-            # 실시간 동기화: 항상 디스크에서 최신 샤드를 읽어옴
-            shard = self._load_shard(cat)
+            shard = latest[cat]
             self.shards[cat] = shard
             
             for rule in shard:
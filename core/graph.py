@@ -114,7 +114,7 @@ async def run_remote_node(node_name: str, state: GortexState) -> Dict[str, Any]:
     from gortex.core.mq import mq_bus
     
     # 1. 지능형 자원 경매 시작 (v5.3 New)
-    target_worker = mq_bus.auction_task(node_name, dict(state))
+    target_worker = await mq_bus.auction_task_async(node_name, dict(state))
     
     if not target_worker:
         logger.warning(f"⚠️ No suitable bidders for '{node_name}'. Falling back to local execution.")
@@ -124,7 +124,7 @@ async def run_remote_node(node_name: str, state: GortexState) -> Dict[str, Any]:
     logger.info(f"🌐 [NeuralAuction] Node '{node_name}' assigned to winner: {target_worker}")
     
     # 2. 원격 호출 (RPC)
-    result = mq_bus.call_remote_node(node_name, dict(state))
+    result = await mq_bus.call_remote_node_async(node_name, dict(state))
     
     if result:
         return result
@@ -194,9 +194,8 @@ async def hydra_node(state: GortexState) -> Dict[str, Any]:
         # 병렬 실행을 위해 MQ 요청 리스트 생성
         requests.append(("coder", sub_state))
 
-    # 병렬 호출 실행
-    loop = asyncio.get_running_loop()
-    results = await loop.run_in_executor(None, mq_bus.call_remote_nodes_parallel, requests)
+    # 병렬 호출 실행 (결과 도착 시점에 바로 깨어남)
+    results = await mq_bus.call_remote_nodes_parallel_async(requests)
     
     # 결과 집계 (신뢰도 기반 가중 병합)
     from gortex.utils.economy import get_economy_manager
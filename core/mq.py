@@ -1,31 +1,346 @@
+import asyncio
+import atexit
+import concurrent.futures
+import heapq
+import itertools
 import json
 import logging
 import os
+import threading
 import uuid
 import time
-from typing import Any, Dict, Optional, Callable, List, Tuple
+import weakref
+from collections import OrderedDict
+from typing import Any, Awaitable, Dict, Optional, Callable, List, Set, Tuple
 from abc import ABC, abstractmethod
 
 # gortex.core.storage imports will be resolved later to avoid circular imports if needed,
 # or assumed to be available. For now, we will import them.
-from gortex.core.storage import StorageProvider, SqliteStorage, RedisStorage, MockStorage
+from gortex.core.storage import StorageProvider, SqliteStorage, RedisStorage, MockStorage, CachedStorage
+from gortex.core.codec import MessageCodec, get_codec
+from gortex.core.routing import ConsistentHashRing
+from gortex.core.state_delta import (SnapshotCache, apply_delta, delta_size, diff_snapshots, restore_state,
+                                     snapshot_size, snapshot_state, state_version)
 from gortex.config.settings import settings
 
 try:
     import redis
+    import redis.asyncio as aioredis
 except ImportError:
     redis = None
+    aioredis = None
 
 logger = logging.getLogger("GortexMQ")
 
+_CLOSED = object()
+_STOP_WORKER = object() # queued once per in-process worker by LocalMessageBus.shutdown()
+
+
+class Subscription:
+    """
+    Async iterator over messages published to one or more channels.
+    Each yielded message is the published event dict plus the originating "channel".
+    Bound to the event loop it was created on; messages may be pushed from any thread.
+
+        async with mq_bus.subscribe("gortex:notifications", "gortex:thought_stream") as sub:
+            async for msg in sub:
+                ...
+    """
+    def __init__(self, channels: Tuple[str, ...], loop: asyncio.AbstractEventLoop,
+                 on_close: Callable[["Subscription"], Awaitable[None]], ready: Optional[Awaitable] = None):
+        self.channels = tuple(channels)
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.ready = ready
+        self.closed = False
+        self._on_close = on_close
+
+    def push(self, channel: str, message: Dict[str, Any]):
+        """Deliver a message (thread-safe)."""
+        if self.closed:
+            return
+        item = {**message, "channel": channel}
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self.loop:
+            self.queue.put_nowait(item)
+            return
+        try:
+            self.loop.call_soon_threadsafe(self.queue.put_nowait, item)
+        except RuntimeError:
+            self.closed = True # owning loop is gone
+
+    async def wait_ready(self):
+        """Wait until the underlying transport is actually subscribed."""
+        if self.ready is not None:
+            ready, self.ready = self.ready, None
+            await ready
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> Dict[str, Any]:
+        await self.wait_ready()
+        if self.closed and self.queue.empty():
+            raise StopAsyncIteration
+        item = await self.queue.get()
+        if item is _CLOSED:
+            raise StopAsyncIteration
+        return item
+
+    async def aclose(self):
+        if self.closed:
+            return
+        self.closed = True
+        self.queue.put_nowait(_CLOSED) # wake a pending __anext__
+        await self._on_close(self)
+
+    async def __aenter__(self):
+        try:
+            await self.wait_ready()
+        except BaseException:
+            try:
+                await self.aclose() # drop the routes so a retry subscribes again
+            except Exception:
+                pass
+            raise
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+
+class Listener:
+    """Handle returned by add_listener; close() stops delivery to the callback."""
+    def __init__(self, close: Callable[[], Any], ready: Optional[concurrent.futures.Future] = None):
+        self._close = close
+        self.closed = False
+        self.ready = ready # resolved once the transport is subscribed (None: immediately)
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self._close()
+
+
+class _ListenerLoop:
+    """
+    Background event loop serving a bus's synchronous listeners (add_listener) through
+    subscribe(), so every listener shares one thread and the loop's single pubsub connection.
+    """
+    def __init__(self, bus: "BaseMessageBus"):
+        self.bus = bus
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name="mq-listeners", daemon=True)
+        self.thread.start()
+
+    def add(self, channels: Tuple[str, ...], callback: Callable[[Dict[str, Any]], None]) -> Listener:
+        ready = concurrent.futures.Future()
+        task = asyncio.run_coroutine_threadsafe(self._serve(channels, callback, ready), self.loop)
+        return Listener(task.cancel, ready)
+
+    async def _serve(self, channels: Tuple[str, ...], callback: Callable[[Dict[str, Any]], None], ready: concurrent.futures.Future):
+        backoff = 1.0
+        try:
+            while True:
+                try:
+                    async with self.bus.subscribe(*channels) as sub:
+                        if not ready.done():
+                            ready.set_result(None)
+                        backoff = 1.0
+                        async for msg in sub:
+                            try:
+                                callback(msg)
+                            except Exception as e:
+                                logger.error(f"Listener on {msg.get('channel')} failed: {e}")
+                        return
+                except Exception as e:
+                    logger.warning(f"Listener on {', '.join(channels)} failed: {e}. Retrying in {backoff:.0f}s")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30.0)
+        finally:
+            if not ready.done():
+                ready.cancel()
+
+    def stop(self, timeout: float = 5.0):
+        """Cancel every listener (unsubscribing them) and stop the loop thread."""
+        async def cancel_all():
+            tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        if not self.thread.is_alive() or threading.current_thread() is self.thread:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(cancel_all(), self.loop).result(timeout)
+        except Exception as e:
+            logger.debug(f"Listener shutdown incomplete: {e!r}")
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout)
+
+
+class _TaskQueue:
+    """
+    Bounded in-process priority queue (higher priority first, FIFO within a priority).
+    Blocking get/put for threads, plus get_async for event loops; async waiters are only
+    woken up and retake the lock, so cancelling one never loses a task.
+    """
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._heap: List[Tuple[int, int, Dict[str, Any]]] = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._async_waiters: Set[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = set()
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def put(self, item: Dict[str, Any], priority: int = 0, timeout: Optional[float] = 0) -> bool:
+        with self._cond:
+            if not self._cond.wait_for(lambda: len(self._heap) < self.maxsize, timeout):
+                return False
+            heapq.heappush(self._heap, (-priority, next(self._seq), item))
+            self._cond.notify_all()
+            waiters, self._async_waiters = self._async_waiters, set()
+        for loop, fut in waiters:
+            try:
+                loop.call_soon_threadsafe(_resolve_waiter, fut)
+            except RuntimeError:
+                pass # owning loop is gone
+        return True
+
+    def _pop(self) -> Dict[str, Any]:
+        item = heapq.heappop(self._heap)[2]
+        self._cond.notify_all()
+        return item
+
+    def get(self, timeout: Optional[float] = 0) -> Optional[Dict[str, Any]]:
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._heap, timeout):
+                return None
+            return self._pop()
+
+    async def get_async(self, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        while True:
+            with self._cond:
+                if self._heap:
+                    return self._pop()
+                waiter = (loop, loop.create_future())
+                self._async_waiters.add(waiter)
+            remaining = None if deadline is None else deadline - loop.time()
+            try:
+                if remaining is not None and remaining <= 0:
+                    return None
+                await asyncio.wait_for(waiter[1], remaining)
+            except asyncio.TimeoutError:
+                return None
+            finally:
+                with self._cond:
+                    self._async_waiters.discard(waiter)
+
+
+def _resolve_waiter(fut: asyncio.Future):
+    if not fut.done():
+        fut.set_result(None)
+
+
+def _cached_storage(storage: StorageProvider, bus: "BaseMessageBus") -> StorageProvider:
+    """Puts the in-process LRU in front of a bus's storage, invalidated by the bus's memory events."""
+    if settings.STORAGE_CACHE_SIZE <= 0:
+        return storage
+    cached = CachedStorage(storage, settings.STORAGE_CACHE_SIZE, settings.STORAGE_CACHE_TTL)
+    cached.bind(bus)
+    return cached
+
+
+def _local_node_map() -> Dict[str, Callable]:
+    """Nodes that can be executed as remote calls (imported lazily: agents import this module)."""
+    from gortex.agents.manager import manager_node
+    from gortex.agents.planner import planner_node
+    from gortex.agents.coder import coder_node
+    from gortex.agents.analyst import analyst_node
+    return {"manager": manager_node, "planner": planner_node, "coder": coder_node, "analyst": analyst_node}
+
+
+class _RedisPubSubHub:
+    """
+    One asyncio pubsub connection per event loop, multiplexing every Subscription on that loop.
+    A single reader task routes incoming messages to subscriptions by channel.
+    """
+    def __init__(self, url: str):
+        self.client = aioredis.from_url(url, decode_responses=True)
+        self.pubsub = self.client.pubsub()
+        self.routes: Dict[str, Set[Subscription]] = {}
+        self._reader: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    def subscribe(self, channels: Tuple[str, ...]) -> Subscription:
+        new_channels = [c for c in dict.fromkeys(channels) if c not in self.routes]
+        sub = Subscription(channels, asyncio.get_running_loop(), self._unsubscribe)
+        for channel in sub.channels:
+            self.routes.setdefault(channel, set()).add(sub)
+        sub.ready = asyncio.ensure_future(self._subscribe(new_channels))
+        return sub
+
+    async def _subscribe(self, channels: List[str]):
+        async with self._lock:
+            if channels:
+                await self.pubsub.subscribe(*channels)
+            if self._reader is None or self._reader.done():
+                self._reader = asyncio.create_task(self._read())
+
+    async def _unsubscribe(self, sub: Subscription):
+        gone = []
+        for channel in sub.channels:
+            subs = self.routes.get(channel)
+            if subs is not None:
+                subs.discard(sub)
+                if not subs:
+                    del self.routes[channel]
+                    gone.append(channel)
+        if gone:
+            async with self._lock:
+                await self.pubsub.unsubscribe(*gone)
+
+    async def _read(self):
+        while self.routes:
+            try:
+                msg = await self.pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+            except Exception as e:
+                logger.error(f"Redis pubsub read failed: {e}")
+                await asyncio.sleep(1.0)
+                continue
+            if not msg or msg.get("type") != "message":
+                continue
+            try:
+                data = get_codec().decode(msg["data"])
+            except (TypeError, ValueError):
+                continue
+            for sub in list(self.routes.get(msg["channel"], ())):
+                sub.push(msg["channel"], data)
+
 class BaseMessageBus(ABC):
     """
     Abstract base class for the Message Bus.
     """
 
+    @property
+    def codec(self) -> MessageCodec:
+        """Payload codec (MQ_CODEC / MQ_COMPRESSION); readers detect the format from the frame header."""
+        return get_codec()
+
     @abstractmethod
-    def publish_event(self, channel: str, agent: str, event_type: str, payload: Dict[str, Any]):
-        """Publish an event to a channel."""
+    def publish_event(self, channel: str, agent: str, event_type: str, payload: Dict[str, Any], sync: bool = False):
+        """Publish an event to a channel. Implementations may buffer unless sync=True."""
+        pass
+
+    def flush(self):
+        """Send any buffered events now."""
         pass
 
     @abstractmethod
@@ -44,8 +359,26 @@ class BaseMessageBus(ABC):
         pass
 
     @abstractmethod
-    def enqueue_task(self, queue_name: str, task_data: Dict[str, Any]):
-        """Enqueue a task."""
+    def enqueue_task(self, queue_name: str, task_data: Dict[str, Any], priority: int = 0, timeout: Optional[float] = 0) -> bool:
+        """
+        Enqueue a task (higher priority is dequeued first).
+        Queues are bounded by MQ_QUEUE_MAXSIZE; waits up to timeout seconds for room
+        (None = forever) and returns False if the queue stayed full.
+        """
+        pass
+
+    @abstractmethod
+    def dequeue_task(self, queue_name: str, timeout: Optional[float] = 0) -> Optional[Dict[str, Any]]:
+        """Pop the highest-priority task, waiting up to timeout seconds (0 = don't wait, None = forever)."""
+        pass
+
+    async def dequeue_task_async(self, queue_name: str, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Awaitable dequeue_task; the default waits in an executor thread."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.dequeue_task, queue_name, timeout)
+
+    @abstractmethod
+    def queue_size(self, queue_name: str) -> int:
         pass
 
     @abstractmethod
@@ -63,11 +396,46 @@ class BaseMessageBus(ABC):
         """Subscribe to a channel."""
         pass
 
+    @abstractmethod
+    def subscribe(self, *channels: str) -> Subscription:
+        """Subscribe to channels from a running event loop; returns an async iterator of messages."""
+        pass
+
+    _listener_loop: Optional[_ListenerLoop] = None
+    _listener_lock = threading.Lock()
+
+    def add_listener(self, channels: Tuple[str, ...], callback: Callable[[Dict[str, Any]], None]) -> Listener:
+        """
+        Call callback(message) for every event on channels, for synchronous code without a loop.
+        Listeners are subscribe() tasks on one background loop per bus (no thread or connection
+        per listener); callbacks run on that loop's thread and should return quickly.
+        """
+        with self._listener_lock:
+            if self._listener_loop is None:
+                self._listener_loop = _ListenerLoop(self)
+        return self._listener_loop.add(tuple(channels), callback)
+
+    def shutdown(self):
+        """Stop background listeners; safe to call more than once."""
+        with self._listener_lock:
+            loop, self._listener_loop = self._listener_loop, None
+        if loop is not None:
+            loop.stop()
+
     # --- Distributed Worker Management Interface (Optional/Stubbed for Local) ---
 
+    @abstractmethod
+    def register_worker(self, stats: Dict[str, Any]):
+        """Record a worker heartbeat; stats must carry worker_id."""
+        pass
+
     @abstractmethod
     def list_active_workers(self) -> List[Dict[str, Any]]:
         pass
+
+    def reap_stale_workers(self) -> List[str]:
+        """Forget workers whose heartbeat expired and hand back their queued work; returns their ids."""
+        return []
         
     @abstractmethod
     def select_best_worker(self, required_cpu: float = 20.0) -> Optional[str]:
@@ -77,6 +445,11 @@ class BaseMessageBus(ABC):
     def auction_task(self, node_name: str, state: Dict[str, Any], timeout: int = 5) -> Optional[str]:
         pass
 
+    @abstractmethod
+    def reply_bid(self, reply_to: str, bid: Dict[str, Any]):
+        """Answer an auction_started event on its reply_to channel (worker side)."""
+        pass
+
     @abstractmethod
     def call_remote_node(self, node_name: str, state: Dict[str, Any], timeout: int = 120) -> Optional[Dict[str, Any]]:
         pass
@@ -89,20 +462,56 @@ class BaseMessageBus(ABC):
     def announce_presence(self, swarm_id: str, capabilities: List[str]):
         pass
 
+    # --- Awaitable variants (event-driven where the transport supports it) ---
+
+    async def auction_task_async(self, node_name: str, state: Dict[str, Any], timeout: int = 5) -> Optional[str]:
+        return self.auction_task(node_name, state, timeout)
+
+    async def call_remote_node_async(self, node_name: str, state: Dict[str, Any], timeout: int = 120) -> Optional[Dict[str, Any]]:
+        return self.call_remote_node(node_name, state, timeout)
+
+    async def call_remote_nodes_parallel_async(self, requests: List[Tuple[str, Dict[str, Any]]], timeout: int = 120) -> List[Dict[str, Any]]:
+        return self.call_remote_nodes_parallel(requests, timeout)
+
+    # --- Worker side of remote node RPC ---
+
+    @abstractmethod
+    def fetch_node_tasks(self, consumer: str, count: int = 1, block_ms: int = 1000) -> List[Dict[str, Any]]:
+        """Claim pending node execution requests for this worker (crashed workers' requests first)."""
+        pass
+
+    @abstractmethod
+    def complete_node_task(self, request: Dict[str, Any], result: Dict[str, Any]):
+        """Store the result for a request and acknowledge it."""
+        pass
+
+    @abstractmethod
+    def renew_node_tasks(self, consumer: str, requests: List[Dict[str, Any]]):
+        """Keep long-running requests from being reclaimed by other workers."""
+        pass
+
 
 class LocalMessageBus(BaseMessageBus):
     """
     In-Memory implementation of MessageBus for local development.
     Uses simple list/dict structures.
+    cache_storage=False skips the storage LRU (used when standing in for an unreachable Redis bus).
     """
-    def __init__(self):
+    def __init__(self, cache_storage: bool = True):
         self._subscribers: Dict[str, List[Callable]] = {}
-        self._queues: Dict[str, List[Dict[str, Any]]] = {}
+        self._queues: Dict[str, _TaskQueue] = {}
         self._locks: Dict[str, float] = {}
-        self.storage = SqliteStorage()
+        self._async_subscribers: Dict[str, List[Subscription]] = {}
+        self._sub_lock = threading.Lock()
+        # in-process worker pool for remote node calls (see start_workers)
+        self._rpc_queue = _TaskQueue(settings.MQ_QUEUE_MAXSIZE)
+        self._rpc_waiters: Dict[str, concurrent.futures.Future] = {}
+        self._workers: Dict[str, Dict[str, Any]] = {}
+        self._worker_threads: List[threading.Thread] = []
+        self.storage = _cached_storage(SqliteStorage(), self) if cache_storage else SqliteStorage()
         logger.info("🏠 Initialized LocalMessageBus (In-Memory).")
 
-    def publish_event(self, channel: str, agent: str, event_type: str, payload: Dict[str, Any]):
+    def publish_event(self, channel: str, agent: str, event_type: str, payload: Dict[str, Any], sync: bool = False):
         message = {
             "id": str(uuid.uuid4()),
             "agent": agent,
@@ -116,6 +525,8 @@ class LocalMessageBus(BaseMessageBus):
                     callback(message)
                 except Exception as e:
                     logger.error(f"Local subscriber error on {channel}: {e}")
+        for sub in self._async_subscribers.get(channel, ()):
+            sub.push(channel, message)
         logger.debug(f"[LocalMQ] Broadcast on {channel}: {event_type}")
 
     def stream_thought(self, agent: str, thought: str):
@@ -132,11 +543,29 @@ class LocalMessageBus(BaseMessageBus):
     def log_remote_event(self, agent: str, event: str, payload: Dict[str, Any]):
         self.publish_event("gortex:remote_logs", agent, event, payload)
 
-    def enqueue_task(self, queue_name: str, task_data: Dict[str, Any]):
-        if queue_name not in self._queues:
-            self._queues[queue_name] = []
-        self._queues[queue_name].append(task_data)
+    def _queue(self, queue_name: str) -> _TaskQueue:
+        queue = self._queues.get(queue_name)
+        if queue is None:
+            with self._sub_lock:
+                queue = self._queues.setdefault(queue_name, _TaskQueue(settings.MQ_QUEUE_MAXSIZE))
+        return queue
+
+    def enqueue_task(self, queue_name: str, task_data: Dict[str, Any], priority: int = 0, timeout: Optional[float] = 0) -> bool:
+        if not self._queue(queue_name).put(task_data, priority, timeout):
+            logger.warning(f"[LocalMQ] Queue {queue_name} is full; task dropped")
+            return False
         logger.debug(f"[LocalMQ] Enqueued task to {queue_name}")
+        return True
+
+    def dequeue_task(self, queue_name: str, timeout: Optional[float] = 0) -> Optional[Dict[str, Any]]:
+        return self._queue(queue_name).get(timeout)
+
+    async def dequeue_task_async(self, queue_name: str, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        return await self._queue(queue_name).get_async(timeout)
+
+    def queue_size(self, queue_name: str) -> int:
+        queue = self._queues.get(queue_name)
+        return len(queue) if queue else 0
 
     def acquire_lock(self, lock_name: str, timeout: int = 10) -> bool:
         now = time.time()
@@ -155,54 +584,318 @@ class LocalMessageBus(BaseMessageBus):
             self._subscribers[channel] = []
         self._subscribers[channel].append(callback)
 
-    # --- Stubs for Distributed methods ---
+    def add_listener(self, channels: Tuple[str, ...], callback: Callable[[Dict[str, Any]], None]) -> Listener:
+        # publish_event delivers synchronously in-process, so no loop or thread is needed
+        callbacks = {channel: (lambda message, channel=channel: callback({**message, "channel": channel}))
+                     for channel in dict.fromkeys(channels)}
+        with self._sub_lock:
+            for channel, cb in callbacks.items():
+                self._subscribers[channel] = self._subscribers.get(channel, []) + [cb]
+
+        def close():
+            with self._sub_lock:
+                for channel, cb in callbacks.items():
+                    self._subscribers[channel] = [c for c in self._subscribers.get(channel, []) if c is not cb]
+        return Listener(close)
+
+    def subscribe(self, *channels: str) -> Subscription:
+        sub = Subscription(channels, asyncio.get_running_loop(), self._remove_subscription)
+        with self._sub_lock:
+            for channel in dict.fromkeys(sub.channels):
+                # copy-on-write so publishers can iterate without the lock
+                self._async_subscribers[channel] = self._async_subscribers.get(channel, []) + [sub]
+        return sub
+
+    async def _remove_subscription(self, sub: Subscription):
+        with self._sub_lock:
+            for channel in sub.channels:
+                remaining = [s for s in self._async_subscribers.get(channel, []) if s is not sub]
+                if remaining:
+                    self._async_subscribers[channel] = remaining
+                else:
+                    self._async_subscribers.pop(channel, None)
+
+    # --- In-process worker pool ---
+    # Remote node calls go through the same request format and fetch/complete API as the
+    # Redis stream, served by worker threads in this process. Without workers (the default,
+    # MQ_LOCAL_WORKERS=0) remote calls return nothing and callers run nodes locally.
+
+    def start_workers(self, count: int):
+        """Start count in-process workers consuming remote node requests."""
+        with self._sub_lock:
+            for _ in range(count):
+                worker_id = f"local-worker-{len(self._worker_threads)}"
+                thread = threading.Thread(target=self._worker_loop, args=(worker_id,), name=worker_id, daemon=True)
+                self._worker_threads.append(thread)
+                self.register_worker({"worker_id": worker_id, "status": "online", "cpu_percent": 0.0,
+                                      "active_tasks": 0, "total_tasks_done": 0, "hostname": "local"})
+                thread.start()
+        logger.info(f"🧵 LocalMessageBus serving remote nodes with {len(self._worker_threads)} in-process workers")
+
+    def _ensure_workers(self) -> bool:
+        if not self._worker_threads and settings.MQ_LOCAL_WORKERS > 0:
+            self.start_workers(settings.MQ_LOCAL_WORKERS)
+        return bool(self._worker_threads)
+
+    def _worker_loop(self, worker_id: str):
+        loop = asyncio.new_event_loop() # one loop per worker for coroutine nodes, not one per request
+        try:
+            while True:
+                for request in self.fetch_node_tasks(worker_id, count=1, block_ms=1000):
+                    if request is _STOP_WORKER:
+                        return
+                    self._execute_node_request(worker_id, request, loop)
+        finally:
+            loop.close()
+
+    def shutdown(self, timeout: float = 5.0):
+        """
+        Stop the in-process workers (each exits after its current request) and the listener loop.
+        Requests still queued are abandoned; their callers see them as unfinished.
+        """
+        with self._sub_lock:
+            threads, self._worker_threads = self._worker_threads, []
+        for _ in threads:
+            self._rpc_queue.put(_STOP_WORKER, priority=1 << 30, timeout=timeout)
+        deadline = time.time() + timeout
+        for thread in threads:
+            thread.join(max(0.0, deadline - time.time()))
+            self._workers.pop(thread.name, None)
+        for req_id in list(self._rpc_waiters):
+            future = self._rpc_waiters.pop(req_id, None)
+            if future is not None:
+                future.cancel()
+        super().shutdown()
+
+    def _execute_node_request(self, worker_id: str, request: Dict[str, Any], loop: asyncio.AbstractEventLoop):
+        stats = self._workers[worker_id]
+        stats["active_tasks"] += 1
+        try:
+            node_func = _local_node_map().get(request["node"].lower())
+            if not node_func:
+                raise ValueError(f"Unknown node type: {request['node']}")
+            if asyncio.iscoroutinefunction(node_func):
+                result = loop.run_until_complete(node_func(request["state"]))
+            else:
+                result = node_func(request["state"])
+            stats["total_tasks_done"] += 1
+        except Exception as e:
+            logger.error(f"❌ [{worker_id}] Node '{request['node']}' failed: {e}")
+            result = {"error": str(e), "status": "failed"}
+        finally:
+            stats["active_tasks"] -= 1
+            stats["last_seen"] = time.time()
+        self.complete_node_task(request, result)
+
+    def _submit_node_requests(self, requests: List[Tuple[str, Dict[str, Any]]]) -> List[Tuple[str, concurrent.futures.Future]]:
+        futures = []
+        for node, state in requests:
+            req_id = uuid.uuid4().hex
+            future = concurrent.futures.Future()
+            self._rpc_waiters[req_id] = future
+            # codec round trip: workers see exactly what a Redis worker would receive
+            request = {"id": req_id, "node": node, "state": self.codec.decode(self.codec.encode(state)), "reply_to": req_id}
+            if not self._rpc_queue.put(request):
+                self._rpc_waiters.pop(req_id, None)
+                future.cancel()
+            futures.append((req_id, future))
+        return futures
+
+    def _collect(self, futures: List[Tuple[str, concurrent.futures.Future]]) -> List[Dict[str, Any]]:
+        results = []
+        for req_id, future in futures:
+            if future.done() and not future.cancelled():
+                results.append(future.result())
+            else:
+                self._rpc_waiters.pop(req_id, None) # workers skip requests nobody waits for
+        if len(results) < len(futures):
+            logger.warning(f"⏱️ {len(futures) - len(results)}/{len(futures)} local node call(s) did not finish in time")
+        return results
+
+    def register_worker(self, stats: Dict[str, Any]):
+        self._workers[stats["worker_id"]] = {**stats, "last_seen": time.time()}
+
     def list_active_workers(self) -> List[Dict[str, Any]]:
-        return []
+        return [dict(w) for w in self._workers.values()]
 
     def select_best_worker(self, required_cpu: float = 20.0) -> Optional[str]:
-        return None
+        if not self._ensure_workers():
+            return None
+        return min(self._workers.values(), key=lambda w: w["active_tasks"])["worker_id"]
 
     def auction_task(self, node_name: str, state: Dict[str, Any], timeout: int = 5) -> Optional[str]:
-        return None
+        return self.select_best_worker()
+
+    def reply_bid(self, reply_to: str, bid: Dict[str, Any]):
+        # local auctions pick a worker directly; nobody listens for bids
+        pass
 
     def call_remote_node(self, node_name: str, state: Dict[str, Any], timeout: int = 120) -> Optional[Dict[str, Any]]:
-        return None
+        results = self.call_remote_nodes_parallel([(node_name, state)], timeout=timeout)
+        return results[0] if results else None
 
     def call_remote_nodes_parallel(self, requests: List[Tuple[str, Dict[str, Any]]], timeout: int = 120) -> List[Dict[str, Any]]:
-        return []
+        if not requests or not self._ensure_workers():
+            return []
+        futures = self._submit_node_requests(requests)
+        concurrent.futures.wait([f for _, f in futures], timeout=timeout)
+        return self._collect(futures)
+
+    async def call_remote_node_async(self, node_name: str, state: Dict[str, Any], timeout: int = 120) -> Optional[Dict[str, Any]]:
+        results = await self.call_remote_nodes_parallel_async([(node_name, state)], timeout=timeout)
+        return results[0] if results else None
+
+    async def call_remote_nodes_parallel_async(self, requests: List[Tuple[str, Dict[str, Any]]], timeout: int = 120) -> List[Dict[str, Any]]:
+        if not requests or not self._ensure_workers():
+            return []
+        futures = self._submit_node_requests(requests)
+        waiting = [asyncio.wrap_future(f) for _, f in futures if not f.cancelled()]
+        if waiting:
+            _, late = await asyncio.wait(waiting, timeout=timeout)
+            for fut in late:
+                fut.cancel() # propagates to the worker-side future
+        return self._collect(futures)
 
     def announce_presence(self, swarm_id: str, capabilities: List[str]):
         # Just log locally
         logger.debug(f"Swarm {swarm_id} online with capabilities: {capabilities}")
 
+    def fetch_node_tasks(self, consumer: str, count: int = 1, block_ms: int = 1000) -> List[Dict[str, Any]]:
+        tasks = []
+        request = self._rpc_queue.get(timeout=block_ms / 1000)
+        while request is not None:
+            if request is _STOP_WORKER:
+                tasks.append(request)
+                break
+            if request["reply_to"] in self._rpc_waiters: # caller may have given up already
+                tasks.append(request)
+            if len(tasks) >= count:
+                break
+            request = self._rpc_queue.get()
+        return tasks
+
+    def complete_node_task(self, request: Dict[str, Any], result: Dict[str, Any]):
+        future = self._rpc_waiters.pop(request.get("reply_to"), None)
+        if future is not None and not future.done():
+            future.set_result(result)
+
+    def renew_node_tasks(self, consumer: str, requests: List[Dict[str, Any]]):
+        pass # in-process requests are never reclaimed
+
+
 
 class RedisMessageBus(BaseMessageBus):
     """
     Redis implementation of MessageBus for distributed environment.
+    Events are buffered and published through a pipeline once per `batch_window` seconds
+    (or as soon as `batch_size` events are pending). batch_window=0 publishes synchronously.
+
+    Remote node calls use a Redis Stream with a consumer group (at-least-once):
+    requests are XADDed to RPC_STREAM, workers XREADGROUP them, push the result to the
+    per-request list key and XACK. Entries left pending by a crashed worker are reclaimed
+    with XAUTOCLAIM after MQ_RPC_CLAIM_IDLE seconds.
+    With MQ_AFFINITY_ROUTING, requests go to the inbox stream of the worker owning their
+    thread on a consistent hash ring (spilling over to the next worker when it is saturated,
+    or to RPC_STREAM when all candidates are); inboxes of workers that stop heartbeating
+    are moved back onto RPC_STREAM.
     """
-    def __init__(self, url: Optional[str] = None):
+    RPC_STREAM = "gortex:rpc:requests"
+    RPC_INBOX_PREFIX = "gortex:rpc:inbox:"
+    RPC_GROUP = "gortex-workers"
+    RPC_RESULT_PREFIX = "gortex:rpc:result:"
+    RPC_DONE_PREFIX = "gortex:rpc:done:"
+    STATE_PREFIX = "gortex:state:" # content-addressed state snapshots (delta anchors)
+    WORKER_REGISTRY = "gortex:workers" # sorted set: worker_id -> last heartbeat
+    WORKER_STATS = "gortex:workers:stats" # hash: worker_id -> heartbeat stats JSON
+
+    def __init__(self, url: Optional[str] = None, batch_window: Optional[float] = None, batch_size: Optional[int] = None):
         self.url = url or os.getenv("REDIS_URL", "redis://localhost:6379/0")
+        self.batch_window = settings.MQ_PUBLISH_WINDOW if batch_window is None else batch_window
+        self.batch_size = batch_size or settings.MQ_PUBLISH_BATCH_SIZE
+        self._publish_buffer: List[Tuple[str, str]] = []
+        self._buffer_cond = threading.Condition()
+        self._send_lock = threading.Lock() # keeps batches in publish order
+        self._flusher: Optional[threading.Thread] = None
+        self._rpc_groups: Set[str] = set() # streams whose consumer group is known to exist
+        self._state_lock = threading.Lock()
+        self._state_anchors: "OrderedDict[str, Tuple[str, Dict[str, Any]]]" = OrderedDict() # thread -> (version, snapshot)
+        self._state_cache = SnapshotCache(settings.MQ_STATE_CACHE_SIZE) # worker side, by version
         if not redis:
              raise ImportError("Redis package is missing. Cannot use RedisMessageBus.")
 
         try:
             self.client = redis.from_url(self.url, decode_responses=True)
             self.client.ping()
-            self.storage = RedisStorage(client=self.client)
+            # must exist before the storage cache starts its invalidation listener (it may call _hub_for_loop)
+            self._pubsub_hubs = weakref.WeakKeyDictionary() # event loop -> _RedisPubSubHub
+            self.storage = _cached_storage(RedisStorage(client=self.client), self)
             logger.info(f"🌐 Connected to Redis MQ: {self.url}")
         except Exception as e:
             logger.error(f"Redis connection failed: {e}")
+            if isinstance(getattr(self, "storage", None), CachedStorage):
+                self.storage.unbind()
             raise e
+        atexit.register(self.flush)
 
-    def publish_event(self, channel: str, agent: str, event_type: str, payload: Dict[str, Any]):
-        message = {
+    def _encode_event(self, agent: str, event_type: str, payload: Dict[str, Any]) -> str:
+        return self.codec.encode({
             "id": str(uuid.uuid4()),
             "agent": agent,
             "type": event_type,
             "payload": payload,
             "timestamp": time.time()
-        }
-        self.client.publish(channel, json.dumps(message))
+        })
+
+    def publish_event(self, channel: str, agent: str, event_type: str, payload: Dict[str, Any], sync: bool = False):
+        data = self._encode_event(agent, event_type, payload)
+        if sync or self.batch_window <= 0:
+            # Escape hatch: send now, after anything already buffered.
+            with self._send_lock:
+                self._send(self._take_buffer() + [(channel, data)])
+            return
+
+        with self._buffer_cond:
+            self._publish_buffer.append((channel, data))
+            full = len(self._publish_buffer) >= self.batch_size
+            if not full:
+                if self._flusher is None:
+                    self._flusher = threading.Thread(target=self._flush_loop, name="GortexMQFlusher", daemon=True)
+                    self._flusher.start()
+                self._buffer_cond.notify()
+        if full:
+            self.flush()
+
+    def flush(self):
+        with self._send_lock:
+            self._send(self._take_buffer())
+
+    def _take_buffer(self) -> List[Tuple[str, str]]:
+        with self._buffer_cond:
+            batch, self._publish_buffer = self._publish_buffer, []
+        return batch
+
+    def _send(self, batch: List[Tuple[str, str]]):
+        if not batch:
+            return
+        try:
+            if len(batch) == 1:
+                self.client.publish(*batch[0])
+                return
+            pipe = self.client.pipeline(transaction=False)
+            for channel, data in batch:
+                pipe.publish(channel, data)
+            pipe.execute()
+        except Exception as e:
+            logger.error(f"Failed to publish {len(batch)} buffered event(s): {e}")
+
+    def _flush_loop(self):
+        """Background flusher: wait for the first buffered event, let the window fill, then send."""
+        while True:
+            with self._buffer_cond:
+                while not self._publish_buffer:
+                    self._buffer_cond.wait()
+            time.sleep(self.batch_window)
+            self.flush()
 
     def stream_thought(self, agent: str, thought: str):
         self.publish_event("gortex:thought_stream", agent, "thought_update", {"text": thought})
@@ -218,8 +911,100 @@ class RedisMessageBus(BaseMessageBus):
     def log_remote_event(self, agent: str, event: str, payload: Dict[str, Any]):
         self.publish_event("gortex:remote_logs", agent, event, payload)
 
-    def enqueue_task(self, queue_name: str, task_data: Dict[str, Any]):
-        self.client.rpush(queue_name, json.dumps(task_data))
+    # Task queues are sorted sets scored by -priority * 2**40 + a per-queue sequence number
+    # (INCR on "<queue>:seq"), so (B)ZPOPMIN yields the highest priority first and FIFO within
+    # a priority. Priorities are clamped to +-2**12 so every score is an integer below 2**53
+    # and compares exactly as a double.
+    _SEQ_BITS = 40
+    _MAX_PRIORITY = 1 << 12
+
+    def _task_score(self, priority: int, seq: int) -> int:
+        priority = max(-self._MAX_PRIORITY, min(self._MAX_PRIORITY, int(priority)))
+        return -priority * (1 << self._SEQ_BITS) + seq % (1 << self._SEQ_BITS)
+
+    def enqueue_task(self, queue_name: str, task_data: Dict[str, Any], priority: int = 0, timeout: Optional[float] = 0) -> bool:
+        deadline = None if timeout is None else time.time() + timeout
+        member = self.codec.encode([uuid.uuid4().hex, task_data])
+        while True:
+            # WATCH/MULTI makes the bound check and the ZADD one step: if another producer or a
+            # consumer touches the queue in between, EXEC aborts and the bound is checked again.
+            with self.client.pipeline() as pipe:
+                try:
+                    pipe.watch(queue_name)
+                    if int(pipe.zcard(queue_name)) < settings.MQ_QUEUE_MAXSIZE:
+                        score = self._task_score(priority, int(pipe.incr(f"{queue_name}:seq")))
+                        pipe.multi()
+                        pipe.zadd(queue_name, {member: score})
+                        pipe.execute()
+                        return True
+                except redis.WatchError:
+                    continue
+                except redis.ResponseError as e:
+                    if "WRONGTYPE" not in str(e):
+                        raise
+                    self._migrate_list_queue(queue_name)
+                    continue
+            if deadline is not None and time.time() >= deadline:
+                logger.warning(f"Queue {queue_name} is full; task dropped")
+                return False
+            time.sleep(0.05)
+
+    def _migrate_list_queue(self, queue_name: str):
+        """Convert a queue left as a list by older releases (RPUSH of JSON tasks) into the sorted-set layout, keeping FIFO order."""
+        with self.client.pipeline() as pipe:
+            try:
+                pipe.watch(queue_name)
+                if pipe.type(queue_name) not in ("list", b"list"):
+                    return
+                raws = pipe.lrange(queue_name, 0, -1)
+                first = int(pipe.incrby(f"{queue_name}:seq", len(raws))) - len(raws) + 1 if raws else 0
+                members = {self.codec.encode([uuid.uuid4().hex, json.loads(raw)]): self._task_score(0, first + i)
+                           for i, raw in enumerate(raws)}
+                pipe.multi()
+                pipe.delete(queue_name)
+                if members:
+                    pipe.zadd(queue_name, members)
+                pipe.execute()
+                logger.warning(f"Migrated legacy list queue {queue_name} ({len(members)} task(s)) to a priority queue")
+            except redis.WatchError:
+                pass # changed concurrently (e.g. migrated by another node); the caller retries
+
+    def _with_queue_migration(self, queue_name: str, op: Callable[[], Any]) -> Any:
+        try:
+            return op()
+        except redis.ResponseError as e:
+            if "WRONGTYPE" not in str(e):
+                raise
+            self._migrate_list_queue(queue_name)
+            return op()
+
+    def _decode_task(self, member: str) -> Dict[str, Any]:
+        return self.codec.decode(member)[1]
+
+    def dequeue_task(self, queue_name: str, timeout: Optional[float] = 0) -> Optional[Dict[str, Any]]:
+        if timeout == 0:
+            popped = self._with_queue_migration(queue_name, lambda: self.client.zpopmin(queue_name, 1))
+            return self._decode_task(popped[0][0]) if popped else None
+        # BZPOPMIN 0 = wait forever
+        popped = self._with_queue_migration(queue_name, lambda: self.client.bzpopmin(queue_name, timeout=timeout or 0))
+        return self._decode_task(popped[1]) if popped else None
+
+    async def dequeue_task_async(self, queue_name: str, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        client = self._get_pubsub_hub().client
+        for attempt in range(2):
+            try:
+                if timeout == 0:
+                    popped = await client.zpopmin(queue_name, 1)
+                    return self._decode_task(popped[0][0]) if popped else None
+                popped = await client.bzpopmin(queue_name, timeout=timeout or 0)
+                return self._decode_task(popped[1]) if popped else None
+            except redis.ResponseError as e:
+                if attempt or "WRONGTYPE" not in str(e):
+                    raise
+                self._migrate_list_queue(queue_name)
+
+    def queue_size(self, queue_name: str) -> int:
+        return int(self._with_queue_migration(queue_name, lambda: self.client.zcard(queue_name)))
 
     def acquire_lock(self, lock_name: str, timeout: int = 10) -> bool:
         return bool(self.client.set(f"gortex:lock:{lock_name}", "locked", ex=timeout, nx=True))
@@ -233,17 +1018,73 @@ class RedisMessageBus(BaseMessageBus):
         # Note: This implementation blocks. In a real async system, we'd loop in a separate task.
         # For compatibility with existing synchronous calls, we assume usage in a thread or simple loop.
         for msg in pubsub.listen():
-             if msg['type'] == 'message': callback(json.loads(msg['data']))
+             if msg['type'] == 'message': callback(self.codec.decode(msg['data']))
+
+    def subscribe(self, *channels: str) -> Subscription:
+        return self._get_pubsub_hub().subscribe(channels)
+
+    def _get_pubsub_hub(self) -> _RedisPubSubHub:
+        if aioredis is None:
+            raise ImportError("redis.asyncio is missing. Cannot subscribe asynchronously.")
+        loop = asyncio.get_running_loop()
+        hub = self._pubsub_hubs.get(loop)
+        if hub is None:
+            hub = self._pubsub_hubs[loop] = _RedisPubSubHub(self.url)
+        return hub
+
+    @staticmethod
+    async def _next_message(sub: Subscription, deadline: float) -> Optional[Dict[str, Any]]:
+        """Next message from sub, or None once the loop-time deadline passes."""
+        remaining = deadline - asyncio.get_running_loop().time()
+        if remaining <= 0:
+            return None
+        try:
+            return await asyncio.wait_for(sub.__anext__(), remaining)
+        except (asyncio.TimeoutError, StopAsyncIteration):
+            return None
+
+    def register_worker(self, stats: Dict[str, Any]):
+        pipe = self.client.pipeline()
+        pipe.zadd(self.WORKER_REGISTRY, {stats["worker_id"]: stats.get("last_seen", time.time())})
+        pipe.hset(self.WORKER_STATS, stats["worker_id"], json.dumps(stats))
+        pipe.execute()
 
     def list_active_workers(self) -> List[Dict[str, Any]]:
-        workers = []
+        """
+        Workers whose last heartbeat is within MQ_WORKER_TTL: the live ids from the registry,
+        then only their stats. Read-only; expired entries are left to reap_stale_workers().
+        """
         try:
-            keys = self.client.keys("gortex:workers:*")
-            for k in keys:
-                data = self.client.get(k)
-                if data: workers.append(json.loads(data))
-        except: pass
-        return workers
+            live = self.client.zrangebyscore(self.WORKER_REGISTRY, time.time() - settings.MQ_WORKER_TTL, "+inf")
+            if not live:
+                return []
+            return [json.loads(data) for data in self.client.hmget(self.WORKER_STATS, live) if data]
+        except Exception as e:
+            logger.debug(f"Worker registry read failed: {e}")
+            return []
+
+    def reap_stale_workers(self) -> List[str]:
+        """
+        Drop registry entries older than MQ_WORKER_TTL and move those workers' inboxes to the
+        shared stream. Workers call this from their heartbeat loop. The registry is watched so a
+        worker that heartbeats mid-reap is left alone; a lost race is retried on the next beat.
+        """
+        cutoff = time.time() - settings.MQ_WORKER_TTL
+        try:
+            with self.client.pipeline() as pipe:
+                pipe.watch(self.WORKER_REGISTRY)
+                stale = pipe.zrangebyscore(self.WORKER_REGISTRY, "-inf", f"({cutoff}")
+                if not stale:
+                    return []
+                pipe.multi()
+                pipe.zrem(self.WORKER_REGISTRY, *stale)
+                pipe.hdel(self.WORKER_STATS, *stale)
+                pipe.execute()
+        except redis.WatchError:
+            return []
+        for worker_id in stale:
+            self._rehome_inbox(worker_id)
+        return stale
 
     def select_best_worker(self, required_cpu: float = 20.0) -> Optional[str]:
         workers = self.list_active_workers()
@@ -260,44 +1101,405 @@ class RedisMessageBus(BaseMessageBus):
         bid_chan = f"gortex:bids:{auction_id}"
         pubsub = self.client.pubsub()
         pubsub.subscribe(bid_chan)
-        self.publish_event("gortex:auctions", "Master", "auction_started", {"auction_id": auction_id, "node": node_name, "reply_to": bid_chan})
+        self.publish_event("gortex:auctions", "Master", "auction_started", {"auction_id": auction_id, "node": node_name, "reply_to": bid_chan}, sync=True)
         
         bids = []
         start = time.time()
         while time.time() - start < timeout:
             msg = pubsub.get_message(ignore_subscribe_messages=True, timeout=0.2)
             if msg:
-                bids.append(json.loads(msg['data']))
+                bids.append(self.codec.decode(msg['data']))
                 if len(bids) >= 3: break
         pubsub.unsubscribe(bid_chan)
         if not bids: return self.select_best_worker()
         bids.sort(key=lambda x: x["bid_score"], reverse=True)
         return bids[0]["worker_id"]
 
+    def reply_bid(self, reply_to: str, bid: Dict[str, Any]):
+        # bids are bare payloads on the reply channel; both auction paths decode them with the codec
+        self.client.publish(reply_to, self.codec.encode(bid))
+
+    async def auction_task_async(self, node_name: str, state: Dict[str, Any], timeout: int = 5) -> Optional[str]:
+        auction_id = str(uuid.uuid4())[:6]
+        bid_chan = f"gortex:bids:{auction_id}"
+        hub = self._get_pubsub_hub()
+        bids = []
+        async with hub.subscribe((bid_chan,)) as sub:
+            await sub.wait_ready()
+            await hub.client.publish("gortex:auctions", self._encode_event("Master", "auction_started", {"auction_id": auction_id, "node": node_name, "reply_to": bid_chan}))
+            deadline = asyncio.get_running_loop().time() + timeout
+            while len(bids) < 3:
+                bid = await self._next_message(sub, deadline)
+                if bid is None:
+                    break
+                bids.append(bid)
+        if not bids:
+            # registry lookup is sync Redis I/O: keep it off the loop
+            return await asyncio.get_running_loop().run_in_executor(None, self.select_best_worker)
+        bids.sort(key=lambda x: x["bid_score"], reverse=True)
+        return bids[0]["worker_id"]
+
     def call_remote_node(self, node_name: str, state: Dict[str, Any], timeout: int = 120) -> Optional[Dict[str, Any]]:
         results = self.call_remote_nodes_parallel([(node_name, state)], timeout=timeout)
         return results[0] if results else None
 
+    async def call_remote_node_async(self, node_name: str, state: Dict[str, Any], timeout: int = 120) -> Optional[Dict[str, Any]]:
+        results = await self.call_remote_nodes_parallel_async([(node_name, state)], timeout=timeout)
+        return results[0] if results else None
+
     def call_remote_nodes_parallel(self, requests: List[Tuple[str, Dict[str, Any]]], timeout: int = 120) -> List[Dict[str, Any]]:
         if not requests: return []
-        pending = {}
-        pubsub = self.client.pubsub()
+        deadline = time.time() + timeout
+        results = self._call_nodes(requests, timeout)
+        missed = self._state_misses(requests, results)
+        if missed:
+            retried = self._call_nodes([requests[i] for i in missed], max(0, deadline - time.time()), full_state=True)
+            for i, result in zip(missed, retried):
+                results[i] = result
+        return [r for r in results if r is not None]
+
+    def _call_nodes(self, requests: List[Tuple[str, Dict[str, Any]]], timeout: float, full_state: bool = False) -> List[Optional[Dict[str, Any]]]:
+        reply_keys = self._submit_node_requests(requests, full_state)
+        pending = {key: i for i, key in enumerate(reply_keys)}
+        results: List[Optional[Dict[str, Any]]] = [None] * len(reply_keys)
+
+        # BLPOP wakes up as soon as any result key is pushed (no polling interval)
+        deadline = time.time() + timeout
+        while pending:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            popped = self.client.blpop(list(pending), timeout=remaining)
+            if popped:
+                key, data = popped
+                results[pending.pop(key)] = self.codec.decode(data)
+        if pending:
+            logger.warning(f"⏱️ {len(pending)}/{len(reply_keys)} remote node call(s) timed out after {timeout}s")
+        return results
+
+    def _state_misses(self, requests: List[Tuple[str, Dict[str, Any]]], results: List[Optional[Dict[str, Any]]]) -> List[int]:
+        """Indices of requests whose delta base was unavailable to the worker; their threads get re-anchored."""
+        missed = [i for i, r in enumerate(results) if isinstance(r, dict) and r.get("status") == "state_miss"]
+        if missed:
+            logger.info(f"🔁 Resending {len(missed)} remote node request(s) with full state")
+            with self._state_lock:
+                for i in missed:
+                    self._state_anchors.pop(self._state_thread(requests[i][1]), None)
+        return missed
+
+    def _ensure_rpc_group(self, stream: Optional[str] = None):
+        stream = stream or self.RPC_STREAM
+        if stream in self._rpc_groups:
+            return
+        try:
+            # id=0 so requests submitted before the first worker started are still delivered
+            self.client.xgroup_create(stream, self.RPC_GROUP, id="0", mkstream=True)
+        except redis.ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+        self._rpc_groups.add(stream)
+
+    def _inbox_stream(self, worker_id: str) -> str:
+        return f"{self.RPC_INBOX_PREFIX}{worker_id}"
+
+    def _affinity_router(self) -> Callable[[Dict[str, Any]], str]:
+        """Stream selector for one batch of requests, from a single read of the worker registry."""
+        if not settings.MQ_AFFINITY_ROUTING:
+            return lambda state: self.RPC_STREAM
+        workers = {w["worker_id"]: w for w in self.list_active_workers()}
+        ring = ConsistentHashRing(workers)
+        planned: Dict[str, int] = {}
+
+        def saturated(worker_id: str) -> bool:
+            w = workers[worker_id]
+            return (w.get("active_tasks", 0) + planned.get(worker_id, 0) >= settings.MQ_WORKER_MAX_ACTIVE
+                    or w.get("cpu_percent", 0) >= settings.MQ_WORKER_MAX_CPU)
+
+        def route(state: Dict[str, Any]) -> str:
+            worker_id = ring.route(self._state_thread(state), saturated)
+            if worker_id is None:
+                return self.RPC_STREAM
+            planned[worker_id] = planned.get(worker_id, 0) + 1
+            return self._inbox_stream(worker_id)
+        return route
+
+    def _rehome_inbox(self, worker_id: str):
+        """Move a dead worker's unfinished requests back onto the shared stream."""
+        inbox = self._inbox_stream(worker_id)
+        orphaned = f"{inbox}:orphaned:{uuid.uuid4().hex[:8]}"
+        try:
+            self.client.rename(inbox, orphaned) # only one caller wins the move
+        except redis.ResponseError:
+            return
+        entries = self.client.xrange(orphaned)
+        try:
+            # re-XADD starts the delivery count over, so carry it in the entry for the poison check
+            delivered = {p["message_id"]: p["times_delivered"]
+                         for p in self.client.xpending_range(orphaned, self.RPC_GROUP, min="-", max="+", count=len(entries))} if entries else {}
+        except redis.ResponseError: # inbox was never read, so it has no group
+            delivered = {}
+        pipe = self.client.pipeline(transaction=True)
+        for entry_id, fields in entries:
+            if entry_id in delivered:
+                fields = dict(fields, deliveries=int(fields.get("deliveries", 0)) + delivered[entry_id])
+            pipe.xadd(self.RPC_STREAM, fields, maxlen=settings.MQ_RPC_STREAM_MAXLEN, approximate=True)
+        pipe.delete(orphaned)
+        pipe.execute()
+        if entries:
+            logger.warning(f"📦 Moved {len(entries)} request(s) from offline worker {worker_id} to the shared stream")
+
+    @staticmethod
+    def _state_thread(state: Dict[str, Any]) -> str:
+        return str(state.get("thread_id", "global"))
+
+    def _ship_state(self, state: Dict[str, Any], blobs: Dict[str, Optional[str]]) -> Dict[str, str]:
+        """
+        Request fields carrying state as a delta against the thread's anchor snapshot.
+        The anchor is stored once under its content address (queued into blobs); it is replaced
+        when the delta grows past half of the full state.
+        """
+        snapshot = snapshot_state(state)
+        thread = self._state_thread(state)
+        with self._state_lock:
+            anchor = self._state_anchors.get(thread)
+            delta = diff_snapshots(anchor[1], snapshot) if anchor else None
+            if delta is None or delta_size(delta) * 2 > snapshot_size(snapshot):
+                anchor = (state_version(snapshot), snapshot)
+                delta = diff_snapshots(snapshot, snapshot)
+                self._state_anchors[thread] = anchor
+                blobs[f"{self.STATE_PREFIX}{anchor[0]}"] = self.codec.encode(snapshot)
+            else:
+                blobs.setdefault(f"{self.STATE_PREFIX}{anchor[0]}", None) # refresh TTL only
+            self._state_anchors.move_to_end(thread)
+            while len(self._state_anchors) > settings.MQ_STATE_CACHE_SIZE:
+                self._state_anchors.popitem(last=False)
+        return {"state_base": anchor[0], "state_delta": self.codec.encode(delta)}
+
+    def _build_node_requests(self, requests: List[Tuple[str, Dict[str, Any]]], full_state: bool = False) -> Tuple[List[Dict[str, str]], Dict[str, Optional[str]]]:
+        entries, blobs = [], {}
+        route = self._affinity_router()
         for node, state in requests:
-            req_id = str(uuid.uuid4())[:8]
-            resp_chan = f"gortex:resp:{req_id}"
-            pubsub.subscribe(resp_chan)
-            pending[resp_chan] = {"done": False, "result": None}
-            self.client.rpush("gortex:node_tasks", json.dumps({"id": req_id, "node": node, "state": state, "reply_to": resp_chan}))
-        
-        start = time.time()
-        while time.time() - start < timeout:
-            if all(r["done"] for r in pending.values()): break
-            msg = pubsub.get_message(ignore_subscribe_messages=True, timeout=0.5)
-            if msg and msg['channel'] in pending:
-                pending[msg['channel']]["result"] = json.loads(msg['data'])
-                pending[msg['channel']]["done"] = True
-        pubsub.close()
-        return [r["result"] for r in pending.values() if r["done"]]
+            req_id = uuid.uuid4().hex
+            fields = {"id": req_id, "node": node, "reply_to": f"{self.RPC_RESULT_PREFIX}{req_id}", "_stream": route(state)}
+            if full_state or not settings.MQ_STATE_DELTA:
+                fields["state"] = self.codec.encode(state)
+            else:
+                fields.update(self._ship_state(state, blobs))
+            entries.append(fields)
+        return entries, blobs
+
+    def _queue_node_requests(self, pipe, entries: List[Dict[str, str]], blobs: Dict[str, Optional[str]]):
+        for key, blob in blobs.items(): # anchors first, so a worker never sees a request before its base
+            if blob is None:
+                pipe.expire(key, settings.MQ_STATE_TTL)
+            else:
+                pipe.set(key, blob, ex=settings.MQ_STATE_TTL)
+        for fields in entries:
+            stream = fields.get("_stream", self.RPC_STREAM)
+            pipe.xadd(stream, {k: v for k, v in fields.items() if k != "_stream"},
+                      maxlen=settings.MQ_RPC_STREAM_MAXLEN, approximate=True)
+
+    def _submit_node_requests(self, requests: List[Tuple[str, Dict[str, Any]]], full_state: bool = False) -> List[str]:
+        """XADD the requests in one round trip; returns the per-request result keys."""
+        self._ensure_rpc_group()
+        entries, blobs = self._build_node_requests(requests, full_state)
+        pipe = self.client.pipeline(transaction=False)
+        self._queue_node_requests(pipe, entries, blobs)
+        pipe.execute()
+        return [fields["reply_to"] for fields in entries]
+
+    async def call_remote_nodes_parallel_async(self, requests: List[Tuple[str, Dict[str, Any]]], timeout: int = 120) -> List[Dict[str, Any]]:
+        """
+        Event-driven variant: subscribes to every result key's notification channel on the shared
+        pubsub connection before submitting, then resolves results as workers publish them.
+        """
+        if not requests: return []
+        deadline = time.time() + timeout
+        results = await self._call_nodes_async(requests, timeout)
+        missed = self._state_misses(requests, results)
+        if missed:
+            retried = await self._call_nodes_async([requests[i] for i in missed], max(0, deadline - time.time()), full_state=True)
+            for i, result in zip(missed, retried):
+                results[i] = result
+        return [r for r in results if r is not None]
+
+    async def _call_nodes_async(self, requests: List[Tuple[str, Dict[str, Any]]], timeout: float, full_state: bool = False) -> List[Optional[Dict[str, Any]]]:
+        loop = asyncio.get_running_loop()
+        # group creation and the worker registry read use the sync client; keep them off the loop
+        if self.RPC_STREAM not in self._rpc_groups:
+            await loop.run_in_executor(None, self._ensure_rpc_group)
+        hub = self._get_pubsub_hub()
+        entries, blobs = await loop.run_in_executor(None, self._build_node_requests, requests, full_state)
+        pending = {fields["reply_to"]: i for i, fields in enumerate(entries)}
+        results: List[Optional[Dict[str, Any]]] = [None] * len(entries)
+
+        async with hub.subscribe(tuple(pending)) as sub:
+            await sub.wait_ready() # no worker can reply before we are listening
+            pipe = hub.client.pipeline(transaction=False)
+            self._queue_node_requests(pipe, entries, blobs)
+            await pipe.execute()
+            deadline = asyncio.get_running_loop().time() + timeout
+            while pending:
+                msg = await self._next_message(sub, deadline)
+                if msg is None:
+                    break
+                index = pending.pop(msg.get("channel"), None)
+                if index is not None:
+                    results[index] = msg.get("payload")
+
+        done_keys = [fields["reply_to"] for fields, r in zip(entries, results) if r is not None]
+        pipe = hub.client.pipeline(transaction=False)
+        for key in pending: # a missed notification still leaves the durable result key behind
+            pipe.lpop(key)
+        if done_keys:
+            pipe.delete(*done_keys)
+        late = await pipe.execute()
+        for key, data in zip(list(pending), late):
+            if data:
+                results[pending.pop(key)] = self.codec.decode(data)
+        if pending:
+            logger.warning(f"⏱️ {len(pending)}/{len(entries)} remote node call(s) timed out after {timeout}s")
+        return results
+
+    def fetch_node_tasks(self, consumer: str, count: int = 1, block_ms: int = 1000) -> List[Dict[str, Any]]:
+        inbox = self._inbox_stream(consumer)
+        self._ensure_rpc_group()
+        self._ensure_rpc_group(inbox)
+        entries = []
+        for stream in (inbox, self.RPC_STREAM):
+            if len(entries) >= count:
+                break
+            try:
+                claimed = self.client.xautoclaim(stream, self.RPC_GROUP, consumer, min_idle_time=int(settings.MQ_RPC_CLAIM_IDLE * 1000),
+                                                 start_id="0-0", count=count - len(entries))
+            except redis.ResponseError as e:
+                logger.debug(f"XAUTOCLAIM unavailable on {stream}: {e}")
+                continue
+            reclaimed = [(stream, entry_id, fields) for entry_id, fields in claimed[1] if fields]
+            if reclaimed:
+                logger.info(f"♻️ Reclaimed {len(reclaimed)} stalled node request(s) from {stream} for {consumer}")
+                entries += self._drop_poison_entries(self._drop_finished_entries(reclaimed))
+        if not entries:
+            # own inbox first (affinity-routed requests), then only the remainder from the shared stream,
+            # so one call never returns more than count requests; block only when the inbox was empty
+            entries = self._read_rpc_streams(consumer, {inbox: ">"}, count, None)
+            if len(entries) < count:
+                entries += self._read_rpc_streams(consumer, {self.RPC_STREAM: ">"}, count - len(entries),
+                                                  None if entries else block_ms)
+            # first delivery here, but a rehomed request may already have been delivered elsewhere
+            carried = [e for e in entries if "deliveries" in e[2]]
+            if carried:
+                kept = {e[1] for e in self._drop_poison_entries(carried)}
+                entries = [e for e in entries if "deliveries" not in e[2] or e[1] in kept]
+
+        tasks = []
+        for stream, entry_id, fields in entries:
+            try:
+                task = {"id": fields["id"], "node": fields["node"], "state": self._receive_state(fields),
+                        "reply_to": fields["reply_to"], "entry_id": entry_id, "stream": stream}
+            except (KeyError, TypeError, ValueError) as e:
+                logger.error(f"Dropping malformed node request {entry_id}: {e}")
+                self.client.xack(stream, self.RPC_GROUP, entry_id)
+                continue
+            if task["state"] is None:
+                logger.warning(f"State base {fields['state_base']} unavailable for {entry_id}; asking for a full resend")
+                self.complete_node_task(task, {"status": "state_miss", "error": "state base unavailable"})
+                continue
+            tasks.append(task)
+        return tasks
+
+    def _read_rpc_streams(self, consumer: str, streams: Dict[str, str], count: int, block_ms: Optional[int]) -> List[Tuple[str, str, Dict[str, str]]]:
+        try:
+            response = self.client.xreadgroup(self.RPC_GROUP, consumer, streams, count=count, block=block_ms)
+        except redis.ResponseError as e:
+            if "NOGROUP" not in str(e) and "requires the key to exist" not in str(e):
+                raise
+            # the inbox was rehomed (renamed away with its group) while this worker looked offline
+            logger.warning(f"Consumer group missing on {', '.join(streams)}; recreating it")
+            for stream in streams:
+                self._rpc_groups.discard(stream)
+                self._ensure_rpc_group(stream)
+            response = self.client.xreadgroup(self.RPC_GROUP, consumer, streams, count=count, block=block_ms)
+        return [(stream, entry_id, fields) for stream, items in (response or []) for entry_id, fields in items]
+
+    def _receive_state(self, fields: Dict[str, str]) -> Optional[Dict[str, Any]]:
+        """Rebuild a request's state from a full payload or base snapshot + delta (None if the base is gone)."""
+        if "state" in fields:
+            return self.codec.decode(fields["state"])
+        version = fields["state_base"]
+        base = self._state_cache.get(version)
+        if base is None:
+            blob = self.client.get(f"{self.STATE_PREFIX}{version}")
+            if blob is None:
+                return None
+            base = self.codec.decode(blob)
+            self._state_cache.put(version, base)
+        return restore_state(apply_delta(base, self.codec.decode(fields["state_delta"])))
+
+    def _drop_poison_entries(self, entries: List[Tuple[str, str, Dict[str, str]]]) -> List[Tuple[str, str, Dict[str, str]]]:
+        """Fail requests that were delivered more than MQ_RPC_MAX_DELIVERIES times instead of retrying forever."""
+        alive = []
+        for stream, entry_id, fields in entries:
+            info = self.client.xpending_range(stream, self.RPC_GROUP, min=entry_id, max=entry_id, count=1)
+            deliveries = (info[0]["times_delivered"] if info else 0) + int(fields.get("deliveries", 0))
+            if deliveries > settings.MQ_RPC_MAX_DELIVERIES:
+                logger.error(f"☠️ Node request {entry_id} exceeded {settings.MQ_RPC_MAX_DELIVERIES} deliveries. Failing it.")
+                self.complete_node_task({"entry_id": entry_id, "reply_to": fields.get("reply_to"), "stream": stream},
+                                        {"error": "max deliveries exceeded", "status": "failed"})
+            else:
+                alive.append((stream, entry_id, fields))
+        return alive
+
+    def _drop_finished_entries(self, entries: List[Tuple[str, str, Dict[str, str]]]) -> List[Tuple[str, str, Dict[str, str]]]:
+        """Ack reclaimed requests a slow worker already answered instead of running them again."""
+        if not entries:
+            return entries
+        done = self.client.mget([self._done_key(fields.get("reply_to")) for _, _, fields in entries])
+        for (stream, entry_id, _), marker in zip(entries, done):
+            if marker:
+                logger.info(f"Node request {entry_id} was already answered; acking the stale delivery")
+                self._ack_node_task(self.client, stream, entry_id)
+        return [entry for entry, marker in zip(entries, done) if not marker]
+
+    def _done_key(self, reply_to: Optional[str]) -> str:
+        return f"{self.RPC_DONE_PREFIX}{reply_to}"
+
+    def _ack_node_task(self, pipe, stream: str, entry_id: str):
+        pipe.xack(stream, self.RPC_GROUP, entry_id)
+        if stream != self.RPC_STREAM:
+            pipe.xdel(stream, entry_id) # an inbox only holds unfinished work (see _rehome_inbox)
+
+    def complete_node_task(self, request: Dict[str, Any], result: Dict[str, Any]):
+        # the result, its done marker and the ack commit in one MULTI: a crash before it means redelivery,
+        # never a lost reply, and a second completion of a reclaimed request only acks (no duplicate result)
+        stream = request.get("stream", self.RPC_STREAM)
+        reply_to = request.get("reply_to")
+        with self.client.pipeline(transaction=True) as pipe:
+            while True:
+                try:
+                    if reply_to:
+                        pipe.watch(self._done_key(reply_to))
+                        answered = pipe.exists(self._done_key(reply_to))
+                        pipe.multi()
+                        if not answered:
+                            pipe.rpush(reply_to, self.codec.encode(result))
+                            pipe.expire(reply_to, settings.MQ_RPC_RESULT_TTL)
+                            pipe.set(self._done_key(reply_to), 1, ex=settings.MQ_RPC_RESULT_TTL)
+                            # wakes async waiters subscribed to the result key's channel
+                            pipe.publish(reply_to, self._encode_event("Worker", "rpc_result", result))
+                    self._ack_node_task(pipe, stream, request["entry_id"])
+                    pipe.execute()
+                    return
+                except redis.WatchError:
+                    continue
+
+    def renew_node_tasks(self, consumer: str, requests: List[Dict[str, Any]]):
+        by_stream: Dict[str, List[str]] = {}
+        for r in requests:
+            by_stream.setdefault(r.get("stream", self.RPC_STREAM), []).append(r["entry_id"])
+        for stream, entry_ids in by_stream.items():
+            # XCLAIM with idle 0 resets the idle timer so XAUTOCLAIM leaves them alone
+            self.client.xclaim(stream, self.RPC_GROUP, consumer, min_idle_time=0, message_ids=entry_ids, justid=True)
 
     def announce_presence(self, swarm_id: str, capabilities: List[str]):
         self.publish_event("gortex:galactic:discovery", "Master", "swarm_online", {"swarm_id": swarm_id, "capabilities": capabilities})
@@ -316,7 +1518,8 @@ class GortexMessageBus(BaseMessageBus):
                 self._impl = RedisMessageBus(url=settings.REDIS_URL)
             except Exception as e:
                 logger.warning(f"⚠️ Failed to initialize RedisMessageBus: {e}. Falling back to LocalMessageBus.")
-                self._impl = LocalMessageBus()
+                # other nodes' invalidations only travel over Redis, so a local LRU here would serve stale reads
+                self._impl = LocalMessageBus(cache_storage=False)
         else:
             self._impl = LocalMessageBus()
 
@@ -338,8 +1541,11 @@ class GortexMessageBus(BaseMessageBus):
                 return False
         return False
 
-    def publish_event(self, channel: str, agent: str, event_type: str, payload: Dict[str, Any]):
-        self._impl.publish_event(channel, agent, event_type, payload)
+    def publish_event(self, channel: str, agent: str, event_type: str, payload: Dict[str, Any], sync: bool = False):
+        self._impl.publish_event(channel, agent, event_type, payload, sync=sync)
+
+    def flush(self):
+        self._impl.flush()
 
     def stream_thought(self, agent: str, thought: str):
         self._impl.stream_thought(agent, thought)
@@ -350,8 +1556,17 @@ class GortexMessageBus(BaseMessageBus):
     def log_remote_event(self, agent: str, event: str, payload: Dict[str, Any]):
         self._impl.log_remote_event(agent, event, payload)
 
-    def enqueue_task(self, queue_name: str, task_data: Dict[str, Any]):
-        self._impl.enqueue_task(queue_name, task_data)
+    def enqueue_task(self, queue_name: str, task_data: Dict[str, Any], priority: int = 0, timeout: Optional[float] = 0) -> bool:
+        return self._impl.enqueue_task(queue_name, task_data, priority, timeout)
+
+    def dequeue_task(self, queue_name: str, timeout: Optional[float] = 0) -> Optional[Dict[str, Any]]:
+        return self._impl.dequeue_task(queue_name, timeout)
+
+    async def dequeue_task_async(self, queue_name: str, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        return await self._impl.dequeue_task_async(queue_name, timeout)
+
+    def queue_size(self, queue_name: str) -> int:
+        return self._impl.queue_size(queue_name)
 
     def acquire_lock(self, lock_name: str, timeout: int = 10) -> bool:
         return self._impl.acquire_lock(lock_name, timeout)
@@ -362,10 +1577,25 @@ class GortexMessageBus(BaseMessageBus):
     def listen(self, channel: str, callback: Callable[[Dict[str, Any]], None]):
         self._impl.listen(channel, callback)
 
+    def subscribe(self, *channels: str) -> Subscription:
+        return self._impl.subscribe(*channels)
+
+    def add_listener(self, channels: Tuple[str, ...], callback: Callable[[Dict[str, Any]], None]) -> Listener:
+        return self._impl.add_listener(channels, callback)
+
+    def shutdown(self):
+        self._impl.shutdown()
+
     # --- Delegations for Distributed Methods ---
+    def register_worker(self, stats: Dict[str, Any]):
+        return self._impl.register_worker(stats)
+
     def list_active_workers(self) -> List[Dict[str, Any]]:
         return self._impl.list_active_workers()
 
+    def reap_stale_workers(self) -> List[str]:
+        return self._impl.reap_stale_workers()
+
     def select_best_worker(self, required_cpu: float = 20.0) -> Optional[str]:
         return self._impl.select_best_worker(required_cpu)
 
@@ -378,9 +1608,31 @@ class GortexMessageBus(BaseMessageBus):
     def call_remote_nodes_parallel(self, requests: List[Tuple[str, Dict[str, Any]]], timeout: int = 120) -> List[Dict[str, Any]]:
         return self._impl.call_remote_nodes_parallel(requests, timeout)
 
+    async def auction_task_async(self, node_name: str, state: Dict[str, Any], timeout: int = 5) -> Optional[str]:
+        return await self._impl.auction_task_async(node_name, state, timeout)
+
+    async def call_remote_node_async(self, node_name: str, state: Dict[str, Any], timeout: int = 120) -> Optional[Dict[str, Any]]:
+        return await self._impl.call_remote_node_async(node_name, state, timeout)
+
+    async def call_remote_nodes_parallel_async(self, requests: List[Tuple[str, Dict[str, Any]]], timeout: int = 120) -> List[Dict[str, Any]]:
+        return await self._impl.call_remote_nodes_parallel_async(requests, timeout)
+
+    def reply_bid(self, reply_to: str, bid: Dict[str, Any]):
+        self._impl.reply_bid(reply_to, bid)
+
     def announce_presence(self, swarm_id: str, capabilities: List[str]):
         self._impl.announce_presence(swarm_id, capabilities)
 
+    def fetch_node_tasks(self, consumer: str, count: int = 1, block_ms: int = 1000) -> List[Dict[str, Any]]:
+        return self._impl.fetch_node_tasks(consumer, count, block_ms)
+
+    def complete_node_task(self, request: Dict[str, Any], result: Dict[str, Any]):
+        self._impl.complete_node_task(request, result)
+
+    def renew_node_tasks(self, consumer: str, requests: List[Dict[str, Any]]):
+        self._impl.renew_node_tasks(consumer, requests)
+
 
 # 글로벌 인스턴스
 mq_bus = GortexMessageBus()
+atexit.register(mq_bus.shutdown)
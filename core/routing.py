@@ -0,0 +1,55 @@
+import bisect
+import hashlib
+from typing import Callable, Iterable, List, Optional, Tuple
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.md5(key.encode("utf-8")).digest()[:8], "big")
+
+
+class ConsistentHashRing:
+    """
+    Consistent hash ring over worker ids with virtual nodes, so adding or losing a worker
+    only moves the keys that hashed to it.
+    """
+    def __init__(self, nodes: Iterable[str] = (), replicas: int = 64):
+        self.replicas = replicas
+        self._ring: List[Tuple[int, str]] = []
+        self.nodes = set()
+        for node in nodes:
+            self.add(node)
+
+    def add(self, node: str):
+        if node in self.nodes:
+            return
+        self.nodes.add(node)
+        for i in range(self.replicas):
+            bisect.insort(self._ring, (_hash(f"{node}#{i}"), node))
+
+    def remove(self, node: str):
+        self.nodes.discard(node)
+        self._ring = [point for point in self._ring if point[1] != node]
+
+    def preference(self, key: str) -> List[str]:
+        """Distinct nodes in ring order starting at key's position (the first is key's owner)."""
+        if not self._ring:
+            return []
+        start = bisect.bisect(self._ring, (_hash(key), ""))
+        ordered = []
+        for i in range(len(self._ring)):
+            node = self._ring[(start + i) % len(self._ring)][1]
+            if node not in ordered:
+                ordered.append(node)
+                if len(ordered) == len(self.nodes):
+                    break
+        return ordered
+
+    def route(self, key: str, saturated: Callable[[str], bool], max_hops: int = 3) -> Optional[str]:
+        """
+        Owner of key, or the next node along the ring when it is saturated (bounded-load
+        spillover). None if the first max_hops candidates are all saturated.
+        """
+        for node in self.preference(key)[:max_hops]:
+            if not saturated(node):
+                return node
+        return None
@@ -0,0 +1,96 @@
+import hashlib
+import json
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+# A snapshot is the graph state with every value pre-serialized to canonical JSON:
+#   {"values": {key: json}, "lists": {key: [item json, ...]}}
+# List values are kept item by item so an append-only history (messages, logs)
+# diffs to just its new tail. Snapshots are plain strings, so cached copies can
+# never be mutated by the node that consumes the restored state.
+
+
+def _dump(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, sort_keys=True)
+
+
+def snapshot_state(state: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    values, lists = {}, {}
+    for key, value in state.items():
+        if isinstance(value, (list, tuple)):
+            lists[key] = [_dump(item) for item in value]
+        else:
+            values[key] = _dump(value)
+    return {"values": values, "lists": lists}
+
+
+def restore_state(snapshot: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    state = {key: json.loads(value) for key, value in snapshot["values"].items()}
+    for key, items in snapshot["lists"].items():
+        state[key] = [json.loads(item) for item in items]
+    return state
+
+
+def state_version(snapshot: Dict[str, Dict[str, Any]]) -> str:
+    """Content address of a snapshot."""
+    return hashlib.sha1(_dump(snapshot).encode("utf-8")).hexdigest()[:20]
+
+
+def snapshot_size(snapshot: Dict[str, Dict[str, Any]]) -> int:
+    return sum(map(len, snapshot["values"].values())) + sum(len(i) for items in snapshot["lists"].values() for i in items)
+
+
+def diff_snapshots(base: Dict[str, Dict[str, Any]], new: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Changes that turn base into new: set/unset plain values, append to or replace lists."""
+    delta = {"set": {}, "unset": [], "append": {}, "lists": {}}
+    for key, value in new["values"].items():
+        if base["values"].get(key) != value:
+            delta["set"][key] = value
+    for key, items in new["lists"].items():
+        old = base["lists"].get(key)
+        if old == items:
+            continue
+        if old is not None and len(old) <= len(items) and items[:len(old)] == old:
+            delta["append"][key] = items[len(old):]
+        else:
+            delta["lists"][key] = items
+    delta["unset"] = [k for k in (*base["values"], *base["lists"]) if k not in new["values"] and k not in new["lists"]]
+    return delta
+
+
+def delta_size(delta: Dict[str, Any]) -> int:
+    return (sum(map(len, delta["set"].values()))
+            + sum(len(i) for part in ("append", "lists") for items in delta[part].values() for i in items))
+
+
+def apply_delta(base: Dict[str, Dict[str, Any]], delta: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    values = {k: v for k, v in base["values"].items() if k not in delta["unset"]}
+    lists = {k: v for k, v in base["lists"].items() if k not in delta["unset"]}
+    for key, value in delta["set"].items():
+        lists.pop(key, None)
+        values[key] = value
+    for key, items in delta["lists"].items():
+        values.pop(key, None)
+        lists[key] = items
+    for key, items in delta["append"].items():
+        lists[key] = lists.get(key, []) + items
+    return {"values": values, "lists": lists}
+
+
+class SnapshotCache:
+    """Small LRU of snapshots keyed by content address."""
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._items: "OrderedDict[str, Dict[str, Dict[str, Any]]]" = OrderedDict()
+
+    def get(self, version: str) -> Optional[Dict[str, Dict[str, Any]]]:
+        snapshot = self._items.get(version)
+        if snapshot is not None:
+            self._items.move_to_end(version)
+        return snapshot
+
+    def put(self, version: str, snapshot: Dict[str, Dict[str, Any]]):
+        self._items[version] = snapshot
+        self._items.move_to_end(version)
+        while len(self._items) > self.maxsize:
+            self._items.popitem(last=False)
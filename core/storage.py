@@ -1,16 +1,20 @@
 from abc import ABC, abstractmethod
-from typing import Optional, List, Any
+from typing import Optional, List, Any, Dict, Iterable, Iterator, Tuple, Union
 import time
 import os
 import sqlite3
 import glob
 import logging
+import threading
+from collections import OrderedDict
 
 try:
     import redis
 except ImportError:
     redis = None
 
+from gortex.config.settings import settings
+
 logger = logging.getLogger("Storage")
 
 class StorageProvider(ABC):
@@ -30,6 +34,103 @@ class StorageProvider(ABC):
     def keys(self, pattern: str) -> List[str]:
         pass
 
+    @abstractmethod
+    def mget(self, keys: Iterable[str]) -> List[Optional[str]]:
+        """Values for keys in the same order (None for missing or expired keys)."""
+        pass
+
+    @abstractmethod
+    def mset(self, mapping: Dict[str, str], ex: Union[int, Dict[str, int], None] = None) -> bool:
+        """Sets every key in mapping; ex is one TTL for all keys or a per-key TTL dict."""
+        pass
+
+    @abstractmethod
+    def delete_many(self, keys: Iterable[str]) -> None:
+        pass
+
+    @abstractmethod
+    def scan_iter(self, pattern: str, count: int = 500) -> Iterator[str]:
+        """Like keys(), but yields matches in batches of about count instead of building one list."""
+        pass
+
+
+def _ttl_for(ex: Union[int, Dict[str, int], None], key: str) -> Optional[int]:
+    return ex.get(key) if isinstance(ex, dict) else ex
+
+
+def _new_sweep_stats() -> Dict[str, Any]:
+    return {"runs": 0, "reclaimed": 0, "last_reclaimed": 0, "vacuumed_pages": 0, "last_run": None}
+
+
+def _record_sweep(stats: Dict[str, Any], reclaimed: int, vacuumed: int = 0):
+    stats["runs"] += 1
+    stats["reclaimed"] += reclaimed
+    stats["last_reclaimed"] = reclaimed
+    stats["vacuumed_pages"] += vacuumed
+    stats["last_run"] = time.time()
+    if reclaimed:
+        logger.debug(f"Swept {reclaimed} expired keys ({vacuumed} pages vacuumed)")
+
+
+def _prefix_successor(prefix: str) -> Optional[str]:
+    """Smallest string greater than every string starting with prefix (None if there is none)."""
+    while prefix:
+        code = ord(prefix[-1]) + 1
+        if 0xD800 <= code <= 0xDFFF: # surrogates cannot be stored as UTF-8
+            code = 0xE000
+        if code <= 0x10FFFF:
+            return prefix[:-1] + chr(code)
+        prefix = prefix[:-1]
+    return None
+
+
+def _glob_to_sql(pattern: str) -> Tuple[str, List[str]]:
+    """
+    Compiles a Redis glob into a WHERE clause on kv.key.
+    The literal prefix becomes a primary-key range (key >= prefix AND key < successor), so
+    "gortex:workers:*" is an index range scan instead of a table scan. Whatever follows the
+    prefix, unless it is a single trailing *, is checked with GLOB, which has Redis semantics
+    (case-sensitive, ?, [a-z], [^x]). GLOB has no escape character, so an escaped wildcard becomes a one-character class ([*]).
+    """
+    prefix, glob = [], []
+    wildcard_at = None # index in pattern of the first unescaped wildcard
+    i = 0
+    while i < len(pattern):
+        ch = pattern[i]
+        if ch == "\\" and i + 1 < len(pattern):
+            i += 1
+            ch = pattern[i]
+            glob.append(f"[{ch}]" if ch in "*?[" else ch)
+        else:
+            glob.append(ch)
+            if ch in "*?[" and wildcard_at is None:
+                wildcard_at = i
+        if wildcard_at is None:
+            prefix.append(ch)
+        i += 1
+
+    prefix = "".join(prefix)
+    if wildcard_at is None:
+        return "key = ?", [prefix]
+    clauses, params = [], []
+    if prefix:
+        clauses.append("key >= ?")
+        params.append(prefix)
+        successor = _prefix_successor(prefix)
+        if successor is not None:
+            clauses.append("key < ?")
+            params.append(successor)
+    if pattern[wildcard_at:] != "*":
+        clauses.append("key GLOB ?")
+        params.append("".join(glob))
+    return " AND ".join(clauses) or "1", params
+
+
+def _chunks(items: List[str], size: int = 500) -> Iterator[List[str]]:
+    # SQLite limits bound parameters per statement; Redis commands stay reasonably sized
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
 class RedisStorage(StorageProvider):
     def __init__(self, client=None, url: str = "redis://localhost:6379/0"):
         if client:
@@ -52,14 +153,93 @@ class RedisStorage(StorageProvider):
     def keys(self, pattern: str) -> List[str]:
         return self.client.keys(pattern)
 
+    def mget(self, keys: Iterable[str]) -> List[Optional[str]]:
+        keys = list(keys)
+        return list(self.client.mget(keys)) if keys else []
+
+    def mset(self, mapping: Dict[str, str], ex: Union[int, Dict[str, int], None] = None) -> bool:
+        if not mapping:
+            return True
+        if not ex:
+            return bool(self.client.mset(mapping))
+        # MSET has no TTL, so pipeline SET EX: still one round trip
+        pipe = self.client.pipeline(transaction=False)
+        for key, value in mapping.items():
+            pipe.set(key, value, ex=_ttl_for(ex, key))
+        pipe.execute()
+        return True
+
+    def delete_many(self, keys: Iterable[str]) -> None:
+        for chunk in _chunks(list(keys)):
+            self.client.delete(*chunk)
+
+    def scan_iter(self, pattern: str, count: int = 500) -> Iterator[str]:
+        return self.client.scan_iter(match=pattern, count=count)
+
 class SqliteStorage(StorageProvider):
-    def __init__(self, db_path: str = ".gortex/storage.db"):
+    """
+    SQLite-backed KV store shared by the bus, LTM sync, persistence and memory writers.
+    Each thread gets its own connection in WAL mode, so readers never wait for writers and
+    writers only serialize on SQLite's single write lock (busy_timeout instead of errors).
+    Statements are constant SQL strings, so they are compiled once per connection by
+    sqlite3's statement cache.
+
+    Expired rows are dropped lazily on read and, so keys that are never read again do not
+    pile up, by a background sweeper every sweep_interval seconds (see sweep_expired).
+    """
+    def __init__(self, db_path: str = ".gortex/storage.db", sweep_interval: Optional[float] = None):
         self.db_path = db_path
         os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
-        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._local = threading.local()
+        self._connections: List[tuple] = [] # (owner thread, connection)
+        self._conn_lock = threading.Lock()
+        self.sweep_interval = settings.STORAGE_SWEEP_INTERVAL if sweep_interval is None else sweep_interval
+        self.sweep_batch = settings.STORAGE_SWEEP_BATCH
+        self.vacuum_pages = settings.STORAGE_VACUUM_PAGES
+        self.sweep_stats = _new_sweep_stats()
         self._init_db()
+        self._sweep_stop = threading.Event()
+        self._sweeper = None
+        if self.sweep_interval > 0:
+            self._sweeper = threading.Thread(target=self._sweep_loop, name="storage-sweeper", daemon=True)
+            self._sweeper.start()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """Connection of the calling thread (opened on first use)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=10.0, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL") # WAL + NORMAL: durable on checkpoint, no fsync per commit
+            self._local.conn = conn
+            with self._conn_lock:
+                # connections of finished threads (e.g. recycled executor workers) are closed here
+                alive = []
+                for thread, other in self._connections:
+                    if thread.is_alive():
+                        alive.append((thread, other))
+                    else:
+                        other.close()
+                alive.append((threading.current_thread(), conn))
+                self._connections = alive
+        return conn
+
+    def close(self):
+        self._sweep_stop.set()
+        if self._sweeper is not None and self._sweeper is not threading.current_thread():
+            self._sweeper.join(timeout=5)
+        with self._conn_lock:
+            for _, conn in self._connections:
+                conn.close()
+            self._connections = []
+        self._local = threading.local()
 
     def _init_db(self):
+        if self.vacuum_pages > 0 and self.conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+            # incremental_vacuum only works once auto_vacuum=INCREMENTAL; an existing file needs one full VACUUM to switch
+            self.conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            self.conn.execute("VACUUM")
         with self.conn:
             self.conn.execute("""
                 CREATE TABLE IF NOT EXISTS kv (
@@ -68,19 +248,45 @@ class SqliteStorage(StorageProvider):
                     expires_at REAL
                 )
             """)
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_kv_expires_at ON kv (expires_at)")
 
-    def _cleanup_expired(self, key: str):
-        # Lazy check helper: if key exists but expired, delete it.
-        # This is a bit specific to 'get', but we do it inside get query usually.
-        # Here we just do it proactively if we can, but simpler to check on access.
-        pass
+    def _sweep_loop(self):
+        while not self._sweep_stop.wait(self.sweep_interval):
+            try:
+                self.sweep_expired()
+            except sqlite3.Error as e:
+                logger.warning(f"Expired key sweep failed: {e}")
+
+    def sweep_expired(self, max_batches: Optional[int] = None) -> int:
+        """
+        Deletes expired rows, sweep_batch at a time, each batch in its own short transaction
+        so concurrent writers only wait for one batch. Returns the number of rows reclaimed.
+        """
+        conn = self.conn
+        reclaimed, batches = 0, 0
+        while max_batches is None or batches < max_batches:
+            with conn:
+                cursor = conn.execute("""
+                    DELETE FROM kv WHERE key IN (
+                        SELECT key FROM kv WHERE expires_at IS NOT NULL AND expires_at < ? LIMIT ?
+                    )
+                """, (time.time(), self.sweep_batch))
+            reclaimed += cursor.rowcount
+            batches += 1
+            if cursor.rowcount < self.sweep_batch:
+                break
+
+        vacuumed = 0
+        if reclaimed and self.vacuum_pages > 0:
+            free_before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            conn.execute(f"PRAGMA incremental_vacuum({int(self.vacuum_pages)})").fetchall() # runs one page per row
+            vacuumed = free_before - conn.execute("PRAGMA freelist_count").fetchone()[0]
+        _record_sweep(self.sweep_stats, reclaimed, vacuumed)
+        return reclaimed
 
     def get(self, key: str) -> Optional[str]:
         now = time.time()
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT value, expires_at FROM kv WHERE key = ?", (key,))
-        row = cursor.fetchone()
-        
+        row = self.conn.execute("SELECT value, expires_at FROM kv WHERE key = ?", (key,)).fetchone()
         if row:
             val, expires_at = row
             if expires_at and expires_at < now:
@@ -92,59 +298,100 @@ class SqliteStorage(StorageProvider):
     def set(self, key: str, value: str, ex: Optional[int] = None, nx: bool = False) -> bool:
         now = time.time()
         expires_at = (now + ex) if ex else None
-        
-        with self.conn:
+        conn = self.conn
+        with conn:
             if nx:
-                # Check existence and expiration
-                cursor = self.conn.cursor()
-                cursor.execute("SELECT expires_at FROM kv WHERE key = ?", (key,))
-                row = cursor.fetchone()
-                if row:
-                    # Exists. Check if expired.
-                    existing_expires = row[0]
-                    if existing_expires and existing_expires < now:
-                        # Expired, so we can overwrite effectively treating it as 'not exist'
-                        # But standard Redis NX might strictly fail if key exists regardless of expiry?
-                        # Redis behavior: if key exists (even if expired but not yet collected), NX fails? 
-                        # Actually Redis expires keys actively or lazily. If it's expired, it's treated as non-existent.
-                        pass 
-                    else:
-                        return False # Exists and valid
-
-            # Upsert or Insert
-            # If NX passed (didn't return False), we insert/replace
-            self.conn.execute("""
-                INSERT OR REPLACE INTO kv (key, value, expires_at)
-                VALUES (?, ?, ?)
-            """, (key, value, expires_at))
+                # Single statement so concurrent connections cannot both win:
+                # inserts, or takes over the key only if the existing entry has expired.
+                cursor = conn.execute("""
+                    INSERT INTO kv (key, value, expires_at) VALUES (?, ?, ?)
+                    ON CONFLICT(key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at
+                    WHERE kv.expires_at IS NOT NULL AND kv.expires_at < ?
+                """, (key, value, expires_at, now))
+                return cursor.rowcount > 0
+            conn.execute("INSERT OR REPLACE INTO kv (key, value, expires_at) VALUES (?, ?, ?)", (key, value, expires_at))
             return True
 
     def delete(self, key: str) -> None:
-        with self.conn:
-            self.conn.execute("DELETE FROM kv WHERE key = ?", (key,))
+        conn = self.conn
+        with conn:
+            conn.execute("DELETE FROM kv WHERE key = ?", (key,))
 
     def keys(self, pattern: str) -> List[str]:
-        # Translate glob pattern to SQL LIKE?
-        # Redis keys use glob-style: *, ?, [].
-        # SQL LIKE uses % and _.
-        # Simple conversion: * -> %
-        sql_pattern = pattern.replace("*", "%").replace("?", "_")
-        
-        # Also clean up expired keys while scanning?
-        # For now, just return valid ones.
+        where, params = _glob_to_sql(pattern)
+        rows = self.conn.execute(f"""
+            SELECT key FROM kv
+            WHERE {where} AND (expires_at IS NULL OR expires_at > ?)
+        """, (*params, time.time()))
+        return [row[0] for row in rows.fetchall()]
+
+    def mget(self, keys: Iterable[str]) -> List[Optional[str]]:
+        keys = list(keys)
         now = time.time()
-        cursor = self.conn.cursor()
-        cursor.execute("""
-            SELECT key FROM kv 
-            WHERE key LIKE ? AND (expires_at IS NULL OR expires_at > ?)
-        """, (sql_pattern, now))
-        return [row[0] for row in cursor.fetchall()]
+        found, expired = {}, []
+        for chunk in _chunks(list(dict.fromkeys(keys))):
+            placeholders = ",".join("?" * len(chunk))
+            rows = self.conn.execute(f"SELECT key, value, expires_at FROM kv WHERE key IN ({placeholders})", chunk)
+            for key, value, expires_at in rows:
+                if expires_at and expires_at < now:
+                    expired.append(key)
+                else:
+                    found[key] = value
+        if expired:
+            self.delete_many(expired)
+        return [found.get(key) for key in keys]
+
+    def mset(self, mapping: Dict[str, str], ex: Union[int, Dict[str, int], None] = None) -> bool:
+        now = time.time()
+        rows = []
+        for key, value in mapping.items():
+            ttl = _ttl_for(ex, key)
+            rows.append((key, value, (now + ttl) if ttl else None))
+        conn = self.conn
+        with conn: # one transaction (one WAL commit) for the whole batch
+            conn.executemany("INSERT OR REPLACE INTO kv (key, value, expires_at) VALUES (?, ?, ?)", rows)
+        return True
+
+    def delete_many(self, keys: Iterable[str]) -> None:
+        conn = self.conn
+        with conn:
+            conn.executemany("DELETE FROM kv WHERE key = ?", [(key,) for key in keys])
+
+    def scan_iter(self, pattern: str, count: int = 500) -> Iterator[str]:
+        # Keyset pagination on the primary key: each page is a short read, so a long scan
+        # never holds one statement open while the caller writes between pages.
+        where, params = _glob_to_sql(pattern)
+        last = ""
+        while True:
+            rows = self.conn.execute(f"""
+                SELECT key FROM kv
+                WHERE {where} AND key > ? AND (expires_at IS NULL OR expires_at > ?)
+                ORDER BY key LIMIT ?
+            """, (*params, last, time.time(), count)).fetchall()
+            for row in rows:
+                yield row[0]
+            if len(rows) < count:
+                return
+            last = rows[-1][0]
 
 class MockStorage(StorageProvider):
     """In-Memory Storage for Testing"""
-    def __init__(self):
+    def __init__(self, sweep_interval: Optional[float] = None):
         self.data = {}
         self.expiry = {}
+        # no thread here: writes sweep expired keys once sweep_interval has passed
+        self.sweep_interval = settings.STORAGE_SWEEP_INTERVAL if sweep_interval is None else sweep_interval
+        self.sweep_stats = _new_sweep_stats()
+        self._next_sweep = time.monotonic() + self.sweep_interval
+
+    def sweep_expired(self, max_batches: Optional[int] = None) -> int:
+        now = time.time()
+        expired = [key for key, expires_at in self.expiry.items() if expires_at < now]
+        for key in expired:
+            self.delete(key)
+        self._next_sweep = time.monotonic() + self.sweep_interval
+        _record_sweep(self.sweep_stats, len(expired))
+        return len(expired)
 
     def get(self, key: str) -> Optional[str]:
         if key in self.expiry and self.expiry[key] < time.time():
@@ -159,7 +406,9 @@ class MockStorage(StorageProvider):
                 pass # Expired, treat as non-existent
             else:
                 return False
-        
+
+        if self.sweep_interval > 0 and time.monotonic() >= self._next_sweep:
+            self.sweep_expired()
         self.data[key] = value
         if ex:
             self.expiry[key] = time.time() + ex
@@ -183,3 +432,199 @@ class MockStorage(StorageProvider):
             if fnmatch.fnmatch(k, pattern):
                 keys.append(k)
         return keys
+
+    def mget(self, keys: Iterable[str]) -> List[Optional[str]]:
+        return [self.get(key) for key in keys]
+
+    def mset(self, mapping: Dict[str, str], ex: Union[int, Dict[str, int], None] = None) -> bool:
+        for key, value in mapping.items():
+            self.set(key, value, ex=_ttl_for(ex, key))
+        return True
+
+    def delete_many(self, keys: Iterable[str]) -> None:
+        for key in keys:
+            self.delete(key)
+
+    def scan_iter(self, pattern: str, count: int = 500) -> Iterator[str]:
+        return iter(self.keys(pattern))
+
+class CachedStorage(StorageProvider):
+    """
+    Read-through, write-through LRU in front of another provider. Only keys under
+    cache_prefixes are cached: the shard and LTM item keys whose writers announce changes on
+    gortex:memory_updates / gortex:memory_sync. bind() subscribes to those channels on first
+    cache use, so a write on another node evicts the local copy. Entries also expire after ttl seconds (or sooner
+    if the key was written with a shorter ex), which bounds staleness if an event is lost.
+    """
+    DEFAULT_PREFIXES = ("gortex:memory:shard:", "gortex:ltm:item:")
+
+    def __init__(self, backend: StorageProvider, maxsize: int = 1024, ttl: float = 30.0,
+                 cache_prefixes: Tuple[str, ...] = DEFAULT_PREFIXES):
+        self.backend = backend
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.cache_prefixes = tuple(cache_prefixes)
+        self.stats = {"hits": 0, "misses": 0, "invalidations": 0}
+        self._items: "OrderedDict[str, Tuple[Optional[str], float]]" = OrderedDict() # key -> (value, deadline)
+        self._lock = threading.Lock()
+        # bumped on every invalidation; a read only fills the cache if no invalidation ran while
+        # it was fetching, so an event racing a read cannot leave the old value cached
+        self._generation = 0
+        self._bus = None
+        self._listener = None
+        self._listener_lock = threading.Lock()
+
+    def __getattr__(self, name):
+        # backend-specific extras (close, sweep_expired, sweep_stats, ...)
+        if name == "backend":
+            raise AttributeError(name)
+        return getattr(self.backend, name)
+
+    def bind(self, bus):
+        """
+        Evicts entries announced as changed on bus (one listener on the bus's shared subscription loop).
+        The listener starts on first cache use, so a bus that never touches cached keys never subscribes.
+        """
+        self.unbind()
+        self._bus = bus
+
+    def unbind(self):
+        """Stops listening for invalidation events."""
+        with self._listener_lock:
+            listener, self._listener, self._bus = self._listener, None, None
+        if listener is not None:
+            listener.close()
+
+    def _listen(self):
+        # runs before anything is cached: an entry may only be filled while invalidations are heard
+        if self._listener is not None or self._bus is None:
+            return
+        with self._listener_lock:
+            if self._listener is None and self._bus is not None:
+                self._listener = self._bus.add_listener(("gortex:memory_updates", "gortex:memory_sync"), self._on_event)
+
+    def _on_event(self, message: Dict[str, Any]):
+        payload = message.get("payload") or {}
+        if message.get("type") == "shard_updated" and payload.get("category"):
+            self.invalidate(f"gortex:memory:shard:{payload['category']}")
+        elif message.get("type") == "ltm_updated" and payload.get("namespace"):
+            prefix = f"gortex:ltm:item:{payload['namespace']}:"
+            if payload.get("op") == "replace" or not payload.get("ids"):
+                self.invalidate_prefix(prefix)
+            else:
+                for item_id in payload["ids"]:
+                    self.invalidate(prefix + str(item_id))
+
+    def _cacheable(self, key: str) -> bool:
+        return key.startswith(self.cache_prefixes)
+
+    def _lookup(self, key: str) -> Tuple[bool, Optional[str]]:
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is None or entry[1] <= time.monotonic():
+                self.stats["misses"] += 1
+                return False, None
+            self._items.move_to_end(key)
+            self.stats["hits"] += 1
+            return True, entry[0]
+
+    def _fill(self, values: Dict[str, Optional[str]], generation: int, ex: Optional[int] = None):
+        deadline = time.monotonic() + (min(self.ttl, ex) if ex else self.ttl)
+        with self._lock:
+            if generation != self._generation:
+                return
+            for key, value in values.items():
+                self._items[key] = (value, deadline)
+                self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def invalidate(self, key: str):
+        with self._lock:
+            self._generation += 1
+            self.stats["invalidations"] += 1
+            self._items.pop(key, None)
+
+    def invalidate_prefix(self, prefix: str):
+        with self._lock:
+            self._generation += 1
+            self.stats["invalidations"] += 1
+            for key in [k for k in self._items if k.startswith(prefix)]:
+                del self._items[key]
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._items.clear()
+
+    def get(self, key: str) -> Optional[str]:
+        if not self._cacheable(key):
+            return self.backend.get(key)
+        self._listen()
+        hit, value = self._lookup(key)
+        if hit:
+            return value
+        generation = self._generation
+        value = self.backend.get(key)
+        self._fill({key: value}, generation)
+        return value
+
+    def set(self, key: str, value: str, ex: Optional[int] = None, nx: bool = False) -> bool:
+        if not self._cacheable(key):
+            return self.backend.set(key, value, ex=ex, nx=nx)
+        self._listen()
+        self.invalidate(key)
+        generation = self._generation
+        ok = self.backend.set(key, value, ex=ex, nx=nx)
+        if ok:
+            self._fill({key: value}, generation, ex)
+        return ok
+
+    def delete(self, key: str) -> None:
+        self.backend.delete(key)
+        if self._cacheable(key):
+            self.invalidate(key)
+
+    def keys(self, pattern: str) -> List[str]:
+        return self.backend.keys(pattern)
+
+    def mget(self, keys: Iterable[str]) -> List[Optional[str]]:
+        keys = list(keys)
+        if any(self._cacheable(key) for key in keys):
+            self._listen()
+        found, missing = {}, []
+        for key in dict.fromkeys(keys):
+            hit, value = self._lookup(key) if self._cacheable(key) else (False, None)
+            if hit:
+                found[key] = value
+            else:
+                missing.append(key)
+        if missing:
+            generation = self._generation
+            fetched = dict(zip(missing, self.backend.mget(missing)))
+            found.update(fetched)
+            self._fill({k: v for k, v in fetched.items() if self._cacheable(k)}, generation)
+        return [found[key] for key in keys]
+
+    def mset(self, mapping: Dict[str, str], ex: Union[int, Dict[str, int], None] = None) -> bool:
+        cached = [key for key in mapping if self._cacheable(key)]
+        if cached:
+            self._listen()
+        for key in cached:
+            self.invalidate(key)
+        generation = self._generation
+        ok = self.backend.mset(mapping, ex=ex)
+        if ok:
+            for key in cached:
+                self._fill({key: mapping[key]}, generation, _ttl_for(ex, key))
+        return ok
+
+    def delete_many(self, keys: Iterable[str]) -> None:
+        keys = list(keys)
+        self.backend.delete_many(keys)
+        for key in keys:
+            if self._cacheable(key):
+                self.invalidate(key)
+
+    def scan_iter(self, pattern: str, count: int = 500) -> Iterator[str]:
+        return self.backend.scan_iter(pattern, count=count)
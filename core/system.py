@@ -5,6 +5,7 @@ import os
 import re
 import json
 import warnings
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 
 from rich.console import Console
@@ -124,10 +125,12 @@ class GortexSystem:
         # Always listen (Local or Distributed)
         from gortex.core.web_api import manager as web_manager, format_event_for_web
         from gortex.core.collaboration import ambassador
+        loop = asyncio.get_running_loop()
 
+        # 핸들러는 executor 스레드에서 실행되므로 코루틴은 루프로 넘겨 예약
         def handle_notification(msg):
             formatted_msg = format_event_for_web(msg)
-            asyncio.create_task(web_manager.broadcast(json.dumps(formatted_msg, ensure_ascii=False)))
+            asyncio.run_coroutine_threadsafe(web_manager.broadcast(json.dumps(formatted_msg, ensure_ascii=False)), loop)
             
             event_type = msg.get("type")
             payload = msg.get("payload", {})
@@ -152,7 +155,7 @@ class GortexSystem:
             
             elif event_type == "trigger_drive":
                 logger.info("⚡ Manual Sovereign Drive triggered by user.")
-                asyncio.create_task(self.autonomous_drive_loop(run_once=True))
+                asyncio.run_coroutine_threadsafe(self.autonomous_drive_loop(run_once=True), loop)
             
             elif event_type == "task_failed":
                 # Handle task failure logging or UI update
@@ -162,13 +165,6 @@ class GortexSystem:
                 self.ui.add_security_event("CRITICAL", f"Blocked {agent}")
                 self.state["last_security_alert"] = payload
 
-        loop = asyncio.get_running_loop()
-        loop.run_in_executor(None, mq_bus.listen, "gortex:notifications", handle_notification)
-        loop.run_in_executor(None, mq_bus.listen, "gortex:thought_stream", handle_notification)
-        loop.run_in_executor(None, mq_bus.listen, "gortex:security_alerts", handle_notification)
-        loop.run_in_executor(None, mq_bus.listen, "gortex:workspace_sync", self._handle_workspace_sync)
-        loop.run_in_executor(None, mq_bus.listen, "gortex:galactic:wisdom", self._handle_galactic_events)
-        loop.run_in_executor(None, mq_bus.listen, "gortex:galactic:economy", self._handle_galactic_events)
         
         # [GALACTIC GOVERNANCE] 전역 안건 수신 리스너 (v10.2 New)
         def handle_galactic_agendas(msg):
@@ -188,7 +184,35 @@ class GortexSystem:
                 )
                 self.ui.chat_history.append(("system", f"🌌 **전역 안건 투표**: '{title}' 제안에 대해 {'찬성' if audit.get('is_approved') else '반대'} 투표를 행사했습니다."))
 
-        loop.run_in_executor(None, mq_bus.listen, "gortex:galactic:agendas", handle_galactic_agendas)
+        handlers = {
+            "gortex:notifications": handle_notification,
+            "gortex:thought_stream": handle_notification,
+            "gortex:security_alerts": handle_notification,
+            "gortex:workspace_sync": self._handle_workspace_sync,
+            "gortex:galactic:wisdom": self._handle_galactic_events,
+            "gortex:galactic:economy": self._handle_galactic_events,
+            "gortex:galactic:agendas": handle_galactic_agendas,
+        }
+        def dispatch(handler, msg):
+            try:
+                handler(msg)
+            except Exception as e:
+                logger.error(f"Notification handler error on {msg.get('channel')}: {e}")
+
+        # 모든 채널을 하나의 비동기 구독으로 다중화 (채널별 스레드 없음).
+        # 동기 핸들러(refresh_graph, register_custom_model 등)는 이벤트 루프를 막지 않도록
+        # 단일 워커 executor에서 도착 순서대로 실행하고, LLM 검토는 기본 executor로 분리
+        dispatcher = ThreadPoolExecutor(max_workers=1, thread_name_prefix="gortex-notify")
+        try:
+            async with mq_bus.subscribe(*handlers) as subscription:
+                async for msg in subscription:
+                    handler = handlers.get(msg.get("channel"))
+                    if handler is handle_galactic_agendas:
+                        loop.run_in_executor(None, dispatch, handler, msg)
+                    elif handler:
+                        loop.run_in_executor(dispatcher, dispatch, handler, msg)
+        finally:
+            dispatcher.shutdown(wait=False)
 
     def _handle_workspace_sync(self, msg):
         if msg.get("type") == "file_changed":
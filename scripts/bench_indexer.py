@@ -0,0 +1,161 @@
+"""
+SynapticIndexer 콜드 스캔 벤치마크.
+합성 프로젝트 트리에서 기존 방식(이중 ast.walk, 단일 프로세스)과
+단일 패스 방문자(직렬/프로세스 풀)를 비교합니다.
+파싱(읽기+AST 분석)과 저장(기존 JSON 덤프 / SQLite 기록)을 따로 측정한 뒤 전체 시간을 보고하며,
+프로세스 풀은 워커가 2개 이상일 때만 측정합니다.
+
+    python -m scripts.bench_indexer --files 5000
+"""
+import argparse
+import ast
+import json
+import os
+import shutil
+import tempfile
+import time
+
+from gortex.config.settings import settings
+from gortex.utils.indexer import SynapticIndexer, _IndexStore
+
+
+def legacy_analyze(tree: ast.AST):
+    """변경 전 _analyze_tree (함수 본문을 한 번 더 순회하며 호출 수집)"""
+    definitions = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.ClassDef):
+            definitions.append({"type": "class", "name": node.name, "bases": [ast.unparse(b) for b in node.bases],
+                                "line": node.lineno, "docstring": ast.get_docstring(node)})
+        elif isinstance(node, ast.FunctionDef):
+            calls = []
+            for subnode in ast.walk(node):
+                if isinstance(subnode, ast.Call):
+                    try:
+                        calls.append(ast.unparse(subnode.func))
+                    except Exception:
+                        pass
+            definitions.append({"type": "function", "name": node.name, "line": node.lineno,
+                                "args": [arg.arg for arg in node.args.args], "calls": list(set(calls)),
+                                "docstring": ast.get_docstring(node)})
+        elif isinstance(node, ast.Import):
+            for alias in node.names:
+                definitions.append({"type": "import", "name": alias.name, "line": node.lineno})
+        elif isinstance(node, ast.ImportFrom):
+            definitions.append({"type": "import_from", "module": node.module,
+                                "names": [alias.name for alias in node.names], "line": node.lineno})
+    return definitions
+
+
+def list_sources(root_dir: str):
+    return [os.path.join(root, file) for root, _, files in os.walk(root_dir) for file in files if file.endswith(".py")]
+
+
+def legacy_parse(root_dir: str, paths):
+    index = {}
+    for full_path in paths:
+        with open(full_path, "r", encoding="utf-8") as f:
+            index[os.path.relpath(full_path, root_dir)] = legacy_analyze(ast.parse(f.read()))
+    return index
+
+
+def legacy_save(index, path: str):
+    """변경 전 _save_index (전체 인덱스를 JSON으로 덤프)"""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False, indent=2)
+
+
+def single_pass_parse(paths, parallel: bool):
+    """현재 파서 (내용 해시 포함), 저장소 기록 없음"""
+    return list(SynapticIndexer._parse_results([(path, None) for path in paths], parallel))
+
+
+def store_results(root_dir: str, paths, results, db_path: str):
+    store = _IndexStore(db_path, os.path.abspath(root_dir))
+    for full_path, (digest, defs, _) in zip(paths, results):
+        stat = os.stat(full_path)
+        store.put_file(os.path.relpath(full_path, root_dir), defs, stat.st_mtime, stat.st_size, digest)
+    store.commit()
+
+
+def make_module(idx: int, classes: int, methods: int) -> str:
+    lines = [f'"""합성 모듈 {idx}"""', "import os", f"from pkg.mod_{max(0, idx - 1)} import helper_{max(0, idx - 1)}", ""]
+    for c in range(classes):
+        lines.append(f"class Widget{idx}_{c}(object):")
+        lines.append(f'    """Widget {c}"""')
+        for m in range(methods):
+            lines.append(f"    def method_{m}(self, x, y=1):")
+            lines.append(f"        total = helper_{max(0, idx - 1)}(x) + len(str(y))")
+            lines.append("        for i in range(x):")
+            lines.append(f"            total += self.method_{(m + 1) % methods}(i) if i % 7 else os.path.join('a', str(i)).count('a')")
+            lines.append("        return max(total, min(x, y))")
+        lines.append("")
+    lines.append(f"def helper_{idx}(value):")
+    lines.append("    return sorted([abs(v) for v in range(value)])")
+    return "\n".join(lines) + "\n"
+
+
+def build_tree(root: str, files: int, classes: int, methods: int):
+    for idx in range(files):
+        package = os.path.join(root, "pkg", f"sub_{idx // 100}")
+        os.makedirs(package, exist_ok=True)
+        with open(os.path.join(package, f"mod_{idx}.py"), "w", encoding="utf-8") as f:
+            f.write(make_module(idx, classes, methods))
+
+
+def timed(label: str, fn):
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed:8.2f}s")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SynapticIndexer cold scan benchmark")
+    parser.add_argument("--files", type=int, default=5000)
+    parser.add_argument("--classes", type=int, default=3)
+    parser.add_argument("--methods", type=int, default=6)
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="gortex_idx_bench_")
+    try:
+        build_tree(root, args.files, args.classes, args.methods)
+        print(f"{args.files} files, {args.classes} classes x {args.methods} methods each (cpu={os.cpu_count()})")
+
+        workers = settings.INDEXER_WORKERS or os.cpu_count() or 1
+        paths = list_sources(root)
+        out = os.path.join(root, "out")
+        os.makedirs(out)
+
+        def fresh_scan(parallel: bool):
+            indexer = SynapticIndexer(root_dir=root)
+            indexer.index_path = os.path.join(out, f"index_{parallel}.db")
+            indexer.scan_project(parallel=parallel)
+
+        results = {}
+        parse = {"legacy": timed("parse: legacy (double walk)", lambda: results.setdefault("legacy", legacy_parse(root, paths))),
+                 "serial": timed("parse: single-pass, serial", lambda: results.setdefault("serial", single_pass_parse(paths, False)))}
+        if workers > 1:
+            parse["pool"] = timed("parse: single-pass, pool", lambda: single_pass_parse(paths, True))
+        else:
+            print(f"{'parse: single-pass, pool':<28} skipped ({workers} worker)")
+        save_legacy = timed("save:  legacy JSON dump", lambda: legacy_save(results["legacy"], os.path.join(out, "index.json")))
+        timed("save:  SQLite store", lambda: store_results(root, paths, results["serial"], os.path.join(out, "store.db")))
+
+        base_total = parse["legacy"] + save_legacy
+        print(f"{'total: legacy (parse + save)':<28} {base_total:8.2f}s")
+        total = {"serial": timed("total: cold scan, serial", lambda: fresh_scan(False))}
+        if workers > 1:
+            total["pool"] = timed("total: cold scan, pool", lambda: fresh_scan(True))
+        warm = SynapticIndexer(root_dir=root)
+        warm.index_path = os.path.join(out, "index_False.db")
+        timed("warm rescan (no changes)", warm.scan_project)
+
+        print("parse speedup vs legacy: " + ", ".join(f"{mode} x{parse['legacy'] / t:.2f}" for mode, t in parse.items() if mode != "legacy"))
+        print("total speedup vs legacy: " + ", ".join(f"{mode} x{base_total / t:.2f}" for mode, t in total.items()))
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
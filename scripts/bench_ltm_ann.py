@@ -0,0 +1,114 @@
+"""
+LongTermMemory 근사 검색(IVF) 벤치마크.
+군집 구조를 가진 합성 벡터에서 정확 검색 대비 recall@k와 p50/p99 지연을 측정합니다.
+인덱스 단독 지연과 함께 LongTermMemory.recall() 전체 경로(캐시 검증, 결과 구성 포함)의 지연도 보고하며,
+이 행의 recall@k는 점수 임계값이 같은 정확 검색 recall() 결과 대비입니다.
+
+    python -m scripts.bench_ltm_ann --sizes 10000,100000,1000000 --dim 128
+"""
+import argparse
+import tempfile
+import time
+from unittest.mock import patch
+import numpy as np
+
+from gortex.utils.vector_store import ShardMatrix, IVFIndex, LongTermMemory
+
+
+def make_vectors(size: int, dim: int, rng: np.random.Generator, clusters: int = 1024, chunk: int = 65536) -> np.ndarray:
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    vectors = np.empty((size, dim), dtype=np.float32)
+    for start in range(0, size, chunk):
+        end = min(size, start + chunk)
+        labels = rng.integers(0, clusters, end - start)
+        vectors[start:end] = centers[labels] + 0.5 * rng.standard_normal((end - start, dim)).astype(np.float32)
+    return vectors
+
+
+def percentile_ms(samples, q: float) -> float:
+    return float(np.percentile(samples, q) * 1000)
+
+
+def run(size: int, dim: int, queries: int, k: int, nprobes, seed: int):
+    rng = np.random.default_rng(seed)
+    matrix = ShardMatrix.from_array(make_vectors(size, dim, rng))
+    picks = rng.integers(0, size, queries)
+    query_set = matrix.vectors[picks] + 0.3 * rng.standard_normal((queries, dim)).astype(np.float32)
+
+    exact, exact_times = [], []
+    for q in query_set:
+        start = time.perf_counter()
+        hits = matrix.top_k(q, k)
+        exact_times.append(time.perf_counter() - start)
+        exact.append({row for _, row in hits})
+    print(f"[{size:>8} x {dim}] exact        recall@{k}=1.000  p50={percentile_ms(exact_times, 50):8.2f}ms  p99={percentile_ms(exact_times, 99):8.2f}ms")
+
+    start = time.perf_counter()
+    index = IVFIndex.build(matrix)
+    print(f"[{size:>8} x {dim}] ivf build    lists={len(index.centroids)}  {time.perf_counter() - start:.1f}s")
+
+    for nprobe in nprobes:
+        found, times = 0, []
+        for q, truth in zip(query_set, exact):
+            start = time.perf_counter()
+            hits = index.search(matrix, q, k, nprobe)
+            times.append(time.perf_counter() - start)
+            found += len(truth & {row for _, row in hits})
+        recall = found / (k * queries)
+        print(f"[{size:>8} x {dim}] ivf nprobe={nprobe:<3} recall@{k}={recall:.3f}  p50={percentile_ms(times, 50):8.2f}ms  p99={percentile_ms(times, 99):8.2f}ms")
+
+    run_recall(matrix.vectors, query_set, k, nprobes)
+
+
+def run_recall(vectors: np.ndarray, query_set: np.ndarray, k: int, nprobes):
+    """
+    LongTermMemory.recall()을 통한 종단 간 지연 (임베딩 API만 질의 벡터로 대체).
+    recall()은 점수가 VECTOR_MIN_SCORE 이하인 결과를 버리므로, 정답은 인덱스 단독 정확 검색이 아니라
+    같은 임계값이 적용된 정확 검색 recall()의 결과입니다.
+    """
+    size, dim = vectors.shape
+    shard = [{"id": str(i), "content": str(i)} for i in range(size)]
+    queries = {f"q{i}": q.tolist() for i, q in enumerate(query_set)}
+    configs = [("exact", size + 1, 1)] + [(f"ivf nprobe={nprobe:<3}", 0, nprobe) for nprobe in nprobes]
+    cutoff = f"score>{LongTermMemory.VECTOR_MIN_SCORE}"
+
+    truth = None
+    with tempfile.TemporaryDirectory() as tmpdir, \
+            patch.object(LongTermMemory, "_get_embedding", side_effect=lambda text: queries[text]), \
+            patch.object(LongTermMemory, "_mark_dirty"):
+        for label, threshold, nprobe in configs:
+            ltm = LongTermMemory(store_dir=tmpdir, ann_threshold=threshold, ann_nprobe=nprobe)
+            ltm._register_loaded_shard("bench", shard, vectors, list(range(size)))
+            ltm.recall("q0", limit=k, namespace="bench") # 워밍업 (IVF 학습/로드)
+
+            found, times = [], []
+            for text in queries:
+                start = time.perf_counter()
+                results = ltm.recall(text, limit=k, namespace="bench")
+                times.append(time.perf_counter() - start)
+                found.append({int(r["content"]) for r in results})
+            truth = found if truth is None else truth # 첫 구성(정확 검색)의 결과가 기준
+            expected = sum(len(t) for t in truth)
+            recall = sum(len(t & f) for t, f in zip(truth, found)) / expected if expected else 1.0
+            print(f"[{size:>8} x {dim}] recall({cutoff}) {label:<13} recall@{k}={recall:.3f}  "
+                  f"hits/query={sum(len(f) for f in found) / len(found):.1f}  "
+                  f"p50={percentile_ms(times, 50):8.2f}ms  p99={percentile_ms(times, 99):8.2f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LTM IVF recall/latency benchmark")
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    parser.add_argument("--dim", type=int, default=128, help="768은 1M에서 약 3GB 메모리 필요")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nprobe", default="4,8,16,32")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    nprobes = [int(n) for n in args.nprobe.split(",")]
+    for size in (int(s) for s in args.sizes.split(",")):
+        run(size, args.dim, args.queries, args.k, nprobes, args.seed)
+
+
+if __name__ == "__main__":
+    main()
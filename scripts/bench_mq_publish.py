@@ -0,0 +1,91 @@
+"""
+RedisMessageBus 이벤트 발행 처리량 벤치마크.
+동기 발행(이벤트당 1 round trip)과 버퍼링 + 파이프라인 발행의 events/sec를 비교합니다.
+--url을 주지 않으면 fakeredis TCP 서버를 로컬에 띄워 실제 소켓 왕복을 측정하며,
+--rtt-ms를 주면 지연 프록시를 앞에 두어 네트워크 왕복 시간을 흉내냅니다.
+
+    python -m scripts.bench_mq_publish --events 20000 --rtt-ms 0.5
+"""
+import argparse
+import socket
+import threading
+import time
+
+from gortex.core.mq import RedisMessageBus
+
+
+def start_fake_server() -> str:
+    from fakeredis import TcpFakeServer
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = TcpFakeServer(("127.0.0.1", port), server_type="redis")
+    server.daemon_threads = True # 연결 처리 스레드가 종료를 막지 않도록
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"redis://127.0.0.1:{port}/0"
+
+
+def _pump(src: socket.socket, dst: socket.socket, delay: float):
+    try:
+        while True:
+            data = src.recv(65536)
+            if not data:
+                break
+            time.sleep(delay)
+            dst.sendall(data)
+    except OSError:
+        pass
+    finally:
+        dst.close()
+
+
+def start_latency_proxy(url: str, rtt_ms: float) -> str:
+    """모든 패킷을 방향마다 rtt/2만큼 지연시켜 전달하는 TCP 프록시"""
+    host, port = url.split("//")[1].split("/")[0].split(":")
+    listener = socket.socket()
+    listener.bind(("127.0.0.1", 0))
+    listener.listen()
+    delay = rtt_ms / 2000
+
+    def accept_loop():
+        while True:
+            client, _ = listener.accept()
+            upstream = socket.create_connection((host, int(port)))
+            for src, dst in ((client, upstream), (upstream, client)):
+                threading.Thread(target=_pump, args=(src, dst, delay), daemon=True).start()
+
+    threading.Thread(target=accept_loop, daemon=True).start()
+    return f"redis://127.0.0.1:{listener.getsockname()[1]}/0"
+
+
+def run(url: str, events: int, window: float, label: str):
+    bus = RedisMessageBus(url=url, batch_window=window)
+    payload = {"text": "x" * 64}
+    start = time.perf_counter()
+    for i in range(events):
+        bus.publish_event("gortex:bench", "Bench", "thought_update", payload)
+    bus.flush()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<24} {events / elapsed:>10.0f} events/sec  ({elapsed:.2f}s)")
+    return events / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RedisMessageBus publish throughput benchmark")
+    parser.add_argument("--url", default=None, help="실제 Redis URL (생략 시 fakeredis TCP 서버)")
+    parser.add_argument("--events", type=int, default=20000)
+    parser.add_argument("--window", type=float, default=0.005)
+    parser.add_argument("--rtt-ms", type=float, default=0.0, help="지연 프록시로 흉내낼 왕복 시간 (ms)")
+    args = parser.parse_args()
+
+    url = args.url or start_fake_server()
+    if args.rtt_ms > 0:
+        url = start_latency_proxy(url, args.rtt_ms)
+    print(f"target: {url}")
+    before = run(url, args.events, 0, "sync (before)")
+    after = run(url, args.events, args.window, f"batched {args.window * 1000:g}ms")
+    print(f"speedup x{after / before:.1f}")
+
+
+if __name__ == "__main__":
+    main()
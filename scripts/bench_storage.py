@@ -0,0 +1,96 @@
+"""
+SqliteStorage 동시 읽기/쓰기 처리량 벤치마크.
+여러 스레드가 읽기/쓰기를 섞어 실행할 때, 기존 방식(공유 연결 1개, 기본 저널)과
+스레드별 WAL 연결의 초당 처리량을 비교합니다.
+
+    python -m scripts.bench_storage --threads 8 --seconds 5 --write-ratio 0.2
+"""
+import argparse
+import os
+import random
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+
+from gortex.core.storage import SqliteStorage
+
+
+class LegacySqliteStorage:
+    """변경 전 SqliteStorage (check_same_thread=False 공유 연결, rollback 저널)"""
+    def __init__(self, db_path: str):
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        with self.conn:
+            self.conn.execute("CREATE TABLE IF NOT EXISTS kv (key TEXT PRIMARY KEY, value TEXT, expires_at REAL)")
+
+    def get(self, key: str):
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT value, expires_at FROM kv WHERE key = ?", (key,))
+        row = cursor.fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, value: str, ex=None, nx=False):
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO kv (key, value, expires_at) VALUES (?, ?, ?)",
+                              (key, value, time.time() + ex if ex else None))
+        return True
+
+    def close(self):
+        self.conn.close()
+
+
+def run(storage, threads: int, seconds: float, write_ratio: float, keyspace: int) -> dict:
+    payload = "x" * 512
+    for i in range(keyspace):
+        storage.set(f"bench:{i}", payload)
+    counts = {"read": 0, "write": 0, "error": 0}
+    lock = threading.Lock()
+    stop = time.perf_counter() + seconds
+
+    def worker(seed: int):
+        rng = random.Random(seed)
+        local = {"read": 0, "write": 0, "error": 0}
+        while time.perf_counter() < stop:
+            key = f"bench:{rng.randrange(keyspace)}"
+            try:
+                if rng.random() < write_ratio:
+                    storage.set(key, payload, ex=3600)
+                    local["write"] += 1
+                else:
+                    storage.get(key)
+                    local["read"] += 1
+            except (sqlite3.Error, SystemError): # the shared connection is not safe under concurrent use
+                local["error"] += 1
+        with lock:
+            for k, v in local.items():
+                counts[k] += v
+
+    pool = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    for t in pool: t.start()
+    for t in pool: t.join()
+    return {k: v / seconds for k, v in counts.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SqliteStorage mixed read/write throughput benchmark")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    parser.add_argument("--keyspace", type=int, default=5000)
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="gortex_storage_bench_")
+    print(f"{args.threads} threads, {args.write_ratio:.0%} writes, {args.seconds:g}s each (cpu={os.cpu_count()})")
+    try:
+        for label, factory in (("shared conn (before)", LegacySqliteStorage), ("per-thread WAL", SqliteStorage)):
+            storage = factory(os.path.join(root, f"{label.split()[0]}.db"))
+            rates = run(storage, args.threads, args.seconds, args.write_ratio, args.keyspace)
+            storage.close()
+            print(f"{label:<22} {rates['read']:>9.0f} reads/s {rates['write']:>8.0f} writes/s  errors {rates['error']:.0f}/s")
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,4 @@
 import asyncio
-import json
 import logging
 import sys
 import os
@@ -11,6 +10,7 @@ import psutil
 sys.path.append(os.getcwd())
 
 from gortex.core.mq import mq_bus
+from gortex.config.settings import settings
 from gortex.agents.researcher import ResearcherAgent
 from gortex.agents.coder import coder_node
 from gortex.agents.analyst import analyst_node
@@ -51,7 +51,16 @@ async def process_research_task(task: dict):
         logger.error(f"Task failed: {e}")
         mq_bus.publish_event("gortex:notifications", "Worker", "task_failed", {"task_id": task_id, "error": str(e)})
 
-async def process_node_execution(request: dict):
+async def renew_while_running(worker_id: str, request: dict):
+    """실행 중인 요청이 다른 워커에게 회수되지 않도록 주기적으로 소유권 갱신"""
+    while True:
+        await asyncio.sleep(max(1.0, settings.MQ_RPC_CLAIM_IDLE / 3))
+        try:
+            mq_bus.renew_node_tasks(worker_id, [request])
+        except Exception as e:
+            logger.warning(f"Failed to renew request {request['id']}: {e}")
+
+async def process_node_execution(request: dict, worker_id: str):
     """원격 노드 실행 요청 처리 (v4.0 Alpha)"""
     node_name = request["node"]
     state = request["state"]
@@ -59,6 +68,9 @@ async def process_node_execution(request: dict):
     request_id = request["id"]
     
     logger.info(f"⚡ Executing remote node: {node_name} (Req: {request_id})")
+    keepalive = asyncio.create_task(renew_while_running(worker_id, request))
+    global active_tasks
+    active_tasks += 1
     
     # [STREAMING] 실행 시작 알림
     mq_bus.stream_thought(node_name, f"Starting remote execution for request {request_id}...")
@@ -82,19 +94,23 @@ async def process_node_execution(request: dict):
         global total_tasks_done
         total_tasks_done += 1
             
-        # 2. 결과 전송 (Pub/Sub)
-        mq_bus.client.publish(reply_channel, json.dumps(result, ensure_ascii=False))
+        # 2. 결과 저장 후 ACK (요청별 결과 키)
+        mq_bus.complete_node_task(request, result)
         logger.info(f"✅ Remote node '{node_name}' finished. Result sent to {reply_channel}")
         
     except Exception as e:
         logger.error(f"❌ Remote node execution failed: {e}")
         mq_bus.log_remote_event(node_name, "error", {"request_id": request_id, "error": str(e)})
-        mq_bus.client.publish(reply_channel, json.dumps({"error": str(e), "status": "failed"}))
+        mq_bus.complete_node_task(request, {"error": str(e), "status": "failed"})
+    finally:
+        keepalive.cancel()
+        active_tasks -= 1
 
 
 # ... (기존 임포트 하단)
 
 total_tasks_done = 0
+active_tasks = 0 # 마스터의 친화도 라우팅이 포화 여부 판단에 사용
 
 async def send_heartbeat(worker_id: str):
     """주기적으로 워커의 건강 상태를 Redis에 보고함"""
@@ -105,16 +121,19 @@ async def send_heartbeat(worker_id: str):
                 "status": "online",
                 "cpu_percent": psutil.cpu_percent(),
                 "memory_percent": psutil.virtual_memory().percent,
-                "active_tasks": 0, 
+                "active_tasks": active_tasks,
                 "total_tasks_done": total_tasks_done, # 기여도 추가
                 "last_seen": time.time(),
                 "hostname": os.uname().nodename if hasattr(os, "uname") else "unknown"
             }
-            mq_bus.client.set(f"gortex:workers:{worker_id}", json.dumps(stats), ex=15)
+            mq_bus.register_worker(stats)
             logger.debug(f"💓 Heartbeat sent for {worker_id}")
+            # 하트비트가 끊긴 다른 워커의 인박스를 공유 스트림으로 회수 (조회 경로에서 분리)
+            for stale_id in mq_bus.reap_stale_workers():
+                logger.info(f"🧹 Reaped offline worker {stale_id}")
         except Exception as e:
             logger.error(f"Heartbeat failed: {e}")
-        await asyncio.sleep(10)
+        await asyncio.sleep(settings.MQ_WORKER_HEARTBEAT)
 
 async def auction_listener_loop(worker_id: str):
     """지능형 작업 경매 공고를 청취하고 입찰함"""
@@ -140,24 +159,17 @@ async def auction_listener_loop(worker_id: str):
                 "timestamp": time.time()
             }
             # 입찰 채널로 응답
-            mq_bus.client.publish(payload["reply_to"], json.dumps(bid_data))
+            mq_bus.reply_bid(payload["reply_to"], bid_data)
             logger.debug(f"💰 Bid placed for {payload['node']}: {bid_score:.1f}")
 
-    loop = asyncio.get_running_loop()
-    loop.run_in_executor(None, mq_bus.listen, "gortex:auctions", handle_auction)
-
-async def main():
-    if not mq_bus.is_connected:
-        logger.critical("Redis MQ not connected. Worker cannot start.")
-        return
+    async for msg in mq_bus.subscribe("gortex:auctions"):
+        try:
+            handle_auction(msg)
+        except Exception as e:
+            logger.error(f"Auction handler failed: {e}")
 
-    worker_id = f"worker_{os.uname().nodename}_{str(uuid.uuid4())[:4]}" if hasattr(os, "uname") else f"worker_win_{str(uuid.uuid4())[:4]}"
-    logger.info(f"🚀 Gortex Distributed Swarm Worker (v4.0 Alpha) is active: {worker_id}")
-    
-    # 1. 하트비트 태스크 시작
-    asyncio.create_task(send_heartbeat(worker_id))
-    
-    # 2. [WORKSPACE SYNC] 파일 동기화 리스너 시작
+async def file_sync_listener_loop():
+    """스웜의 파일 변경 브로드캐스트를 수신하여 로컬 작업 공간에 반영"""
     def handle_file_sync(msg):
         if msg.get("type") == "file_changed":
             payload = msg.get("payload", {})
@@ -172,25 +184,49 @@ async def main():
                 with open(path, "w", encoding="utf-8") as f:
                     f.write(content)
 
-    loop = asyncio.get_running_loop()
-    loop.run_in_executor(None, mq_bus.listen, "gortex:workspace_sync", handle_file_sync)
+    async for msg in mq_bus.subscribe("gortex:workspace_sync"):
+        try:
+            handle_file_sync(msg)
+        except Exception as e:
+            logger.error(f"File sync failed: {e}")
+
+async def main():
+    if not mq_bus.is_connected:
+        logger.critical("Redis MQ not connected. Worker cannot start.")
+        return
+
+    worker_id = f"worker_{os.uname().nodename}_{str(uuid.uuid4())[:4]}" if hasattr(os, "uname") else f"worker_win_{str(uuid.uuid4())[:4]}"
+    logger.info(f"🚀 Gortex Distributed Swarm Worker (v4.0 Alpha) is active: {worker_id}")
+    
+    # 1. 하트비트 태스크 시작
+    asyncio.create_task(send_heartbeat(worker_id))
+    
+    # 2. [WORKSPACE SYNC] 파일 동기화 리스너 시작 (auction과 같은 pubsub 연결을 공유)
+    asyncio.create_task(file_sync_listener_loop())
     
     # 3. [AUCTION] 입찰 리스너 시작
     asyncio.create_task(auction_listener_loop(worker_id))
+    loop = asyncio.get_running_loop()
     
-    logger.info("Monitoring 'gortex:tasks:research' and 'gortex:node_tasks'...")
+    logger.info("Monitoring 'gortex:tasks:research' and remote node requests...")
     
     while True:
-        # 1. 노드 실행 큐 감시 (우선순위 높음)
-        node_req = mq_bus.client.blpop("gortex:node_tasks", timeout=1)
-        if node_req:
-            await process_node_execution(json.loads(node_req[1]))
+        # 1. 노드 실행 요청 스트림 감시 (우선순위 높음, 이벤트 루프를 막지 않도록 executor에서 대기)
+        try:
+            node_tasks = await loop.run_in_executor(None, mq_bus.fetch_node_tasks, worker_id, 1, 1000)
+        except Exception as e:
+            logger.error(f"Fetching node requests failed: {e}")
+            await asyncio.sleep(1)
+            continue
+        if node_tasks:
+            for request in node_tasks:
+                await process_node_execution(request, worker_id)
             continue
             
         # 2. 리서치 큐 감시
-        research_req = mq_bus.client.blpop("gortex:tasks:research", timeout=1)
+        research_req = await mq_bus.dequeue_task_async("gortex:tasks:research", timeout=1)
         if research_req:
-            await process_research_task(json.loads(research_req[1]))
+            await process_research_task(research_req)
             
         await asyncio.sleep(0.05)
 
@@ -63,6 +63,27 @@ class BaseStorageContract(ABC):
         assert "test:list:1" in keys
         assert "test:list:2" in keys
 
+    def test_batch_operations(self):
+        storage = self.get_storage()
+        storage.delete_many(list(storage.keys("test:batch:*")))
+
+        storage.mset({"test:batch:1": "v1", "test:batch:2": "v2"})
+        storage.mset({"test:batch:3": "v3"}, ex={"test:batch:3": 60})
+        assert storage.mget(["test:batch:2", "test:batch:missing", "test:batch:1", "test:batch:3"]) == ["v2", None, "v1", "v3"]
+        assert storage.mget([]) == []
+
+        storage.delete_many(["test:batch:1", "test:batch:3"])
+        assert storage.mget(["test:batch:1", "test:batch:2", "test:batch:3"]) == [None, "v2", None]
+
+    def test_scan_iter(self):
+        storage = self.get_storage()
+        storage.delete_many(list(storage.keys("test:scan:*")))
+        expected = {f"test:scan:{i}" for i in range(25)}
+        storage.mset({key: "v" for key in expected})
+        storage.set("test:other", "v")
+
+        assert set(storage.scan_iter("test:scan:*", count=10)) == expected
+
 
 class BaseMessageBusContract(ABC):
     """
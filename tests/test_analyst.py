@@ -2,7 +2,9 @@ import unittest
 import os
 import json
 import pandas as pd
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock, patch, PropertyMock
+from gortex.core.mq import mq_bus
+from gortex.core.storage import MockStorage
 from gortex.agents.analyst import AnalystAgent
 from gortex.core.evolutionary_memory import EvolutionaryMemory
 
@@ -16,6 +18,10 @@ class TestGortexAnalyst(unittest.TestCase):
             import shutil
             shutil.rmtree(self.test_mem_dir)
         os.makedirs(self.test_mem_dir, exist_ok=True)
+        # 공용 프로젝트 저장소(.gortex/storage.db) 대신 테스트 전용 Storage 사용
+        storage_patcher = patch.object(type(mq_bus), "storage", new_callable=PropertyMock, return_value=MockStorage())
+        storage_patcher.start()
+        self.addCleanup(storage_patcher.stop)
 
     def tearDown(self):
         if os.path.exists(self.test_csv):
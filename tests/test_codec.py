@@ -0,0 +1,49 @@
+import base64
+import json
+import unittest
+
+from gortex.core.codec import MessageCodec, msgpack, zstandard
+
+
+class TestMessageCodec(unittest.TestCase):
+    def setUp(self):
+        self.state = {"messages": [["user", f"message {i} " * 20] for i in range(200)], "file_cache": {"a.py": "x = 1\n" * 500}}
+
+    def test_json_stays_plain_text(self):
+        codec = MessageCodec("json", "none")
+        encoded = codec.encode({"a": [1, "둘"]})
+        self.assertEqual(encoded, '{"a": [1, "둘"]}')
+        self.assertEqual(codec.decode(encoded), {"a": [1, "둘"]})
+
+    def test_unavailable_codec_falls_back_to_json(self):
+        codec = MessageCodec("no-such-codec", "no-such-compression")
+        self.assertEqual((codec.codec, codec.compression), ("json", "none"))
+
+    @unittest.skipIf(zstandard is None, "zstandard not installed")
+    def test_compression_only_above_threshold(self):
+        codec = MessageCodec("json", "zstd", compress_threshold=1024)
+        self.assertEqual(codec.encode({"n": 1}), '{"n": 1}')
+        encoded = codec.encode(self.state)
+        self.assertTrue(encoded.startswith("gx2:json:zstd:"))
+        self.assertLess(len(encoded), len(MessageCodec().encode(self.state)) // 4)
+        # readers decode from the header, whatever their own settings are
+        self.assertEqual(MessageCodec().decode(encoded), self.state)
+
+    @unittest.skipIf(msgpack is None, "msgpack not installed")
+    def test_msgpack_round_trip(self):
+        codec = MessageCodec("msgpack", "none")
+        encoded = codec.encode(self.state)
+        self.assertTrue(encoded.startswith("gx2:msgpack:none:"))
+        self.assertEqual(codec.decode(encoded), self.state)
+
+    def test_unknown_frame_is_rejected(self):
+        with self.assertRaises(ValueError):
+            MessageCodec().decode("gx2:capnp:none:abc")
+
+    def test_legacy_base85_frames_still_decode(self):
+        body = base64.b85encode(json.dumps({"n": 1}).encode("utf-8")).decode("ascii")
+        self.assertEqual(MessageCodec().decode(f"gx1:json:none:{body}"), {"n": 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
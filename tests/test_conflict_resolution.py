@@ -1,6 +1,9 @@
 import unittest
 import os
 import shutil
+from unittest.mock import patch, PropertyMock
+from gortex.core.mq import mq_bus
+from gortex.core.storage import MockStorage
 from gortex.core.evolutionary_memory import EvolutionaryMemory
 from gortex.agents.analyst.base import AnalystAgent
 
@@ -9,6 +12,10 @@ class TestConflictResolution(unittest.TestCase):
         self.test_mem_dir = "tests/test_memory_conflict"
         if os.path.exists(self.test_mem_dir):
             shutil.rmtree(self.test_mem_dir)
+        # 공용 프로젝트 저장소(.gortex/storage.db) 대신 테스트 전용 Storage 사용
+        storage_patcher = patch.object(type(mq_bus), "storage", new_callable=PropertyMock, return_value=MockStorage())
+        storage_patcher.start()
+        self.addCleanup(storage_patcher.stop)
         self.memory = EvolutionaryMemory(base_dir=self.test_mem_dir)
         self.analyst = AnalystAgent()
         self.analyst.memory = self.memory # 테스트용 메모리 주입
@@ -19,12 +19,15 @@ class TestEvolutionaryMemory(unittest.TestCase):
         self.fake_storage = {}
         def fake_get(key):
             return self.fake_storage.get(key)
+        def fake_mget(keys):
+            return [self.fake_storage.get(key) for key in keys]
         def fake_set(key, val, ex=None, nx=False):
             self.fake_storage[key] = val
             return True
             
         self.mock_mq.storage = MagicMock()
         self.mock_mq.storage.get.side_effect = fake_get
+        self.mock_mq.storage.mget.side_effect = fake_mget
         self.mock_mq.storage.set.side_effect = fake_set
         self.mock_mq.acquire_lock.return_value = True
         self.mock_mq.is_connected = True # simulate connected so we use storage logic if checked (though we removed check)
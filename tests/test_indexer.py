@@ -1,10 +1,19 @@
+import os
+import shutil
+import tempfile
 import unittest
 from unittest.mock import MagicMock, patch
 from gortex.utils.indexer import SynapticIndexer
 
 class TestGortexSynapticIndexer(unittest.TestCase):
     def setUp(self):
+        self.tmp_index_dir = tempfile.mkdtemp()
         self.indexer = SynapticIndexer(root_dir=".")
+        # index를 대입하는 테스트가 저장소를 교체하므로 프로젝트 인덱스와 분리
+        self.indexer.index_path = os.path.join(self.tmp_index_dir, "index.db")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_index_dir)
 
     @patch('gortex.core.auth.GortexAuth')
     def test_semantic_search(self, mock_auth_cls):
@@ -46,14 +55,26 @@ class TestGortexSynapticIndexer(unittest.TestCase):
                 os.remove("temp_index_test.py")
 
     def test_save_index(self):
-        """인덱스 저장 테스트"""
-        self.indexer.index = {"test.py": [{"name": "SavedSymbol"}]}
-        self.indexer.index_path = "temp_index.json"
+        """저장한 인덱스를 다시 열었을 때 심볼이 유지되는지 테스트"""
+        self.indexer.index = {"test.py": [{"name": "SavedSymbol", "docstring": "Persisted"}]}
         self.indexer._save_index()
-        import os
-        self.assertTrue(os.path.exists("temp_index.json"))
-        if os.path.exists("temp_index.json"):
-            os.remove("temp_index.json")
+
+        reopened = SynapticIndexer(root_dir=".")
+        reopened.index_path = self.indexer.index_path
+        self.assertEqual(dict(reopened.index), {"test.py": [{"name": "SavedSymbol", "docstring": "Persisted"}]})
+        self.assertEqual([r["name"] for r in reopened._get_store().match("SavedSym")], ["SavedSymbol"])
+
+    def test_search_falls_back_to_like_without_fts5_trigram(self):
+        """trigram 토크나이저가 없는 SQLite에서도 인덱스를 열고 부분 문자열로 검색"""
+        from gortex.utils.indexer import _IndexStore
+        with patch.object(_IndexStore, "FTS_SCHEMA", "CREATE VIRTUAL TABLE IF NOT EXISTS symbols_fts USING fts5(name, docstring, tokenize='missing')"):
+            self.indexer.index = {"test.py": [{"name": "FallbackSymbol", "docstring": "Found by LIKE"}]}
+            store = self.indexer._get_store()
+        self.assertFalse(store.fts)
+        self.assertEqual([r["name"] for r in store.match("backSym")], ["FallbackSymbol"])
+        self.assertEqual([r["name"] for r in store.match("by like")], ["FallbackSymbol"])
+        self.indexer.index = {}
+        self.assertEqual(store.match("backSym"), [])
 
     def test_generate_map_and_call_graph(self):
         """generate_map과 generate_call_graph가 정의된 심볼을 처리"""
@@ -88,5 +109,171 @@ class TestGortexSynapticIndexer(unittest.TestCase):
         self.assertIn("dependent.py", radius["direct"])
         self.assertIn("indirect.py", radius["indirect"])
 
+    def test_reverse_lookup_tracks_index_changes(self):
+        """역색인 조회가 index 교체/파일 갱신을 반영"""
+        self.indexer.index = {
+            "base.py": [{"type": "class", "name": "Base", "bases": [], "line": 1, "docstring": None}],
+            "child.py": [
+                {"type": "import_from", "module": "base", "names": ["Base"], "line": 1},
+                {"type": "class", "name": "Child", "bases": ["Base"], "line": 3, "docstring": None},
+                {"type": "function", "name": "build", "line": 6, "args": [], "calls": ["Base"], "docstring": "Builds Base"}
+            ]
+        }
+        deps = self.indexer.find_reverse_dependencies("Base")
+        self.assertEqual(sorted(d["type"] for d in deps), ["call", "import", "inheritance"])
+        self.assertEqual(self.indexer.get_impact_radius("base.py")["direct"], ["child.py"])
+
+        self.indexer.index["child.py"] = [{"type": "function", "name": "build", "line": 1, "args": [], "calls": [], "docstring": None}]
+        self.assertEqual(self.indexer.find_reverse_dependencies("Base"), [])
+        self.assertEqual([r["name"] for r in self.indexer.search("base")], ["Base"])
+
+    def test_incremental_scan_skips_unchanged(self):
+        """변경되지 않은 파일은 재파싱하지 않고, update는 지정 파일만 재인덱싱"""
+        import os, tempfile, shutil
+        tmp = tempfile.mkdtemp()
+        try:
+            for name in ("a.py", "b.py"):
+                with open(os.path.join(tmp, name), "w") as f:
+                    f.write(f"def func_{name[0]}():\n    pass\n")
+            indexer = SynapticIndexer(root_dir=tmp)
+            indexer.index_path = os.path.join(tmp, "index.json")
+            indexer.scan_project()
+            self.assertEqual(set(indexer.index), {"a.py", "b.py"})
+
+            # 새 인스턴스: 저장된 인덱스를 재사용하므로 파싱이 일어나지 않음
+            fresh = SynapticIndexer(root_dir=tmp)
+            fresh.index_path = indexer.index_path
+            with patch("gortex.utils.indexer.ast.parse") as mock_parse:
+                fresh.scan_project()
+                mock_parse.assert_not_called()
+            self.assertEqual(fresh.index["a.py"][0]["name"], "func_a")
+
+            with open(os.path.join(tmp, "a.py"), "w") as f:
+                f.write("def renamed():\n    return 1\n")
+            os.remove(os.path.join(tmp, "b.py"))
+            fresh.update([os.path.join(tmp, "a.py"), "b.py"])
+            self.assertEqual(fresh.index["a.py"][0]["name"], "renamed")
+            self.assertNotIn("b.py", fresh.index)
+
+            reloaded = SynapticIndexer(root_dir=tmp)
+            reloaded.index_path = indexer.index_path
+            self.assertEqual(reloaded.search("renamed")[0]["file"], "a.py")
+        finally:
+            shutil.rmtree(tmp)
+
+    def test_sqlite_store_ranked_search_and_partial_update(self):
+        """SQLite 저장소: 심볼명 일치가 독스트링 일치보다 앞서고, 파일 단위 갱신은 해당 파일 행만 교체"""
+        import os, tempfile, shutil
+        tmp = tempfile.mkdtemp()
+        try:
+            with open(os.path.join(tmp, "a.py"), "w") as f:
+                f.write("def load_config():\n    'Reads settings'\n\ndef apply():\n    'Uses the config loader'\n    load_config()\n")
+            with open(os.path.join(tmp, "b.py"), "w") as f:
+                f.write("from a import load_config\n")
+            indexer = SynapticIndexer(root_dir=tmp)
+            indexer.index_path = os.path.join(tmp, "index.db")
+            indexer.scan_project()
+
+            results = indexer.search("config")
+            self.assertEqual([(r["name"], r["score"]) for r in results], [("load_config", 100), ("apply", 50)])
+            self.assertEqual(len(indexer.search("ap")), 1) # 3자 미만은 LIKE 검색
+            self.assertEqual(sorted(d["type"] for d in indexer.find_reverse_dependencies("load_config")), ["call", "import"])
+
+            store = indexer._get_store()
+            b_rows = store.conn.execute("SELECT id FROM symbols WHERE file = 'b.py'").fetchall()
+            with open(os.path.join(tmp, "a.py"), "w") as f:
+                f.write("def load_settings():\n    pass\n")
+            indexer.update(["a.py"])
+            self.assertEqual(store.conn.execute("SELECT id FROM symbols WHERE file = 'b.py'").fetchall(), b_rows)
+            self.assertEqual(indexer.search("config"), [])
+            self.assertEqual(indexer.find_reverse_dependencies("load_config")[0]["file"], "b.py")
+        finally:
+            shutil.rmtree(tmp)
+
+    def test_fresh_instance_rescans_before_first_query(self):
+        """저장된 인덱스가 있어도 새 인스턴스는 첫 조회 전에 증분 스캔하여 이후 추가된 파일을 반영"""
+        tmp = tempfile.mkdtemp()
+        try:
+            with open(os.path.join(tmp, "a.py"), "w") as f:
+                f.write("def target():\n    pass\n")
+            with open(os.path.join(tmp, "b.py"), "w") as f:
+                f.write("def b():\n    target()\n")
+            indexer = SynapticIndexer(root_dir=tmp)
+            indexer.index_path = os.path.join(tmp, "logs", "index.db")
+            self.assertEqual([d["file"] for d in indexer.find_reverse_dependencies("target")], ["b.py"])
+
+            with open(os.path.join(tmp, "c.py"), "w") as f:
+                f.write("def c():\n    target()\n")
+            fresh = SynapticIndexer(root_dir=tmp)
+            fresh.index_path = indexer.index_path
+            self.assertEqual(sorted(d["file"] for d in fresh.find_reverse_dependencies("target")), ["b.py", "c.py"])
+            with patch.object(fresh, "scan_project") as scan:
+                fresh.get_impact_radius("a.py")
+                scan.assert_not_called() # 인스턴스당 한 번만
+        finally:
+            shutil.rmtree(tmp)
+
+    def test_index_is_not_shared_across_project_roots(self):
+        """같은 index_path를 다른 루트가 쓰면 이전 루트의 항목을 버리고 다시 인덱싱"""
+        roots = [tempfile.mkdtemp(), tempfile.mkdtemp()]
+        try:
+            for i, root in enumerate(roots):
+                with open(os.path.join(root, f"only_{i}.py"), "w") as f:
+                    f.write(f"def func_{i}():\n    pass\n")
+            first = SynapticIndexer(root_dir=roots[0])
+            first.index_path = self.indexer.index_path
+            first.scan_project()
+            second = SynapticIndexer(root_dir=roots[1])
+            second.index_path = self.indexer.index_path
+            second.scan_project()
+            self.assertEqual(set(second.index), {"only_1.py"})
+        finally:
+            for root in roots:
+                shutil.rmtree(root)
+
+    def test_default_index_path_is_per_root(self):
+        """기본 저장소는 루트별 파일이므로 루트를 번갈아 인덱싱해도 다시 파싱하지 않음"""
+        roots = [tempfile.mkdtemp(), tempfile.mkdtemp()]
+        try:
+            for i, root in enumerate(roots):
+                with open(os.path.join(root, f"only_{i}.py"), "w") as f:
+                    f.write(f"def func_{i}():\n    pass\n")
+            with patch.object(SynapticIndexer, "INDEX_DIR", self.tmp_index_dir):
+                indexers = [SynapticIndexer(root_dir=root) for root in roots]
+                self.assertNotEqual(indexers[0].index_path, indexers[1].index_path)
+                for indexer in indexers:
+                    indexer.scan_project()
+
+                again = SynapticIndexer(root_dir=roots[0])
+                self.assertEqual(again.index_path, indexers[0].index_path)
+                with patch("gortex.utils.indexer.ast.parse") as mock_parse:
+                    again.scan_project()
+                    mock_parse.assert_not_called()
+                self.assertEqual(set(again.index), {"only_0.py"})
+        finally:
+            for root in roots:
+                shutil.rmtree(root)
+
+    def test_parallel_scan_matches_serial(self):
+        """프로세스 풀 스캔 결과가 직렬 스캔과 동일하고, 중첩 함수 호출도 바깥 함수에 집계"""
+        import os, tempfile, shutil
+        tmp = tempfile.mkdtemp()
+        try:
+            for i in range(6):
+                with open(os.path.join(tmp, f"m{i}.py"), "w") as f:
+                    f.write(f"import os\ndef outer_{i}():\n    def inner():\n        return os.getcwd()\n    return inner()\n")
+            results = []
+            for parallel in (False, True):
+                indexer = SynapticIndexer(root_dir=tmp)
+                indexer.index_path = os.path.join(tmp, f"index_{parallel}.json")
+                with patch("gortex.utils.indexer.settings.INDEXER_WORKERS", 2):
+                    indexer.scan_project(parallel=parallel)
+                results.append(indexer.index)
+            self.assertEqual(results[0], results[1])
+            outer = next(d for d in results[0]["m0.py"] if d.get("name") == "outer_0")
+            self.assertEqual(set(outer["calls"]), {"os.getcwd", "inner"})
+        finally:
+            shutil.rmtree(tmp)
+
 if __name__ == '__main__':
     unittest.main()
@@ -2,6 +2,9 @@ import unittest
 import os
 import json
 import shutil
+from unittest.mock import patch, PropertyMock
+from gortex.core.mq import mq_bus
+from gortex.core.storage import MockStorage
 from gortex.core.evolutionary_memory import EvolutionaryMemory
 
 class TestMemorySharding(unittest.TestCase):
@@ -18,6 +21,11 @@ class TestMemorySharding(unittest.TestCase):
         with open(self.legacy_file, "w", encoding="utf-8") as f:
             json.dump(legacy_data, f)
 
+        # 공용 프로젝트 저장소(.gortex/storage.db) 대신 테스트 전용 Storage 사용
+        storage_patcher = patch.object(type(mq_bus), "storage", new_callable=PropertyMock, return_value=MockStorage())
+        storage_patcher.start()
+        self.addCleanup(storage_patcher.stop)
+
         # 2. 메모리 초기화 (마이그레이션 트리거)
         self.memory = EvolutionaryMemory(base_dir=self.test_dir)
 
@@ -1,5 +1,8 @@
 import unittest
 import asyncio
+import concurrent.futures
+import json
+import threading
 import time
 from unittest.mock import MagicMock, patch
 from tests.contracts import BaseMessageBusContract
@@ -11,10 +14,18 @@ try:
 except ImportError:
     redis = None
 
+try:
+    import fakeredis
+except ImportError:
+    fakeredis = None
+
 class TestLocalMessageBus(BaseMessageBusContract, unittest.TestCase):
     def setUp(self):
         self.bus = LocalMessageBus()
 
+    def tearDown(self):
+        self.bus.shutdown()
+
     def get_bus(self):
         return self.bus
 
@@ -40,6 +51,84 @@ class TestLocalMessageBus(BaseMessageBusContract, unittest.TestCase):
         
         asyncio.run(run_test())
 
+    def test_async_subscribe_multiplexes_channels(self):
+        """
+        subscribe() yields messages from several channels, including ones published from another thread.
+        """
+        async def run_test():
+            import threading
+            received = []
+            async with self.bus.subscribe("chan:a", "chan:b") as sub:
+                self.bus.publish_event("chan:a", "tester", "evt", {"n": 1})
+                thread = threading.Thread(target=self.bus.publish_event, args=("chan:b", "tester", "evt", {"n": 2}))
+                thread.start()
+                thread.join()
+                self.bus.publish_event("chan:c", "tester", "evt", {"n": 3})
+                async for msg in sub:
+                    received.append((msg["channel"], msg["payload"]["n"]))
+                    if len(received) == 2:
+                        break
+            self.assertEqual(received, [("chan:a", 1), ("chan:b", 2)])
+            self.assertNotIn("chan:a", self.bus._async_subscribers)
+
+        asyncio.run(asyncio.wait_for(run_test(), 2))
+
+    def test_priority_queue_bounds_and_order(self):
+        with patch.object(settings, "MQ_QUEUE_MAXSIZE", 3):
+            self.assertTrue(self.bus.enqueue_task("q", {"n": 1}))
+            self.assertTrue(self.bus.enqueue_task("q", {"n": 2}, priority=5))
+            self.assertTrue(self.bus.enqueue_task("q", {"n": 3}))
+            self.assertFalse(self.bus.enqueue_task("q", {"n": 4}, timeout=0.05))
+        self.assertEqual(self.bus.queue_size("q"), 3)
+        self.assertEqual([self.bus.dequeue_task("q")["n"] for _ in range(3)], [2, 1, 3])
+        self.assertIsNone(self.bus.dequeue_task("q"))
+
+    def test_async_dequeue_wakes_on_threaded_enqueue(self):
+        async def run_test():
+            import threading
+            self.assertIsNone(await self.bus.dequeue_task_async("q", timeout=0.05))
+            pending = asyncio.ensure_future(self.bus.dequeue_task_async("q", timeout=2))
+            await asyncio.sleep(0.01)
+            threading.Thread(target=self.bus.enqueue_task, args=("q", {"n": 1})).start()
+            return await pending
+
+        self.assertEqual(asyncio.run(run_test()), {"n": 1})
+
+    def test_in_process_workers_run_remote_nodes_in_parallel(self):
+        def slow_node(state):
+            time.sleep(0.2)
+            return {"n": state["n"]}
+        def broken_node(state):
+            raise RuntimeError("boom")
+
+        self.assertEqual(self.bus.call_remote_nodes_parallel([("coder", {"n": 0})]), []) # no workers by default
+        with patch("gortex.core.mq._local_node_map", return_value={"coder": slow_node, "analyst": broken_node}):
+            self.bus.start_workers(4)
+            self.assertEqual(len(self.bus.list_active_workers()), 4)
+            start = time.time()
+            results = self.bus.call_remote_nodes_parallel([("coder", {"n": i}) for i in range(4)], timeout=5)
+            self.assertLess(time.time() - start, 0.6)
+            self.assertEqual(results, [{"n": i} for i in range(4)])
+            self.assertEqual(asyncio.run(self.bus.call_remote_node_async("analyst", {})), {"error": "boom", "status": "failed"})
+            self.assertEqual(self.bus.call_remote_nodes_parallel([("coder", {"n": 9})], timeout=0.05), [])
+
+    def test_shutdown_stops_and_joins_workers(self):
+        loops = []
+        async def async_node(state):
+            loops.append(asyncio.get_running_loop())
+            return {"n": state["n"]}
+
+        with patch("gortex.core.mq._local_node_map", return_value={"coder": async_node}):
+            self.bus.start_workers(1)
+            threads = list(self.bus._worker_threads)
+            self.assertEqual([self.bus.call_remote_node("coder", {"n": i}, timeout=5) for i in range(2)], [{"n": 0}, {"n": 1}])
+        self.assertIs(loops[0], loops[1]) # one event loop per worker, not asyncio.run per request
+
+        self.bus.shutdown(timeout=2)
+        self.assertFalse(any(t.is_alive() for t in threads))
+        self.assertEqual(self.bus.list_active_workers(), [])
+        self.bus.shutdown() # idempotent
+
 @unittest.skipIf(redis is None, "Redis not installed")
 class TestRedisMessageBus(BaseMessageBusContract, unittest.TestCase):
     def setUp(self):
@@ -63,6 +152,7 @@ class TestRedisMessageBus(BaseMessageBusContract, unittest.TestCase):
                 self.bus = RedisMessageBus(url="redis://mock:6379/0")
             except:
                 self.skipTest("Redis mock failed")
+        self.addCleanup(self.bus.shutdown)
 
     def get_bus(self):
         return self.bus
@@ -79,7 +169,466 @@ class TestRedisMessageBus(BaseMessageBusContract, unittest.TestCase):
         # For unit testing RedisMessageBus without a real Redis, we mostly verify calls.
 
         self.bus.publish_event(channel, "Tester", "test_event", payload)
+        self.bus.flush()
         self.mock_redis.publish.assert_called()
 
+    def test_batched_publish_uses_pipeline(self):
+        """Buffered events go out in one pipeline; sync=True sends them ahead of the urgent event."""
+        pipe = MagicMock()
+        self.mock_redis.pipeline.return_value = pipe
+        self.bus.batch_window = 60 # keep the background flusher out of the way
+        for i in range(3):
+            self.bus.publish_event("chan", "Tester", "evt", {"i": i})
+        self.mock_redis.publish.assert_not_called()
+
+        self.bus.publish_event("chan", "Tester", "urgent", {}, sync=True)
+        self.assertEqual(pipe.publish.call_count, 4)
+        self.assertEqual(json.loads(pipe.publish.call_args_list[-1][0][1])["type"], "urgent")
+        pipe.execute.assert_called_once()
+        self.assertEqual(self.bus._publish_buffer, [])
+
+        self.bus.batch_size = 2
+        self.bus.publish_event("chan", "Tester", "evt", {})
+        self.bus.publish_event("chan", "Tester", "evt", {})
+        self.assertEqual(pipe.execute.call_count, 2)
+
+@unittest.skipIf(fakeredis is None, "fakeredis not installed")
+class TestRedisAsyncSubscribe(unittest.TestCase):
+    def test_subscriptions_share_one_pubsub_connection(self):
+        server = fakeredis.FakeServer()
+        sync_client = fakeredis.FakeRedis(server=server, decode_responses=True)
+        async_client = fakeredis.aioredis.FakeRedis(server=server, decode_responses=True)
+        with patch("redis.from_url", return_value=sync_client), patch.object(settings, "STORAGE_CACHE_SIZE", 0):
+            bus = RedisMessageBus(url="redis://fake:6379/0") # no cache listener loop racing the count below
+
+        async def run_test():
+            with patch("gortex.core.mq.aioredis.from_url", return_value=async_client) as from_url:
+                subs = [bus.subscribe(f"chan:{i}") for i in range(20)]
+                for sub in subs:
+                    await sub.wait_ready()
+                self.assertEqual(from_url.call_count, 1)
+            bus.publish_event("chan:7", "tester", "evt", {"n": 7})
+            msg = await asyncio.wait_for(subs[7].__anext__(), 2)
+            self.assertEqual((msg["channel"], msg["payload"]), ("chan:7", {"n": 7}))
+            self.assertTrue(subs[0].queue.empty())
+            for sub in subs:
+                await sub.aclose()
+            hub = bus._pubsub_hubs[asyncio.get_running_loop()]
+            self.assertEqual(hub.routes, {})
+
+        asyncio.run(run_test())
+
+    def test_cache_listener_starts_without_warnings(self):
+        """The storage cache's invalidation listener starts on first cache use, not while the bus is built."""
+        from gortex.core.mq import _ListenerLoop
+        server = fakeredis.FakeServer()
+        add = _ListenerLoop.add
+        started = []
+
+        def add_and_wait(loop, channels, callback):
+            listener = add(loop, channels, callback)
+            concurrent.futures.wait([listener.ready], 2)
+            started.append(listener)
+            return listener
+
+        with patch("redis.from_url", return_value=fakeredis.FakeRedis(server=server, decode_responses=True)), \
+                patch("gortex.core.mq.aioredis.from_url", return_value=fakeredis.aioredis.FakeRedis(server=server, decode_responses=True)), \
+                patch.object(settings, "STORAGE_CACHE_SIZE", 16), patch.object(_ListenerLoop, "add", add_and_wait), \
+                self.assertNoLogs("GortexMQ", level="WARNING"):
+            bus = RedisMessageBus(url="redis://fake:6379/0")
+            self.assertEqual(started, [])
+            bus.storage.get("gortex:memory:shard:coding")
+            self.assertEqual(len(started), 1)
+        bus.shutdown()
+
+    def test_fallback_bus_uses_uncached_storage(self):
+        from gortex.core.mq import GortexMessageBus
+        from gortex.core.storage import CachedStorage
+        with patch.object(settings, "GORTEX_ENV", "distributed"), patch.object(settings, "STORAGE_CACHE_SIZE", 16), \
+                patch("gortex.core.mq.RedisMessageBus", side_effect=ConnectionError("unreachable")):
+            bus = GortexMessageBus()
+        self.addCleanup(bus.shutdown)
+        self.assertIsInstance(bus._impl, LocalMessageBus)
+        self.assertNotIsInstance(bus.storage, CachedStorage)
+
+    def test_sync_listeners_share_one_loop_and_stop_on_shutdown(self):
+        server = fakeredis.FakeServer()
+        with patch("redis.from_url", return_value=fakeredis.FakeRedis(server=server, decode_responses=True)), \
+                patch.object(settings, "STORAGE_CACHE_SIZE", 0):
+            bus = RedisMessageBus(url="redis://fake:6379/0")
+        received = []
+        with patch("gortex.core.mq.aioredis.from_url", return_value=fakeredis.aioredis.FakeRedis(server=server, decode_responses=True)) as from_url:
+            threads = threading.active_count()
+            listeners = [bus.add_listener((f"chan:{i}",), received.append) for i in range(5)]
+            for listener in listeners:
+                listener.ready.result(2)
+            self.assertEqual(threading.active_count(), threads + 1)
+            self.assertEqual(from_url.call_count, 1)
+
+            bus.publish_event("chan:3", "tester", "evt", {"n": 3}, sync=True)
+            deadline = time.time() + 2
+            while not received and time.time() < deadline:
+                time.sleep(0.01)
+            self.assertEqual([(m["channel"], m["payload"]) for m in received], [("chan:3", {"n": 3})])
+
+            listeners[3].close()
+            thread = bus._listener_loop.thread
+            bus.shutdown()
+            self.assertFalse(thread.is_alive())
+
+@unittest.skipIf(fakeredis is None, "fakeredis not installed")
+class TestRedisStreamRPC(unittest.TestCase):
+    def setUp(self):
+        self.server = fakeredis.FakeServer()
+        self.client = fakeredis.FakeRedis(server=self.server, decode_responses=True)
+        with patch("redis.from_url", return_value=self.client):
+            self.bus = RedisMessageBus(url="redis://fake:6379/0")
+        self.addCleanup(self.bus.shutdown)
+
+    def _run_async(self, coro_fn):
+        async_client = fakeredis.aioredis.FakeRedis(server=self.server, decode_responses=True)
+        async def runner():
+            with patch("gortex.core.mq.aioredis.from_url", return_value=async_client):
+                return await coro_fn()
+        return asyncio.run(runner())
+
+    def _call_in_thread(self, requests, timeout=5):
+        import threading
+        box = {}
+        thread = threading.Thread(target=lambda: box.setdefault("results", self.bus.call_remote_nodes_parallel(requests, timeout=timeout)))
+        thread.start()
+        return thread, box
+
+    def test_round_trip_in_request_order(self):
+        thread, box = self._call_in_thread([("coder", {"n": 1}), ("analyst", {"n": 2})])
+        tasks = []
+        while len(tasks) < 2:
+            tasks += self.bus.fetch_node_tasks("worker-a", count=2, block_ms=100)
+        for task in reversed(tasks):
+            self.bus.complete_node_task(task, {"node": task["node"], "n": task["state"]["n"]})
+        thread.join(5)
+        self.assertEqual(box["results"], [{"node": "coder", "n": 1}, {"node": "analyst", "n": 2}])
+        self.assertEqual(self.client.xpending(self.bus.RPC_STREAM, self.bus.RPC_GROUP)["pending"], 0)
+
+    def test_crashed_worker_request_is_reclaimed(self):
+        thread, box = self._call_in_thread([("coder", {"n": 1})])
+        lost = []
+        while not lost:
+            lost = self.bus.fetch_node_tasks("worker-dead", block_ms=100) # never completed
+        with patch.object(settings, "MQ_RPC_CLAIM_IDLE", 0):
+            time.sleep(0.01)
+            reclaimed = self.bus.fetch_node_tasks("worker-b", block_ms=100)
+        self.assertEqual([t["id"] for t in reclaimed], [lost[0]["id"]])
+        self.bus.complete_node_task(reclaimed[0], {"ok": True})
+        thread.join(5)
+        self.assertEqual(box["results"], [{"ok": True}])
+
+    def test_timeout_returns_only_finished_results(self):
+        start = time.time()
+        self.assertEqual(self.bus.call_remote_nodes_parallel([("coder", {})], timeout=0.2), [])
+        self.assertLess(time.time() - start, 2)
+
+    def test_round_trip_with_compressed_codec(self):
+        from gortex.core.codec import MessageCodec, zstandard
+        if zstandard is None:
+            self.skipTest("zstandard not installed")
+        state = {"messages": [["user", "hello " * 50]] * 100}
+        with patch("gortex.core.mq.get_codec", return_value=MessageCodec("json", "zstd", compress_threshold=0)):
+            thread, box = self._call_in_thread([("coder", state)])
+            tasks = []
+            while not tasks:
+                tasks = self.bus.fetch_node_tasks("worker-a", block_ms=100)
+            self.assertEqual(tasks[0]["state"], state)
+            self.bus.complete_node_task(tasks[0], {"echo": tasks[0]["state"]})
+            thread.join(5)
+        self.assertEqual(box["results"], [{"echo": state}])
+
+    def _serve_one(self, result_fn):
+        tasks = []
+        while not tasks:
+            tasks = self.bus.fetch_node_tasks("worker-a", block_ms=100)
+        self.bus.complete_node_task(tasks[0], result_fn(tasks[0]["state"]))
+        return tasks[0]
+
+    def test_follow_up_calls_ship_state_deltas(self):
+        state = {"thread_id": "t1", "messages": [["user", "history " * 200]] * 20}
+        echo = lambda s: {"count": len(s["messages"])}
+        for turn in range(2):
+            thread, box = self._call_in_thread([("coder", state)])
+            self._serve_one(echo)
+            thread.join(5)
+            self.assertEqual(box["results"], [{"count": len(state["messages"])}])
+            state = dict(state, messages=state["messages"] + [["ai", f"turn {turn}"]])
+        last = self.client.xrevrange(self.bus.RPC_STREAM, count=1)[0][1]
+        self.assertNotIn("state", last)
+        self.assertLess(len(last["state_delta"]), 200)
+
+        # anchor lost everywhere: the worker asks for a resend and the master ships the full state
+        self.client.delete(*self.client.keys(f"{self.bus.STATE_PREFIX}*"))
+        self.bus._state_cache = type(self.bus._state_cache)(4)
+        thread, box = self._call_in_thread([("coder", state)])
+        self._serve_one(echo) # served from the full resend; the miss was answered inside fetch
+        thread.join(5)
+        self.assertEqual(box["results"], [{"count": len(state["messages"])}])
+
+    def test_requests_follow_thread_affinity(self):
+        for worker_id in ("w1", "w2", "w3"):
+            self.bus.register_worker({"worker_id": worker_id, "active_tasks": 0, "cpu_percent": 5})
+        with patch.object(settings, "MQ_WORKER_MAX_ACTIVE", 1):
+            thread, box = self._call_in_thread([("coder", {"thread_id": "t1", "n": i}) for i in range(2)])
+            time.sleep(0.1)
+        inboxes = {w: self.client.xlen(self.bus._inbox_stream(w)) if self.client.exists(self.bus._inbox_stream(w)) else 0
+                   for w in ("w1", "w2", "w3")}
+        self.assertEqual(sorted(inboxes.values()), [0, 1, 1]) # owner takes one, the spillover goes to the next worker
+        served = []
+        for worker_id, queued in inboxes.items():
+            if queued:
+                task = self.bus.fetch_node_tasks(worker_id, block_ms=100)[0]
+                self.assertEqual(task["stream"], self.bus._inbox_stream(worker_id))
+                self.bus.complete_node_task(task, {"n": task["state"]["n"], "by": worker_id})
+                served.append(worker_id)
+        thread.join(5)
+        self.assertEqual([r["n"] for r in box["results"]], [0, 1])
+        self.assertEqual(self.client.xlen(self.bus._inbox_stream(served[0])), 0)
+
+    def test_fetch_never_returns_more_than_count(self):
+        inbox = self.bus._inbox_stream("worker-a")
+        for stream, n in ((inbox, 1), (inbox, 2), (self.bus.RPC_STREAM, 3), (self.bus.RPC_STREAM, 4)):
+            self.client.xadd(stream, {"id": f"r{n}", "node": "coder", "reply_to": f"reply:{n}",
+                                      "state": self.bus.codec.encode({"n": n})})
+        first = self.bus.fetch_node_tasks("worker-a", count=3, block_ms=100)
+        self.assertEqual([t["state"]["n"] for t in first], [1, 2, 3])
+        rest = self.bus.fetch_node_tasks("worker-a", count=3, block_ms=100)
+        self.assertEqual([t["state"]["n"] for t in rest], [4])
+
+    def test_offline_worker_inbox_moves_to_shared_stream(self):
+        self.bus.register_worker({"worker_id": "w1", "active_tasks": 0})
+        thread, box = self._call_in_thread([("coder", {"thread_id": "t1"})])
+        time.sleep(0.1)
+        self.assertEqual(self.client.xlen(self.bus._inbox_stream("w1")), 1)
+        self.bus.register_worker({"worker_id": "w1", "last_seen": time.time() - settings.MQ_WORKER_TTL - 1})
+        self.assertEqual(self.bus.list_active_workers(), [])
+        self.assertEqual(self.client.xlen(self.bus._inbox_stream("w1")), 1) # reads never move work
+        self.assertEqual(self.bus.reap_stale_workers(), ["w1"])
+        task = self.bus.fetch_node_tasks("w2", block_ms=100)[0]
+        self.assertEqual(task["stream"], self.bus.RPC_STREAM)
+        self.bus.complete_node_task(task, {"ok": True})
+        thread.join(5)
+        self.assertEqual(box["results"], [{"ok": True}])
+
+    def test_worker_recovers_after_its_inbox_is_rehomed(self):
+        self.assertEqual(self.bus.fetch_node_tasks("w1", block_ms=10), [])
+        inbox = self.bus._inbox_stream("w1")
+        self.client.xadd(inbox, {"id": "r0", "node": "coder", "reply_to": "reply:0", "state": self.bus.codec.encode({})})
+        self.bus._rehome_inbox("w1") # looked offline to the master; group goes with the renamed stream
+        self.assertEqual(self.bus.fetch_node_tasks("w1", count=2, block_ms=10)[0]["id"], "r0") # moved to shared
+
+        self.bus._rehome_inbox("w1")
+        self.client.xadd(inbox, {"id": "r1", "node": "coder", "reply_to": "reply:1", "state": self.bus.codec.encode({"n": 1})})
+        self.assertEqual([t["id"] for t in self.bus.fetch_node_tasks("w1", block_ms=10)], ["r1"])
+
+    def test_stalled_inbox_request_is_reclaimed(self):
+        inbox = self.bus._inbox_stream("w1")
+        self.client.xadd(inbox, {"id": "r0", "node": "coder", "reply_to": "reply:0", "state": self.bus.codec.encode({})})
+        self.assertEqual(self.bus.fetch_node_tasks("w1", block_ms=10)[0]["id"], "r0") # never completed
+        with patch.object(settings, "MQ_RPC_CLAIM_IDLE", 0):
+            time.sleep(0.01)
+            reclaimed = self.bus.fetch_node_tasks("w1", block_ms=10) # restarted under the same id
+        self.assertEqual([(t["id"], t["stream"]) for t in reclaimed], [("r0", inbox)])
+
+    def test_delivery_count_survives_a_rehome(self):
+        inbox = self.bus._inbox_stream("w1")
+        self.client.xadd(inbox, {"id": "r0", "node": "coder", "reply_to": "reply:0", "state": self.bus.codec.encode({})})
+        with patch.object(settings, "MQ_RPC_CLAIM_IDLE", 0), patch.object(settings, "MQ_RPC_MAX_DELIVERIES", 2):
+            for _ in range(2): # first read, then one reclaim
+                self.assertEqual(len(self.bus.fetch_node_tasks("w1", block_ms=10)), 1)
+            self.bus._rehome_inbox("w1")
+            self.assertEqual(self.bus.fetch_node_tasks("w2", block_ms=10), [])
+        self.assertEqual(self.bus.codec.decode(self.client.lpop("reply:0"))["status"], "failed")
+        self.assertEqual(self.client.xpending(self.bus.RPC_STREAM, self.bus.RPC_GROUP)["pending"], 0)
+
+    def test_reclaimed_request_is_answered_only_once(self):
+        self.client.xadd(self.bus.RPC_STREAM, {"id": "r0", "node": "coder", "reply_to": "reply:0", "state": self.bus.codec.encode({})})
+        slow = self.bus.fetch_node_tasks("worker-slow", block_ms=10)[0]
+        with patch.object(settings, "MQ_RPC_CLAIM_IDLE", 0):
+            time.sleep(0.01)
+            retry = self.bus.fetch_node_tasks("worker-b", block_ms=10)[0]
+        self.bus.complete_node_task(slow, {"by": "slow"})
+        self.bus.complete_node_task(retry, {"by": "b"})
+        self.assertEqual([self.bus.codec.decode(r) for r in self.client.lrange("reply:0", 0, -1)], [{"by": "slow"}])
+
+        # a worker that reclaims an already answered request acks it instead of running it again
+        self.client.xadd(self.bus.RPC_STREAM, {"id": "r1", "node": "coder", "reply_to": "reply:1", "state": self.bus.codec.encode({})})
+        done = self.bus.fetch_node_tasks("worker-slow", block_ms=10)[0]
+        self.client.set(self.bus._done_key("reply:1"), 1)
+        with patch.object(settings, "MQ_RPC_CLAIM_IDLE", 0):
+            time.sleep(0.01)
+            self.assertEqual(self.bus.fetch_node_tasks("worker-b", block_ms=10), [])
+        self.assertEqual(self.client.xpending(self.bus.RPC_STREAM, self.bus.RPC_GROUP)["pending"], 0)
+        self.assertEqual(done["id"], "r1")
+
+    def test_async_call_resolves_on_reply_event(self):
+        async def scenario():
+            loop = asyncio.get_running_loop()
+            async def worker():
+                tasks = []
+                while len(tasks) < 2:
+                    tasks += await loop.run_in_executor(None, self.bus.fetch_node_tasks, "worker-a", 2, 100)
+                for task in reversed(tasks):
+                    self.bus.complete_node_task(task, {"n": task["state"]["n"]})
+            worker_task = asyncio.ensure_future(worker())
+            results = await self.bus.call_remote_nodes_parallel_async([("coder", {"n": 1}), ("coder", {"n": 2})], timeout=5)
+            await worker_task
+            return results
+
+        self.assertEqual(self._run_async(scenario), [{"n": 1}, {"n": 2}])
+        self.assertEqual(self.client.keys(f"{self.bus.RPC_RESULT_PREFIX}*"), [])
+
+    def test_async_call_keeps_sync_redis_calls_off_the_loop(self):
+        self.bus.register_worker({"worker_id": "w1", "active_tasks": 0, "cpu_percent": 5})
+        callers = []
+        def recording(method):
+            def call(*args, **kwargs):
+                callers.append((method.__name__, threading.current_thread()))
+                return method(*args, **kwargs)
+            return call
+
+        async def scenario():
+            loop_thread = threading.current_thread()
+            with patch.object(self.bus.client, "xgroup_create", recording(self.bus.client.xgroup_create)), \
+                 patch.object(self.bus.client, "zrangebyscore", recording(self.bus.client.zrangebyscore)):
+                self.assertEqual(await self.bus.call_remote_nodes_parallel_async([("coder", {})], timeout=0.1), [])
+            return loop_thread
+
+        loop_thread = self._run_async(scenario)
+        self.assertEqual(sorted(name for name, _ in callers), ["xgroup_create", "zrangebyscore"])
+        self.assertTrue(all(thread is not loop_thread for _, thread in callers))
+
+    def test_async_auction_without_bids_looks_up_workers_off_the_loop(self):
+        self.bus.register_worker({"worker_id": "w1", "active_tasks": 0, "cpu_percent": 5})
+        callers = []
+        zrangebyscore = self.bus.client.zrangebyscore
+        def recording(*args, **kwargs):
+            callers.append(threading.current_thread())
+            return zrangebyscore(*args, **kwargs)
+
+        async def scenario():
+            with patch.object(self.bus.client, "zrangebyscore", recording):
+                return await self.bus.auction_task_async("coder", {}, timeout=0.1), threading.current_thread()
+
+        worker, loop_thread = self._run_async(scenario)
+        self.assertEqual(worker, "w1")
+        self.assertTrue(callers)
+        self.assertTrue(all(thread is not loop_thread for thread in callers))
+
+    def test_async_auction_collects_bids(self):
+        async def scenario():
+            async with self.bus.subscribe("gortex:auctions") as auctions:
+                await auctions.wait_ready()
+                auction = asyncio.ensure_future(self.bus.auction_task_async("coder", {}, timeout=0.3))
+                started = await asyncio.wait_for(auctions.__anext__(), 2)
+                for worker_id, score in (("w1", 10), ("w2", 50)):
+                    self.client.publish(started["payload"]["reply_to"], json.dumps({"worker_id": worker_id, "bid_score": score}))
+                return await auction
+
+        self.assertEqual(self._run_async(scenario), "w2")
+
+    def test_bids_sent_through_the_proxy_use_the_codec(self):
+        from gortex.core.codec import MessageCodec, msgpack
+        from gortex.core.mq import GortexMessageBus
+        if msgpack is None:
+            self.skipTest("msgpack not installed")
+        proxy = GortexMessageBus.__new__(GortexMessageBus) # wrap the fake-backed bus without connecting
+        proxy._impl = self.bus
+
+        async def scenario():
+            async with self.bus.subscribe("gortex:auctions") as auctions:
+                await auctions.wait_ready()
+                auction = asyncio.ensure_future(self.bus.auction_task_async("coder", {}, timeout=0.3))
+                started = await asyncio.wait_for(auctions.__anext__(), 2)
+                for worker_id, score in (("w1", 10), ("w2", 50)):
+                    proxy.reply_bid(started["payload"]["reply_to"], {"worker_id": worker_id, "bid_score": score})
+                return await auction
+
+        with patch("gortex.core.mq.get_codec", return_value=MessageCodec("msgpack", "none")):
+            self.assertEqual(self._run_async(scenario), "w2")
+
+@unittest.skipIf(fakeredis is None, "fakeredis not installed")
+class TestRedisTaskQueue(unittest.TestCase):
+    def test_priority_order_and_async_pop(self):
+        server = fakeredis.FakeServer()
+        with patch("redis.from_url", return_value=fakeredis.FakeRedis(server=server, decode_responses=True)):
+            bus = RedisMessageBus(url="redis://fake:6379/0")
+        for n, priority in ((1, 0), (2, 0), (3, 9)):
+            bus.enqueue_task("q", {"n": n}, priority=priority)
+        self.assertEqual(bus.queue_size("q"), 3)
+        self.assertEqual(bus.dequeue_task("q")["n"], 3)
+        self.assertEqual(bus.dequeue_task("q", timeout=1)["n"], 1)
+
+        async def pop_async():
+            with patch("gortex.core.mq.aioredis.from_url", return_value=fakeredis.aioredis.FakeRedis(server=server, decode_responses=True)):
+                return await bus.dequeue_task_async("q", timeout=1)
+        self.assertEqual(asyncio.run(pop_async()), {"n": 2})
+        self.assertIsNone(bus.dequeue_task("q"))
+
+    def _bus(self):
+        self.client = fakeredis.FakeRedis(server=fakeredis.FakeServer(), decode_responses=True)
+        with patch("redis.from_url", return_value=self.client):
+            return RedisMessageBus(url="redis://fake:6379/0")
+
+    def test_concurrent_producers_never_overshoot_maxsize(self):
+        bus = self._bus()
+        with patch.object(settings, "MQ_QUEUE_MAXSIZE", 5):
+            threads = [threading.Thread(target=bus.enqueue_task, args=("q", {"n": n})) for n in range(20)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(bus.queue_size("q"), 5)
+
+    def test_fifo_within_priority_at_large_sequence_values(self):
+        bus = self._bus()
+        self.client.set("q:seq", (1 << 40) - 100) # near the top of the sequence range
+        for n in range(60):
+            bus.enqueue_task("q", {"n": n}, priority=n % 3)
+        bus.enqueue_task("q", {"n": "max"}, priority=1 << 20) # clamped, still first
+        order = [bus.dequeue_task("q")["n"] for _ in range(61)]
+        self.assertEqual(order[0], "max")
+        self.assertEqual(order[1:], [n for p in (2, 1, 0) for n in range(60) if n % 3 == p])
+
+    def test_legacy_list_queue_is_migrated_in_fifo_order(self):
+        bus = self._bus()
+        for n in (1, 2):
+            self.client.rpush("gortex:tasks:research", json.dumps({"n": n}))
+        self.assertTrue(bus.enqueue_task("gortex:tasks:research", {"n": 3}))
+        self.assertEqual([bus.dequeue_task("gortex:tasks:research")["n"] for _ in range(3)], [1, 2, 3])
+
+        self.client.rpush("legacy", json.dumps({"n": 4}))
+        self.assertEqual(bus.queue_size("legacy"), 1)
+        self.assertEqual(bus.dequeue_task("legacy", timeout=1), {"n": 4})
+
+@unittest.skipIf(fakeredis is None, "fakeredis not installed")
+class TestRedisWorkerRegistry(unittest.TestCase):
+    def setUp(self):
+        self.client = fakeredis.FakeRedis(decode_responses=True)
+        with patch("redis.from_url", return_value=self.client):
+            self.bus = RedisMessageBus(url="redis://fake:6379/0")
+        self.addCleanup(self.bus.shutdown)
+
+    def test_stale_workers_are_trimmed(self):
+        now = time.time()
+        self.bus.register_worker({"worker_id": "fresh", "cpu_percent": 10, "last_seen": now})
+        self.bus.register_worker({"worker_id": "busy", "cpu_percent": 90, "last_seen": now})
+        self.bus.register_worker({"worker_id": "gone", "cpu_percent": 0, "last_seen": now - settings.MQ_WORKER_TTL - 1})
+
+        self.assertEqual(sorted(w["worker_id"] for w in self.bus.list_active_workers()), ["busy", "fresh"])
+        self.assertEqual(self.bus.select_best_worker(), "fresh")
+        self.assertTrue(self.client.hexists(self.bus.WORKER_STATS, "gone"))
+
+        self.assertEqual(self.bus.reap_stale_workers(), ["gone"])
+        self.assertIsNone(self.client.zscore(self.bus.WORKER_REGISTRY, "gone"))
+        self.assertFalse(self.client.hexists(self.bus.WORKER_STATS, "gone"))
+        self.assertEqual(self.bus.reap_stale_workers(), [])
+
 if __name__ == "__main__":
     unittest.main()
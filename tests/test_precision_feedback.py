@@ -2,7 +2,9 @@ import unittest
 import json
 import os
 import shutil
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch, PropertyMock
+from gortex.core.mq import mq_bus
+from gortex.core.storage import MockStorage
 from gortex.utils.economy import get_economy_manager
 from gortex.agents.analyst.reflection import ReflectionAnalyst
 from gortex.core.evolutionary_memory import EvolutionaryMemory
@@ -19,6 +21,10 @@ class TestPrecisionFeedback(unittest.TestCase):
         self.test_mem_dir = "tests/test_memory_feedback"
         if os.path.exists(self.test_mem_dir):
             shutil.rmtree(self.test_mem_dir)
+        # 공용 프로젝트 저장소(.gortex/storage.db) 대신 테스트 전용 Storage 사용
+        storage_patcher = patch.object(type(mq_bus), "storage", new_callable=PropertyMock, return_value=MockStorage())
+        storage_patcher.start()
+        self.addCleanup(storage_patcher.stop)
         self.memory = EvolutionaryMemory(base_dir=self.test_mem_dir)
 
     def tearDown(self):
@@ -0,0 +1,28 @@
+import unittest
+
+from gortex.core.routing import ConsistentHashRing
+
+
+class TestConsistentHashRing(unittest.TestCase):
+    def setUp(self):
+        self.keys = [f"thread-{i}" for i in range(2000)]
+
+    def test_adding_a_worker_moves_few_keys(self):
+        ring = ConsistentHashRing(["w1", "w2", "w3"])
+        before = {k: ring.route(k, lambda w: False) for k in self.keys}
+        ring.add("w4")
+        moved = [k for k in self.keys if ring.route(k, lambda w: False) != before[k]]
+        self.assertTrue(all(ring.route(k, lambda w: False) == "w4" for k in moved))
+        self.assertLess(len(moved), len(self.keys) * 0.4)
+        self.assertGreater(len(moved), len(self.keys) * 0.1)
+
+    def test_saturated_owner_spills_to_next_worker(self):
+        ring = ConsistentHashRing(["w1", "w2", "w3"])
+        owner, second, _ = ring.preference("thread-7")
+        self.assertEqual(ring.route("thread-7", lambda w: w == owner), second)
+        self.assertIsNone(ring.route("thread-7", lambda w: True))
+        self.assertEqual(ConsistentHashRing().preference("thread-7"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+import unittest
+
+from gortex.core.state_delta import (SnapshotCache, apply_delta, delta_size, diff_snapshots, restore_state,
+                                     snapshot_size, snapshot_state, state_version)
+
+
+class TestStateDelta(unittest.TestCase):
+    def setUp(self):
+        self.base = {"thread_id": "t1", "messages": [["user", "hi"], ["ai", "hello " * 100]],
+                     "file_cache": {"a.py": "x = 1"}, "next_node": "coder", "plan": ["step 1"]}
+
+    def test_append_only_history_ships_only_the_tail(self):
+        new = dict(self.base, messages=self.base["messages"] + [["user", "next"]], next_node="analyst")
+        new.pop("plan")
+        delta = diff_snapshots(snapshot_state(self.base), snapshot_state(new))
+        self.assertEqual(delta["append"], {"messages": ['["user", "next"]']})
+        self.assertEqual(delta["set"], {"next_node": '"analyst"'})
+        self.assertEqual(delta["unset"], ["plan"])
+        self.assertLess(delta_size(delta), snapshot_size(snapshot_state(new)) // 10)
+        self.assertEqual(restore_state(apply_delta(snapshot_state(self.base), delta)), new)
+
+    def test_rewritten_list_is_replaced(self):
+        new = dict(self.base, messages=[["system", "summary"]])
+        delta = diff_snapshots(snapshot_state(self.base), snapshot_state(new))
+        self.assertEqual(delta["append"], {})
+        self.assertEqual(restore_state(apply_delta(snapshot_state(self.base), delta)), new)
+
+    def test_version_is_content_addressed(self):
+        same = {k: self.base[k] for k in reversed(list(self.base))}
+        self.assertEqual(state_version(snapshot_state(self.base)), state_version(snapshot_state(same)))
+        self.assertNotEqual(state_version(snapshot_state(self.base)), state_version(snapshot_state(dict(self.base, next_node="x"))))
+
+    def test_snapshot_cache_evicts_least_recent(self):
+        cache = SnapshotCache(2)
+        cache.put("a", {}); cache.put("b", {})
+        cache.get("a")
+        cache.put("c", {})
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("a"))
+
+
+if __name__ == "__main__":
+    unittest.main()
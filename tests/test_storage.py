@@ -1,12 +1,13 @@
 import unittest
 import os
 import json
+import time
 import asyncio
 import shutil
 from typing import Any, Dict
 from unittest.mock import MagicMock, patch
 from tests.contracts import BaseStorageContract
-from gortex.core.storage import SqliteStorage, RedisStorage
+from gortex.core.storage import SqliteStorage, RedisStorage, MockStorage, CachedStorage
 
 try:
     import redis
@@ -22,7 +23,7 @@ class TestSqliteStorage(BaseStorageContract, unittest.TestCase):
 
     def tearDown(self):
         # Close connection to allow file deletion
-        self.storage.conn.close()
+        self.storage.close()
         if os.path.exists(self.db_path):
             os.remove(self.db_path)
 
@@ -80,6 +81,168 @@ class TestSqliteStorage(BaseStorageContract, unittest.TestCase):
 
         asyncio.run(run_test())
 
+    def test_threads_use_own_wal_connections(self):
+        """
+        Each thread writes through its own WAL connection; an NX key is won by exactly one thread.
+        """
+        import threading
+        winners = []
+        def worker(n):
+            for i in range(50):
+                self.storage.set(f"thread:{n}:{i}", str(i))
+            if self.storage.set("lock:leader", str(n), ex=30, nx=True):
+                winners.append(n)
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+        for t in threads: t.start()
+        for t in threads: t.join()
+
+        self.assertEqual(len(winners), 1)
+        self.assertEqual(len(self.storage.keys("thread:*")), 400)
+        self.assertEqual(self.storage.conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+        indexes = [row[1] for row in self.storage.conn.execute("PRAGMA index_list(kv)")]
+        self.assertIn("idx_kv_expires_at", indexes)
+
+    def test_keys_glob_matches_redis_semantics(self):
+        for key in ("gortex:workers:w1", "gortex:workers:w2", "gortex:workersX", "GORTEX:workers:w3",
+                    "rate:100%", "rate:1000", "user_1", "userA1", "lit*:a", "lit:a"):
+            self.storage.set(key, "v")
+
+        self.assertEqual(sorted(self.storage.keys("gortex:workers:*")), ["gortex:workers:w1", "gortex:workers:w2"])
+        self.assertEqual(self.storage.keys("rate:100%"), ["rate:100%"]) # % and _ are not wildcards
+        self.assertEqual(self.storage.keys("user_?"), ["user_1"])
+        self.assertEqual(sorted(self.storage.keys("gortex:workers:w[12]")), ["gortex:workers:w1", "gortex:workers:w2"])
+        self.assertEqual(self.storage.keys("gortex:*:w[^1]"), ["gortex:workers:w2"]) # case-sensitive
+        self.assertEqual(self.storage.keys("lit\\*:*"), ["lit*:a"])
+        self.assertEqual(len(self.storage.keys("*")), 10)
+        self.assertEqual(sorted(self.storage.scan_iter("*:w?", count=1)), ["GORTEX:workers:w3", "gortex:workers:w1", "gortex:workers:w2"])
+
+    def test_prefix_keys_use_primary_key_range(self):
+        from gortex.core.storage import _glob_to_sql
+        for pattern in ("gortex:workers:*", "gortex:shard:?"):
+            where, params = _glob_to_sql(pattern)
+            plan = " ".join(row[-1] for row in self.storage.conn.execute(f"EXPLAIN QUERY PLAN SELECT key FROM kv WHERE {where}", params))
+            self.assertIn("INDEX sqlite_autoindex_kv_1 (key>? AND key<?)", plan)
+
+    def _write_expired(self, count):
+        past = time.time() - 10
+        with self.storage.conn as conn:
+            conn.executemany("INSERT INTO kv (key, value, expires_at) VALUES (?, ?, ?)",
+                             [(f"old:{i}", "x" * 1024, past) for i in range(count)])
+
+    def test_sweep_expired_reclaims_unread_keys(self):
+        self._write_expired(120)
+        self.storage.set("live:1", "v", ex=3600)
+        self.storage.set("live:2", "v")
+
+        with patch.object(self.storage, "sweep_batch", 50):
+            self.assertEqual(self.storage.sweep_expired(max_batches=2), 100)
+            self.assertEqual(self.storage.sweep_expired(), 20)
+        self.assertEqual(self.storage.conn.execute("SELECT COUNT(*) FROM kv").fetchone()[0], 2)
+        self.assertEqual(self.storage.sweep_stats["reclaimed"], 120)
+        self.assertEqual(self.storage.sweep_stats["last_reclaimed"], 20)
+
+    def test_background_sweeper_with_incremental_vacuum(self):
+        self.storage.close()
+        os.remove(self.db_path)
+        with patch("gortex.core.storage.settings.STORAGE_VACUUM_PAGES", 1000):
+            self.storage = SqliteStorage(db_path=self.db_path, sweep_interval=0.05)
+        self.assertEqual(self.storage.conn.execute("PRAGMA auto_vacuum").fetchone()[0], 2)
+        self._write_expired(200)
+
+        deadline = time.time() + 5
+        while self.storage.sweep_stats["reclaimed"] < 200 and time.time() < deadline:
+            time.sleep(0.05)
+        self.assertEqual(self.storage.sweep_stats["reclaimed"], 200)
+        self.assertGreater(self.storage.sweep_stats["vacuumed_pages"], 0)
+
+class TestMockStorage(BaseStorageContract, unittest.TestCase):
+    def setUp(self):
+        self.storage = MockStorage(sweep_interval=0.05)
+
+    def get_storage(self):
+        return self.storage
+
+    def test_writes_sweep_expired_keys(self):
+        self.storage.set("old", "v", ex=60)
+        self.storage.expiry["old"] = time.time() - 1
+        time.sleep(0.06)
+        self.storage.set("new", "v")
+        self.assertNotIn("old", self.storage.data)
+        self.assertEqual(self.storage.sweep_stats["reclaimed"], 1)
+
+class TestCachedStorage(BaseStorageContract, unittest.TestCase):
+    def setUp(self):
+        self.backend = MockStorage()
+        self.storage = CachedStorage(self.backend, maxsize=8, ttl=30, cache_prefixes=("test:", "gortex:memory:shard:"))
+
+    def get_storage(self):
+        return self.storage
+
+    def test_serves_repeated_reads_from_memory(self):
+        self.backend.set("gortex:memory:shard:coding", "[1]")
+        with patch.object(self.backend, "get", wraps=self.backend.get) as backend_get, \
+                patch.object(self.backend, "mget", wraps=self.backend.mget) as backend_mget:
+            for _ in range(3):
+                self.assertEqual(self.storage.get("gortex:memory:shard:coding"), "[1]")
+                self.assertEqual(self.storage.mget(["gortex:memory:shard:coding", "gortex:memory:shard:design"]), ["[1]", None])
+            self.assertEqual(backend_get.call_count, 2) # one get, plus the one MockStorage.mget makes for "design"
+            self.assertEqual(backend_mget.call_count, 1)
+            self.assertEqual(backend_mget.call_args[0][0], ["gortex:memory:shard:design"])
+
+            self.storage.get("other:key") # outside cache_prefixes: always read through
+            self.storage.get("other:key")
+            self.assertEqual(backend_get.call_count, 4)
+
+    def test_lru_bound_and_entry_ttl(self):
+        for i in range(20):
+            self.storage.set(f"test:lru:{i}", str(i))
+        self.assertEqual(len(self.storage._items), 8)
+        self.assertIn("test:lru:19", self.storage._items)
+
+        self.storage.ttl = 0.05
+        self.storage.get("test:fresh")
+        self.backend.set("test:fresh", "written elsewhere")
+        time.sleep(0.06)
+        self.assertEqual(self.storage.get("test:fresh"), "written elsewhere")
+
+    def test_bus_events_invalidate_other_nodes_writes(self):
+        from gortex.core.mq import LocalMessageBus
+        with patch("gortex.core.mq.settings.STORAGE_CACHE_SIZE", 0):
+            bus = LocalMessageBus()
+        self.storage.bind(bus)
+        self.assertNotIn("gortex:memory_sync", bus._subscribers) # subscribes on first cache use
+
+        self.backend.set("gortex:memory:shard:coding", "v1")
+        self.assertEqual(self.storage.get("gortex:memory:shard:coding"), "v1")
+        deadline = time.time() + 2
+        while len(bus._subscribers.get("gortex:memory_sync", ())) < 1 and time.time() < deadline:
+            time.sleep(0.01)
+        self.backend.set("gortex:memory:shard:coding", "v2") # another node writes behind our back
+        self.assertEqual(self.storage.get("gortex:memory:shard:coding"), "v1")
+        bus.publish_event("gortex:memory_updates", "Memory", "shard_updated", {"category": "coding"})
+        self.assertEqual(self.storage.get("gortex:memory:shard:coding"), "v2")
+
+        self.storage.cache_prefixes += ("gortex:ltm:item:",)
+        self.storage.mget(["gortex:ltm:item:ns:a", "gortex:ltm:item:ns:b"])
+        bus.publish_event("gortex:memory_sync", "Memory", "ltm_updated", {"namespace": "ns", "op": "append", "ids": ["a"]})
+        self.assertNotIn("gortex:ltm:item:ns:a", self.storage._items)
+        self.assertIn("gortex:ltm:item:ns:b", self.storage._items)
+        bus.publish_event("gortex:memory_sync", "Memory", "ltm_updated", {"namespace": "ns", "op": "replace", "ids": []})
+        self.assertNotIn("gortex:ltm:item:ns:b", self.storage._items)
+
+    def test_unbind_stops_invalidation(self):
+        from gortex.core.mq import LocalMessageBus
+        with patch("gortex.core.mq.settings.STORAGE_CACHE_SIZE", 0):
+            bus = LocalMessageBus()
+        self.storage.bind(bus)
+        self.storage.get("gortex:memory:shard:other") # starts the listener
+        self.storage.unbind()
+        self.assertEqual(bus._subscribers["gortex:memory_updates"], [])
+        self.backend.set("gortex:memory:shard:coding", "v1")
+        self.storage.get("gortex:memory:shard:coding")
+        bus.publish_event("gortex:memory_updates", "Memory", "shard_updated", {"category": "coding"})
+        self.assertIn("gortex:memory:shard:coding", self.storage._items)
+
 @unittest.skipIf(redis is None, "Redis not installed")
 class TestRedisStorage(BaseStorageContract, unittest.TestCase):
     def setUp(self):
@@ -90,13 +253,16 @@ class TestRedisStorage(BaseStorageContract, unittest.TestCase):
         def mock_get(key):
             return self._data.get(key)
         
-        def mock_set(key, value, ex=None):
+        def mock_set(key, value, ex=None, nx=False):
             self._data[key] = value
             return True
 
-        def mock_delete(key):
-            if key in self._data:
-                del self._data[key]
+        def mock_mget(keys):
+            return [self._data.get(key) for key in keys]
+
+        def mock_delete(*keys):
+            for key in keys:
+                self._data.pop(key, None)
             return 1
 
         def mock_keys(pattern):
@@ -108,6 +274,10 @@ class TestRedisStorage(BaseStorageContract, unittest.TestCase):
         self.mock_redis.set.side_effect = mock_set
         self.mock_redis.delete.side_effect = mock_delete
         self.mock_redis.keys.side_effect = mock_keys
+        self.mock_redis.scan_iter.side_effect = lambda match, count=None: iter(mock_keys(match))
+        self.mock_redis.mget.side_effect = mock_mget
+        self.mock_redis.mset.side_effect = lambda mapping: self._data.update(mapping) or True
+        self.mock_redis.pipeline.return_value = self.mock_redis # queued SETs apply immediately
 
         self.storage = RedisStorage(client=self.mock_redis)
 
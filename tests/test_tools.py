@@ -1,6 +1,8 @@
 import unittest
 import os
 import shutil
+import tempfile
+from unittest.mock import patch
 from gortex.utils.tools import (
     write_file, get_file_hash, read_file, execute_shell,
     verify_patch_integrity, safe_bulk_delete
@@ -30,6 +32,17 @@ class TestTools(unittest.TestCase):
         read_content = read_file(self.test_file)
         self.assertEqual(read_content, content)
 
+    def test_write_file_reindexes_python_file(self):
+        from gortex.utils.indexer import SynapticIndexer
+        index_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, index_dir)
+        with patch.object(SynapticIndexer, "INDEX_DIR", index_dir):
+            SynapticIndexer().index = {} # 기존 인덱스가 있을 때만 갱신
+            py_file = os.path.join(self.test_dir, "mod.py")
+            write_file(py_file, "def indexed_func():\n    pass\n")
+            defs = SynapticIndexer().index[os.path.relpath(py_file)]
+        self.assertIn("indexed_func", [d["name"] for d in defs])
+
     def test_file_hash(self):
         content = "Hash me"
         write_file(self.test_file, content)
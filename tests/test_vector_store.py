@@ -4,7 +4,9 @@ import tempfile
 import unittest
 from unittest.mock import patch, MagicMock
 
-from gortex.utils.vector_store import LongTermMemory
+import numpy as np
+
+from gortex.utils.vector_store import LongTermMemory, ShardMatrix, IVFIndex, EmbeddingCache, BM25Index
 
 class TestLongTermMemory(unittest.TestCase):
     def setUp(self):
@@ -18,6 +20,9 @@ class TestLongTermMemory(unittest.TestCase):
 
     def tearDown(self):
         self.mq_patcher.stop()
+        # 임시 디렉토리가 삭제된 뒤 종료 시점 flush가 실행되지 않도록 지연 버퍼 폐기
+        for ltm in list(LongTermMemory._live_instances):
+            ltm._dirty.clear()
 
     def test_memorize_and_recall_increments_usage(self):
         with patch.object(LongTermMemory, "_get_embedding", return_value=[1.0, 0.0]):
@@ -28,11 +33,43 @@ class TestLongTermMemory(unittest.TestCase):
                 self.assertEqual(len(results), 1)
                 self.assertEqual(results[0]["score"], 1.0)
                 # Check fallback file creation
-                shard_path = os.path.join(tmpdir, "test_ns_shard.json")
-                with open(shard_path, "r", encoding='utf-8') as f:
-                    data = json.load(f)
+                ltm.flush()
+                reloaded = LongTermMemory(store_dir=tmpdir)
+                data = reloaded._load_shard("test_ns")
                 self.assertEqual(data[0]["usage_count"], 1)
 
+    def test_recall_defers_usage_count_writes_until_flush(self):
+        with patch.object(LongTermMemory, "_get_embedding", return_value=[1.0, 0.0]):
+            with tempfile.TemporaryDirectory() as tmpdir:
+                ltm = LongTermMemory(store_dir=tmpdir)
+                ltm.memorize("hot", namespace="wb")
+                log_path = os.path.join(tmpdir, "wb_shard.jsonl")
+                size = os.path.getsize(log_path)
+                self.mock_mq.storage.mset.reset_mock()
+                self.mock_mq.publish_event.reset_mock()
+
+                for _ in range(3):
+                    ltm.recall("hot", namespace="wb")
+                self.assertEqual(os.path.getsize(log_path), size)
+                self.mock_mq.storage.mset.assert_not_called()
+                self.mock_mq.publish_event.assert_not_called()
+
+                ltm.flush()
+                self.assertEqual(self.mock_mq.storage.mset.call_count, 1)
+                self.assertEqual(len(self.mock_mq.storage.mset.call_args[0][0]), 1)
+                self.assertEqual(self.mock_mq.publish_event.call_count, 1)
+                self.assertEqual(LongTermMemory(store_dir=tmpdir)._load_shard("wb")[0]["usage_count"], 3)
+
+    def test_usage_updates_flush_when_threshold_reached(self):
+        with patch.object(LongTermMemory, "_get_embedding", return_value=[1.0, 0.0]), \
+                patch("gortex.utils.vector_store.settings.LTM_FLUSH_THRESHOLD", 1):
+            with tempfile.TemporaryDirectory() as tmpdir:
+                ltm = LongTermMemory(store_dir=tmpdir)
+                ltm.memorize("hot", namespace="th")
+                ltm.recall("hot", namespace="th")
+                self.assertEqual(ltm._dirty, {})
+                self.assertEqual(LongTermMemory(store_dir=tmpdir)._load_shard("th")[0]["usage_count"], 1)
+
     def test_embedding_failure_falls_back_to_zero_vector(self):
         with patch("gortex.utils.vector_store.GortexAuth.get_current_client", side_effect=Exception("failure")):
             with tempfile.TemporaryDirectory() as tmpdir:
@@ -51,5 +88,337 @@ class TestLongTermMemory(unittest.TestCase):
                 results = ltm.recall("entry", namespace="low", limit=1)
                 self.assertEqual(results, [])
 
+    def test_recall_ranks_top_k_by_cosine_similarity(self):
+        vectors = {"alpha": [1.0, 0.0], "beta": [0.8, 0.6], "gamma": [0.0, 1.0], "query": [1.0, 0.1]}
+        with patch.object(LongTermMemory, "_get_embedding", side_effect=lambda text: vectors[text]):
+            with tempfile.TemporaryDirectory() as tmpdir:
+                ltm = LongTermMemory(store_dir=tmpdir)
+                for text in ("gamma", "beta", "alpha"):
+                    ltm.memorize(text, namespace="rank")
+                results = ltm.recall("query", namespace="rank", limit=2)
+                self.assertEqual([r["content"] for r in results], ["alpha", "beta"])
+                self.assertEqual(set(results[0].keys()), {"content", "metadata", "score"})
+
+    def test_matrix_updates_incrementally_and_rebuilds_on_replace(self):
+        with patch.object(LongTermMemory, "_get_embedding", return_value=[1.0, 0.0]):
+            with tempfile.TemporaryDirectory() as tmpdir:
+                ltm = LongTermMemory(store_dir=tmpdir)
+                ltm.memorize("first", namespace="inc")
+                matrix = ltm._matrices["inc"][1]
+                ltm.memorize("second", namespace="inc")
+                self.assertIs(ltm._matrices["inc"][1], matrix)
+                self.assertEqual(matrix.size, 2)
+
+                ltm.memory = [{"id": "x", "content": "replaced", "vector": [1.0, 0.0]}]
+                results = ltm.recall("anything", namespace="global")
+                self.assertEqual(results[0]["content"], "replaced")
+
+    def test_save_store_invalidates_in_place_vector_edits(self):
+        vectors = {"a": [1.0, 0.0], "b": [0.0, 1.0], "query": [0.0, 1.0]}
+        with patch.object(LongTermMemory, "_get_embedding", side_effect=lambda text: vectors[text]):
+            with tempfile.TemporaryDirectory() as tmpdir:
+                ltm = LongTermMemory(store_dir=tmpdir)
+                ltm.memorize("a")
+                ltm.memorize("b")
+                self.assertEqual(ltm.recall("query", limit=1)[0]["content"], "b")
+
+                ltm.memory[0]["vector"] = [0.0, 1.0]
+                ltm.memory[1]["vector"] = [1.0, 0.0]
+                ltm._save_store()
+                self.assertEqual(ltm.recall("query", limit=1)[0]["content"], "a")
+
+    def test_ivf_full_probe_matches_exact_search(self):
+        rng = np.random.default_rng(7)
+        matrix = ShardMatrix.from_array(rng.standard_normal((400, 16)).astype(np.float32))
+        index = IVFIndex.build(matrix)
+        query = rng.standard_normal(16)
+        exact = matrix.top_k(query, 5)
+        approx = index.search(matrix, query, 5, nprobe=len(index.centroids))
+        self.assertEqual([row for _, row in approx], [row for _, row in exact])
+
+    def test_recall_uses_persisted_ann_index_above_threshold(self):
+        vectors = {f"item{i}": [float(i % 7), float(i % 5), 1.0] for i in range(30)}
+        vectors["query"] = [6.0, 4.0, 1.0]
+        with patch.object(LongTermMemory, "_get_embedding", side_effect=lambda text: vectors[text]):
+            with tempfile.TemporaryDirectory() as tmpdir:
+                ltm = LongTermMemory(store_dir=tmpdir, ann_threshold=20, ann_nprobe=64)
+                for i in range(30):
+                    ltm.memorize(f"item{i}", namespace="ann")
+                results = ltm.recall("query", namespace="ann", limit=1)
+                self.assertEqual(results[0]["score"], 1.0)
+                self.assertTrue(os.path.exists(os.path.join(tmpdir, "ann_ivf.npz")))
+
+                reloaded = LongTermMemory(store_dir=tmpdir, ann_threshold=20)
+                matrix = reloaded._get_matrix("ann", reloaded._load_shard("ann"), 3)
+                self.assertIsNotNone(reloaded._load_ann_index("ann", matrix))
+
+    def test_shard_writes_are_append_only_and_load_memory_mapped(self):
+        with patch.object(LongTermMemory, "_get_embedding", return_value=[1.0, 0.0, 0.0]):
+            with tempfile.TemporaryDirectory() as tmpdir:
+                ltm = LongTermMemory(store_dir=tmpdir)
+                ltm.memorize("first", namespace="bin")
+                vector_path = os.path.join(tmpdir, "bin_shard.f32")
+                log_path = os.path.join(tmpdir, "bin_shard.jsonl")
+                with open(log_path, "r", encoding='utf-8') as f:
+                    head = f.read()
+
+                ltm.memorize("second", namespace="bin")
+                self.assertEqual(os.path.getsize(vector_path), 2 * 3 * 4)
+                with open(log_path, "r", encoding='utf-8') as f:
+                    self.assertTrue(f.read().startswith(head))
+
+                reloaded = LongTermMemory(store_dir=tmpdir)
+                shard = reloaded._load_shard("bin")
+                self.assertEqual([item["content"] for item in shard], ["first", "second"])
+                self.assertFalse(reloaded._matrices["bin"][1].vectors.flags.owndata) # 메모리 맵을 복사 없이 채택
+                self.assertIsInstance(shard[1]["vector"], np.memmap) # 항목 벡터도 메모리 맵 행의 뷰
+                self.assertFalse(shard[1]["vector"].flags.writeable)
+                self.assertEqual(shard[1]["vector"].tolist(), [1.0, 0.0, 0.0])
+                self.assertEqual(reloaded.recall("first", namespace="bin", limit=1)[0]["score"], 1.0)
+
+    def test_local_shard_is_reconciled_with_storage_items_on_load(self):
+        with patch.object(LongTermMemory, "_get_embedding", return_value=[1.0, 0.0, 0.0]):
+            with tempfile.TemporaryDirectory() as tmpdir:
+                ltm = LongTermMemory(store_dir=tmpdir)
+                ltm.memorize("local", namespace="rec")
+                prefix = ltm._get_item_key_prefix("rec")
+                local_id = ltm.shards["rec"][0]["id"]
+                remote = {"id": "r1", "content": "written while down", "vector": [0.0, 1.0, 0.0]}
+                stored = {prefix + local_id: ltm._encode_item(ltm.shards["rec"][0], 0),
+                          prefix + "r1": ltm._encode_item(remote, 1)}
+                self.mock_mq.storage.scan_iter.side_effect = lambda pattern, count=500: iter(stored)
+                self.mock_mq.storage.mget.side_effect = lambda keys: [stored.get(k) for k in keys]
+
+                reloaded = LongTermMemory(store_dir=tmpdir)
+                shard = reloaded._load_shard("rec")
+                self.assertEqual([item["content"] for item in shard], ["local", "written while down"])
+                self.assertEqual(self.mock_mq.storage.mget.call_args[0][0], [prefix + "r1"])
+                again = LongTermMemory(store_dir=tmpdir)._load_shard("rec")
+                self.assertEqual(len(again), 2)
+
+    def test_sync_listener_uses_shared_bus_loop_and_closes_with_instance(self):
+        import gc
+        with tempfile.TemporaryDirectory() as tmpdir:
+            ltm = LongTermMemory(store_dir=tmpdir)
+            channels, callback = self.mock_mq.add_listener.call_args[0]
+            self.assertEqual(channels, ("gortex:memory_sync",))
+            self.mock_mq.listen.assert_not_called()
+            listener = self.mock_mq.add_listener.return_value
+
+            ltm.shards["ns"] = []
+            callback({"payload": {"namespace": "ns", "origin": "other", "op": "replace"}})
+            self.assertNotIn("ns", ltm.shards)
+            listener.close.assert_not_called()
+
+            del ltm
+            gc.collect()
+            listener.close.assert_called_once()
+
+    def test_remote_sync_applies_only_changed_items_to_loaded_shard(self):
+        with patch.object(LongTermMemory, "_get_embedding", return_value=[1.0, 0.0, 0.0]):
+            with tempfile.TemporaryDirectory() as tmpdir:
+                ltm = LongTermMemory(store_dir=tmpdir)
+                ltm.memorize("local", namespace="live")
+                ltm.recall("local", namespace="live")
+                ltm.flush()
+                shard = ltm.shards["live"]
+                version = ltm._versions.get("live", 0)
+                prefix = ltm._get_item_key_prefix("live")
+                local = dict(shard[0], usage_count=7)
+                remote = {"id": "r1", "content": "from peer", "vector": [0.0, 1.0, 0.0]}
+                stored = {prefix + local["id"]: ltm._encode_item(local, 0), prefix + "r1": ltm._encode_item(remote, 1)}
+                self.mock_mq.storage.mget.side_effect = lambda keys: [stored.get(k) for k in keys]
+                self.mock_mq.storage.scan_iter.reset_mock()
+                callback = self.mock_mq.add_listener.call_args[0][1]
+
+                callback({"payload": {"namespace": "live", "origin": "peer", "op": "append", "ids": [local["id"], "r1"]}})
+                self.assertIs(ltm.shards["live"], shard)
+                self.assertEqual([item["content"] for item in shard], ["local", "from peer"])
+                self.assertEqual(shard[0]["usage_count"], 7)
+                self.mock_mq.storage.scan_iter.assert_not_called()
+                self.assertEqual(ltm._versions["live"], version + 1)
+
+                ltm.recall("from peer", namespace="live")
+                self.assertEqual(ltm._matrices["live"][1].synced, 2)
+                self.assertEqual(len(LongTermMemory(store_dir=tmpdir)._load_shard("live")), 2)
+
+    def test_instances_sharing_a_directory_do_not_duplicate_synced_items(self):
+        stored = {}
+        self.mock_mq.storage.mset.side_effect = lambda mapping, ex=None: stored.update(mapping)
+        self.mock_mq.storage.mget.side_effect = lambda keys: [stored.get(k) for k in keys]
+        self.mock_mq.storage.scan_iter.side_effect = lambda pattern, count=500: iter(k for k in list(stored) if k.startswith(pattern[:-1]))
+
+        def deliver(channel, source, event_type, payload):
+            for call in self.mock_mq.add_listener.call_args_list:
+                call[0][1]({"payload": payload})
+        self.mock_mq.publish_event.side_effect = deliver
+
+        with patch.object(LongTermMemory, "_get_embedding", return_value=[1.0, 0.0, 0.0]):
+            with tempfile.TemporaryDirectory() as tmpdir:
+                first = LongTermMemory(store_dir=tmpdir)
+                second = LongTermMemory(store_dir=tmpdir)
+                first.memorize("one", namespace="shared")
+                second._load_shard("shared")
+                first.memorize("two", namespace="shared")
+                second.memorize("three", namespace="shared")
+
+                self.assertEqual([item["content"] for item in second.shards["shared"]], ["one", "two", "three"])
+                with open(os.path.join(tmpdir, "shared_shard.jsonl"), "r", encoding='utf-8') as f:
+                    added = [r["item"]["id"] for r in map(json.loads, f) if r["op"] == "add"]
+                self.assertEqual(len(added), len(set(added)))
+                self.assertEqual(os.path.getsize(os.path.join(tmpdir, "shared_shard.f32")), 3 * 3 * 4)
+                shard = LongTermMemory(store_dir=tmpdir)._load_shard("shared")
+                self.assertEqual([item["content"] for item in shard], ["one", "two", "three"])
+
+    def test_shard_load_keeps_last_record_per_id_and_writers_get_distinct_rows(self):
+        import threading
+        from gortex.utils.vector_store import ShardFile
+        with tempfile.TemporaryDirectory() as tmpdir:
+            writers = [ShardFile(tmpdir, "race") for _ in range(4)]
+
+            def write(index, shard_file):
+                for n in range(25):
+                    shard_file.append([{"id": f"{index}-{n}", "content": str(n), "vector": [float(index), float(n)]}])
+            threads = [threading.Thread(target=write, args=(i, w)) for i, w in enumerate(writers)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            writers[0].append([{"id": "0-0", "content": "again", "vector": [9.0, 9.0]}]) # 이미 디스크에 있는 ID
+
+            shard, vectors, rows = ShardFile(tmpdir, "race").load()
+            self.assertEqual(len(shard), 100)
+            self.assertEqual(sorted(rows), list(range(100)))
+            self.assertTrue(all(list(item["vector"]) == [float(i) for i in item["id"].split("-")] for item in shard))
+
+            with open(os.path.join(tmpdir, "race_shard.jsonl"), "a", encoding='utf-8') as f:
+                f.write(json.dumps({"op": "add", "item": {"id": "0-0", "content": "replayed"}, "row": 5}) + "\n")
+            shard, _, rows = ShardFile(tmpdir, "race").load()
+            self.assertEqual(len(shard), 100)
+            replayed = [(item, row) for item, row in zip(shard, rows) if item["id"] == "0-0"]
+            self.assertEqual([(item["content"], row) for item, row in replayed], [("replayed", 5)])
+
+    def test_partial_vector_row_is_ignored_on_load_and_repaired_on_append(self):
+        with patch.object(LongTermMemory, "_get_embedding", return_value=[1.0, 0.0, 0.0]):
+            with tempfile.TemporaryDirectory() as tmpdir:
+                ltm = LongTermMemory(store_dir=tmpdir)
+                ltm.memorize("first", namespace="torn")
+                vector_path = os.path.join(tmpdir, "torn_shard.f32")
+                with open(vector_path, "ab") as f:
+                    f.write(b"\x00" * 5)
+
+                reloaded = LongTermMemory(store_dir=tmpdir)
+                self.assertEqual(len(reloaded._load_shard("torn")), 1)
+                self.assertEqual(os.path.getsize(vector_path), 3 * 4 + 5)
+
+                reloaded.memorize("second", namespace="torn")
+                self.assertEqual(os.path.getsize(vector_path), 2 * 3 * 4)
+                shard = LongTermMemory(store_dir=tmpdir)._load_shard("torn")
+                self.assertEqual([list(item["vector"]) for item in shard], [[1.0, 0.0, 0.0]] * 2)
+
+    def test_legacy_json_shard_is_migrated(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            legacy = [{"id": "old", "content": "legacy", "vector": [0.0, 1.0], "metadata": {}, "usage_count": 2, "links": []}]
+            with open(os.path.join(tmpdir, "mig_shard.json"), "w", encoding='utf-8') as f:
+                json.dump(legacy, f)
+            ltm = LongTermMemory(store_dir=tmpdir)
+            self.assertEqual(ltm._load_shard("mig")[0]["content"], "legacy")
+            self.assertTrue(os.path.exists(os.path.join(tmpdir, "mig_shard.jsonl")))
+            self.assertEqual(LongTermMemory(store_dir=tmpdir)._load_shard("mig")[0]["usage_count"], 2)
+
+    def _mock_embedding_client(self):
+        client = MagicMock()
+        def embed_content(model, contents):
+            return MagicMock(embeddings=[MagicMock(values=[float(len(text)), 1.0]) for text in contents])
+        client.models.embed_content.side_effect = embed_content
+        return client
+
+    def test_embed_batch_uses_cache_and_batches_misses(self):
+        client = self._mock_embedding_client()
+        with patch("gortex.utils.vector_store.GortexAuth.get_current_client", return_value=client), \
+                patch("gortex.utils.vector_store.settings.LTM_EMBED_BATCH_SIZE", 2):
+            with tempfile.TemporaryDirectory() as tmpdir:
+                ltm = LongTermMemory(store_dir=tmpdir)
+                vectors = ltm.embed_batch(["a", "bb", "a", "ccc"])
+                self.assertEqual(vectors, [[1.0, 1.0], [2.0, 1.0], [1.0, 1.0], [3.0, 1.0]])
+                self.assertEqual(client.models.embed_content.call_count, 2)
+
+                self.assertEqual(ltm._get_embedding("bb"), [2.0, 1.0])
+                self.assertEqual(client.models.embed_content.call_count, 2)
+
+                # 재시작 후에도 파일에서 복원
+                EmbeddingCache._instances.clear()
+                restarted = LongTermMemory(store_dir=tmpdir)
+                self.assertEqual(restarted._get_embedding("ccc"), [3.0, 1.0])
+                self.assertEqual(client.models.embed_content.call_count, 2)
+
+    def test_embedding_cache_evicts_least_recently_used(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache = EmbeddingCache(os.path.join(tmpdir, "cache.jsonl"), max_entries=2)
+            cache.put_many([("a", [1.0]), ("b", [2.0])])
+            cache.get("a")
+            cache.put_many([("c", [3.0])])
+            self.assertIsNone(cache.get("b"))
+            self.assertEqual(cache.get("a"), [1.0])
+
+    def test_memorize_many_embeds_once(self):
+        client = self._mock_embedding_client()
+        with patch("gortex.utils.vector_store.GortexAuth.get_current_client", return_value=client):
+            with tempfile.TemporaryDirectory() as tmpdir:
+                ltm = LongTermMemory(store_dir=tmpdir)
+                ltm.memorize_many(["x", "yy"], [{"n": 1}, {"n": 2}], namespace="bulk")
+                shard = ltm._load_shard("bulk")
+                self.assertEqual([item["metadata"]["n"] for item in shard], [1, 2])
+                self.assertEqual(client.models.embed_content.call_count, 1)
+
+    def test_bm25_ranks_rarer_terms_higher(self):
+        index = BM25Index()
+        index.sync([
+            {"content": "redis cache layer"},
+            {"content": "redis sharding engine"},
+            {"content": "vector cache"},
+        ])
+        hits = index.search("sharding redis", limit=3)
+        self.assertEqual(hits[0][1], 1)
+        self.assertEqual({i for _, i in hits}, {0, 1})
+
+    def test_hybrid_search_survives_zero_vector_embeddings(self):
+        with patch.object(LongTermMemory, "_get_embedding", return_value=[0.0, 0.0]):
+            with tempfile.TemporaryDirectory() as tmpdir:
+                ltm = LongTermMemory(store_dir=tmpdir)
+                ltm.memorize("sharding engine enabled", namespace="deg")
+                ltm.memorize("unrelated note", namespace="deg")
+                self.assertEqual(ltm.recall("sharding", namespace="deg"), [])
+                results = ltm.search("sharding", namespace="deg", mode="hybrid")
+                self.assertEqual([r["content"] for r in results], ["sharding engine enabled"])
+
+    def test_hybrid_fuses_vector_and_lexical_rankings(self):
+        vectors = {"alpha notes": [1.0, 0.0], "beta notes": [0.9, 0.1], "gamma": [0.0, 1.0], "beta": [1.0, 0.0]}
+        with patch.object(LongTermMemory, "_get_embedding", side_effect=lambda text: vectors[text]):
+            with tempfile.TemporaryDirectory() as tmpdir:
+                ltm = LongTermMemory(store_dir=tmpdir)
+                for text in ("alpha notes", "beta notes", "gamma"):
+                    ltm.memorize(text, namespace="fuse")
+                vector_only = ltm.recall("beta", namespace="fuse", limit=1)
+                hybrid = ltm.recall("beta", namespace="fuse", limit=1, mode="hybrid")
+                self.assertEqual(vector_only[0]["content"], "alpha notes")
+                self.assertEqual(hybrid[0]["content"], "beta notes")
+
+    def test_recall_rejects_unknown_mode(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            ltm = LongTermMemory(store_dir=tmpdir)
+            with self.assertRaises(ValueError):
+                ltm.recall("anything", mode="hybird")
+
+    def test_lexical_index_rebuilds_after_in_place_content_edit(self):
+        with patch.object(LongTermMemory, "_get_embedding", return_value=[1.0, 0.0]):
+            with tempfile.TemporaryDirectory() as tmpdir:
+                ltm = LongTermMemory(store_dir=tmpdir)
+                ltm.memorize("redis cache")
+                self.assertEqual(len(ltm.recall("sharding", mode="lexical")), 0)
+                ltm.memory[0]["content"] = "redis sharding"
+                ltm._save_store()
+                self.assertEqual(ltm.recall("sharding", mode="lexical")[0]["content"], "redis sharding")
+
 if __name__ == '__main__':
     unittest.main()
@@ -1,82 +1,456 @@
 import ast
+import hashlib
 import os
 import json
 import logging
+import sqlite3
+from collections.abc import MutableMapping
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
+
+from gortex.config.settings import settings
 
 logger = logging.getLogger("GortexIndexer")
 
+
+class _DefinitionCollector(ast.NodeVisitor):
+    """정의/임포트/호출 정보를 AST 1회 순회로 수집 (함수 본문 재순회 없음)"""
+
+    def __init__(self):
+        self.definitions: List[Dict[str, Any]] = []
+        self._calls_stack: List[Dict[str, None]] = [] # 바깥 함수까지 호출을 누적 (순서 유지 중복 제거)
+
+    def collect(self, tree: ast.AST) -> List[Dict[str, Any]]:
+        self.visit(tree)
+        return self.definitions
+
+    def visit_ClassDef(self, node: ast.ClassDef):
+        self.definitions.append({
+            "type": "class",
+            "name": node.name,
+            "bases": [ast.unparse(b) for b in node.bases],
+            "line": node.lineno,
+            "docstring": ast.get_docstring(node)
+        })
+        self.generic_visit(node)
+
+    def visit_FunctionDef(self, node: ast.FunctionDef):
+        entry = {
+            "type": "function",
+            "name": node.name,
+            "line": node.lineno,
+            "args": [arg.arg for arg in node.args.args],
+            "calls": [],
+            "docstring": ast.get_docstring(node)
+        }
+        self.definitions.append(entry)
+        calls: Dict[str, None] = {}
+        self._calls_stack.append(calls)
+        self.generic_visit(node)
+        self._calls_stack.pop()
+        entry["calls"] = list(calls)
+
+    def visit_Call(self, node: ast.Call):
+        if self._calls_stack:
+            try:
+                call_name = ast.unparse(node.func)
+                for calls in self._calls_stack:
+                    calls[call_name] = None
+            except Exception:
+                pass
+        self.generic_visit(node)
+
+    def visit_Import(self, node: ast.Import):
+        for alias in node.names:
+            self.definitions.append({"type": "import", "name": alias.name, "line": node.lineno})
+
+    def visit_ImportFrom(self, node: ast.ImportFrom):
+        self.definitions.append({"type": "import_from", "module": node.module, "names": [alias.name for alias in node.names], "line": node.lineno})
+
+
+def _parse_file(full_path: str, known_hash: Optional[str] = None) -> Tuple[Optional[str], Optional[List[Dict[str, Any]]], Optional[str]]:
+    """파일을 읽어 해시하고, 내용이 바뀐 경우에만 파싱 (프로세스 풀 워커에서도 사용)
+    반환: (hash, definitions, error) - hash가 known_hash와 같으면 definitions는 None
+    """
+    try:
+        with open(full_path, "rb") as f:
+            raw = f.read()
+    except OSError as e:
+        return None, None, str(e)
+    digest = hashlib.sha1(raw).hexdigest()
+    if digest == known_hash:
+        return digest, None, None
+    try:
+        return digest, _DefinitionCollector().collect(ast.parse(raw.decode("utf-8"))), None
+    except Exception as e:
+        return digest, None, str(e)
+
+
+class _IndexStore:
+    """SQLite 기반 인덱스 저장소
+    files(파일별 변경 감지 정보) / symbols(정의 JSON) / refs(호출·상속·임포트 역참조) /
+    symbols_fts(심볼명·독스트링 FTS5 trigram) 테이블로 구성되며, 파일 단위로 행을 교체합니다.
+    경로는 프로젝트 루트 기준 상대 경로이므로, meta 테이블에 기록된 루트가 다르면 내용을 비우고 새로 인덱싱합니다.
+    trigram 토크나이저(SQLite 3.34+)나 FTS5가 없는 빌드에서는 symbols_fts를 일반 테이블로 만들고 LIKE로 검색합니다.
+    """
+    SCHEMA_VERSION = 2
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+        CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, mtime REAL, size INTEGER, hash TEXT, indexed INTEGER NOT NULL DEFAULT 0);
+        CREATE TABLE IF NOT EXISTS symbols (id INTEGER PRIMARY KEY, file TEXT NOT NULL, idx INTEGER NOT NULL, data TEXT NOT NULL);
+        CREATE INDEX IF NOT EXISTS symbols_file ON symbols(file, idx);
+        CREATE TABLE IF NOT EXISTS refs (kind TEXT NOT NULL, key TEXT NOT NULL, file TEXT NOT NULL, symbol_id INTEGER NOT NULL);
+        CREATE INDEX IF NOT EXISTS refs_key ON refs(kind, key);
+        CREATE INDEX IF NOT EXISTS refs_file ON refs(file);
+    """
+    FTS_SCHEMA = "CREATE VIRTUAL TABLE IF NOT EXISTS symbols_fts USING fts5(name, docstring, tokenize='trigram')"
+    FALLBACK_SCHEMA = "CREATE TABLE IF NOT EXISTS symbols_fts (name TEXT, docstring TEXT)"
+
+    def __init__(self, path: str, root: str):
+        self.path = path
+        self.root = root
+        dirname = os.path.dirname(path)
+        if dirname:
+            os.makedirs(dirname, exist_ok=True)
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            with open(path, "rb") as f:
+                is_sqlite = f.read(16) == b"SQLite format 3\x00"
+            if not is_sqlite:
+                os.remove(path) # 구버전 JSON 인덱스 (재스캔으로 복구 가능한 캐시)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] != self.SCHEMA_VERSION:
+            self.conn.executescript("DROP TABLE IF EXISTS meta; DROP TABLE IF EXISTS files; DROP TABLE IF EXISTS symbols; DROP TABLE IF EXISTS refs; DROP TABLE IF EXISTS symbols_fts;")
+            self.conn.execute(f"PRAGMA user_version={self.SCHEMA_VERSION}")
+        self.conn.executescript(self.SCHEMA)
+        try:
+            self.conn.execute(self.FTS_SCHEMA)
+        except sqlite3.OperationalError as e:
+            logger.warning(f"FTS5 trigram search unavailable ({e}); falling back to LIKE matching.")
+            self.conn.execute(self.FALLBACK_SCHEMA)
+        fts_sql = self.conn.execute("SELECT sql FROM sqlite_master WHERE name = 'symbols_fts'").fetchone()[0]
+        self.fts = "fts5" in fts_sql.lower()
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'root'").fetchone()
+        if row is None or row[0] != root:
+            if row is not None:
+                logger.info(f"Index at {path} belongs to {row[0]}; re-indexing for {root}.")
+            self.clear()
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('root', ?)", (root,))
+        self.conn.commit()
+
+    def file_meta(self) -> Dict[str, Tuple[float, int, Optional[str]]]:
+        return {path: (mtime, size, digest) for path, mtime, size, digest in self.conn.execute("SELECT path, mtime, size, hash FROM files")}
+
+    def meta(self, rel_path: str) -> Optional[Tuple[float, int, Optional[str]]]:
+        return self.conn.execute("SELECT mtime, size, hash FROM files WHERE path = ?", (rel_path,)).fetchone()
+
+    def put_file(self, rel_path: str, defs: Optional[List[Dict[str, Any]]], mtime: Optional[float] = None, size: Optional[int] = None, digest: Optional[str] = None):
+        """파일 하나의 정의를 교체 (defs가 None이면 파싱 실패로 기록만 남김)"""
+        self._delete_rows(rel_path)
+        self.conn.execute("INSERT OR REPLACE INTO files (path, mtime, size, hash, indexed) VALUES (?, ?, ?, ?, ?)",
+                          (rel_path, mtime, size, digest, int(defs is not None)))
+        for idx, d in enumerate(defs or []):
+            symbol_id = self.conn.execute("INSERT INTO symbols (file, idx, data) VALUES (?, ?, ?)",
+                                          (rel_path, idx, json.dumps(d, ensure_ascii=False))).lastrowid
+            self.conn.execute("INSERT INTO symbols_fts (rowid, name, docstring) VALUES (?, ?, ?)",
+                              (symbol_id, d.get("name", ""), d.get("docstring") or ""))
+            self.conn.executemany("INSERT INTO refs (kind, key, file, symbol_id) VALUES (?, ?, ?, ?)",
+                                  [(kind, key, rel_path, symbol_id) for kind, key in _references(d)])
+
+    def touch(self, rel_path: str, mtime: float, size: int, digest: str):
+        self.conn.execute("UPDATE files SET mtime = ?, size = ?, hash = ? WHERE path = ?", (mtime, size, digest, rel_path))
+
+    def remove(self, rel_path: str):
+        self._delete_rows(rel_path)
+        self.conn.execute("DELETE FROM files WHERE path = ?", (rel_path,))
+
+    def clear(self):
+        self.conn.executescript("DELETE FROM files; DELETE FROM symbols; DELETE FROM refs; DELETE FROM symbols_fts;")
+
+    def _delete_rows(self, rel_path: str):
+        self.conn.execute("DELETE FROM symbols_fts WHERE rowid IN (SELECT id FROM symbols WHERE file = ?)", (rel_path,))
+        self.conn.execute("DELETE FROM refs WHERE file = ?", (rel_path,))
+        self.conn.execute("DELETE FROM symbols WHERE file = ?", (rel_path,))
+
+    def commit(self):
+        self.conn.commit()
+
+    def get_defs(self, rel_path: str) -> Optional[List[Dict[str, Any]]]:
+        row = self.conn.execute("SELECT indexed FROM files WHERE path = ?", (rel_path,)).fetchone()
+        if not row or not row[0]:
+            return None
+        return [json.loads(data) for (data,) in self.conn.execute("SELECT data FROM symbols WHERE file = ? ORDER BY idx", (rel_path,))]
+
+    def paths(self) -> List[str]:
+        return [path for (path,) in self.conn.execute("SELECT path FROM files WHERE indexed = 1 ORDER BY path")]
+
+    def count(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM files WHERE indexed = 1").fetchone()[0]
+
+    def iter_items(self) -> Iterator[Tuple[str, List[Dict[str, Any]]]]:
+        """(파일, 정의 목록)을 파일 단위로 스트리밍"""
+        for path in self.paths():
+            yield path, [json.loads(data) for (data,) in self.conn.execute("SELECT data FROM symbols WHERE file = ? ORDER BY idx", (path,))]
+
+    def match(self, query: str) -> List[Dict[str, Any]]:
+        """FTS5 trigram 전문 검색 (심볼명 일치 우선, 이후 bm25 순). 3자 미만이거나 FTS5를 쓸 수 없으면 LIKE로 대체"""
+        select = ("SELECT s.file, s.data, instr(lower(symbols_fts.name), ?) > 0 AS in_name "
+                  "FROM symbols_fts JOIN symbols s ON s.id = symbols_fts.rowid ")
+        if self.fts and len(query) >= 3:
+            rows = self.conn.execute(select + "WHERE symbols_fts MATCH ? ORDER BY in_name DESC, bm25(symbols_fts, 10.0, 1.0)",
+                                     (query, '"' + query.replace('"', '""') + '"'))
+        else:
+            pattern = "%" + query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            rows = self.conn.execute(select + "WHERE symbols_fts.name LIKE ?2 ESCAPE '\\' OR symbols_fts.docstring LIKE ?2 ESCAPE '\\' ORDER BY in_name DESC",
+                                     (query, pattern))
+        return [{"file": file_path, "score": 100 if in_name else 50, **json.loads(data)} for file_path, data, in_name in rows]
+
+    def references(self, symbol_name: str) -> List[Tuple[str, str, Dict[str, Any]]]:
+        rows = self.conn.execute("SELECT r.kind, r.file, s.data FROM refs r JOIN symbols s ON s.id = r.symbol_id "
+                                 "WHERE r.kind IN ('call', 'base', 'name') AND r.key = ? ORDER BY r.file, s.idx", (symbol_name,))
+        return [(kind, file_path, json.loads(data)) for kind, file_path, data in rows]
+
+    def files_importing(self, module: str) -> Dict[str, None]:
+        rows = self.conn.execute("SELECT DISTINCT file FROM refs WHERE (kind = 'import' AND instr(key, ?) > 0) "
+                                 "OR (kind = 'from' AND key IN (SELECT value FROM json_each(?)))",
+                                 (module, json.dumps(_suffixes(module))))
+        return dict.fromkeys(path for (path,) in rows)
+
+    def files_calling(self, names: Iterable[str]) -> Dict[str, None]:
+        rows = self.conn.execute("SELECT DISTINCT file FROM refs WHERE kind = 'call' AND key IN (SELECT value FROM json_each(?))",
+                                 (json.dumps(list(names)),))
+        return dict.fromkeys(path for (path,) in rows)
+
+    def importers_containing(self, fragment: str) -> Dict[str, None]:
+        rows = self.conn.execute("SELECT DISTINCT file FROM refs WHERE kind IN ('import', 'from') AND instr(key, ?) > 0", (fragment,))
+        return dict.fromkeys(path for (path,) in rows)
+
+
+class _StoredIndex(MutableMapping):
+    """_IndexStore를 {rel_path: definitions} 매핑처럼 노출 (정의는 조회 시점에 로드)"""
+
+    def __init__(self, indexer: "SynapticIndexer"):
+        self._indexer = indexer
+
+    @property
+    def _store(self) -> _IndexStore:
+        return self._indexer._get_store()
+
+    def __getitem__(self, rel_path: str) -> List[Dict[str, Any]]:
+        defs = self._store.get_defs(rel_path)
+        if defs is None:
+            raise KeyError(rel_path)
+        return defs
+
+    def __setitem__(self, rel_path: str, defs: List[Dict[str, Any]]):
+        self._store.put_file(rel_path, defs)
+
+    def __delitem__(self, rel_path: str):
+        if self._store.get_defs(rel_path) is None:
+            raise KeyError(rel_path)
+        self._store.remove(rel_path)
+
+    def __iter__(self):
+        return iter(self._store.paths())
+
+    def __len__(self) -> int:
+        return self._store.count()
+
+    def items(self):
+        return self._store.iter_items()
+
+
+# refs.kind -> find_reverse_dependencies의 type
+_REFERENCE_TYPES = {"call": "call", "base": "inheritance", "name": "import"}
+
+
+def _references(d: Dict[str, Any]) -> List[Tuple[str, str]]:
+    """정의가 참조하는 (종류, 키) 목록 - call: 피호출자, base: 부모 클래스, name: from 임포트 이름, import/from: 모듈"""
+    kind = d.get("type")
+    if kind == "function":
+        return [("call", called) for called in d.get("calls", [])]
+    if kind == "class":
+        return [("base", base) for base in d.get("bases", [])]
+    if kind == "import":
+        return [("import", d["name"])]
+    if kind == "import_from":
+        refs = [("name", name) for name in d.get("names", [])]
+        if d.get("module"):
+            refs.append(("from", d["module"]))
+        return refs
+    return []
+
+
+def _suffixes(module: str) -> List[str]:
+    """module.endswith(x)를 만족하는 모든 비어있지 않은 x"""
+    return [module[i:] for i in range(len(module))]
+
+
+def _parse_batch(jobs: List[Tuple[str, Optional[str]]]) -> List[Tuple[Optional[str], Optional[List[Dict[str, Any]]], Optional[str]]]:
+    return [_parse_file(full_path, known_hash) for full_path, known_hash in jobs]
+
+
 class SynapticIndexer:
     """
     프로젝트의 코드를 정적으로 분석하여 함수, 클래스, 변수 정의를 인덱싱하는 엔진.
+    인덱스는 index_path의 SQLite 저장소에 파일 단위로 기록되며, self.index는 이를 지연 조회하는 매핑입니다.
+    index_path를 지정하지 않으면 루트별 파일(INDEX_DIR/synaptic_index_<루트 해시>.db)을 사용하므로
+    여러 프로젝트를 번갈아 인덱싱해도 서로의 인덱스를 지우지 않습니다.
+    (dict를 대입하면 저장소 내용을 그 dict로 교체합니다)
+    조회 메서드는 인스턴스당 한 번, 첫 조회 전에 증분 스캔을 실행하여 저장된 인덱스를 디스크와 맞춥니다.
     """
+    IGNORED_DIRS = {'.git', 'venv', '__pycache__', 'logs', 'build', 'dist'}
+    INDEX_DIR = "logs"
+
     def __init__(self, root_dir: str = "."):
         self.root_dir = root_dir
-        self.index_path = "logs/synaptic_index.json"
-        self.index = {}
+        self._index_path: Optional[str] = None
+        self._index = _StoredIndex(self)
+        self._store: Optional[_IndexStore] = None
+        self._scanned = False
+
+    @property
+    def index_path(self) -> str:
+        """지정된 저장소 경로, 없으면 현재 루트의 기본 경로"""
+        if self._index_path:
+            return self._index_path
+        root_hash = hashlib.sha1(os.path.abspath(self.root_dir).encode("utf-8")).hexdigest()[:12]
+        return os.path.join(self.INDEX_DIR, f"synaptic_index_{root_hash}.db")
+
+    @index_path.setter
+    def index_path(self, path: Optional[str]):
+        self._index_path = path
+
+    @property
+    def index(self) -> MutableMapping:
+        return self._index
 
-    def scan_project(self):
-        """프로젝트 내의 모든 Python 파일을 스캔하여 인덱싱"""
+    @index.setter
+    def index(self, mapping: Dict[str, List[Dict[str, Any]]]):
+        """저장소 내용을 mapping으로 교체 (이미 구성된 인덱스이므로 첫 조회 시 스캔하지 않음)"""
+        store = self._get_store()
+        store.clear()
+        for rel_path, defs in mapping.items():
+            store.put_file(rel_path, defs)
+        store.commit()
+        self._scanned = True
+
+    def _get_store(self) -> _IndexStore:
+        """index_path의 저장소를 지연 오픈 (경로나 루트가 바뀌면 다시 오픈)"""
+        root = os.path.abspath(self.root_dir)
+        if self._store is None or self._store.path != self.index_path or self._store.root != root:
+            self._store = _IndexStore(self.index_path, root)
+        return self._store
+
+    def _ensure_scanned(self):
+        """저장된 인덱스는 이전 실행의 것일 수 있으므로 인스턴스의 첫 조회 전에 증분 스캔 (바뀐 파일만 재파싱)"""
+        if not self._scanned:
+            self.scan_project()
+
+    def scan_project(self, parallel: Optional[bool] = None):
+        """프로젝트 내의 모든 Python 파일을 스캔하여 인덱싱 (mtime/size/hash가 바뀐 파일만 재파싱)
+        parallel이 None이면 재파싱 대상이 INDEXER_PARALLEL_THRESHOLD 이상일 때 프로세스 풀 사용
+        """
         logger.info(f"🚀 Starting synaptic indexing for {self.root_dir}...")
-        new_index = {}
+        store = self._get_store()
+        known = store.file_meta()
+        seen = set()
+        pending = []
         
         for root, dirs, files in os.walk(self.root_dir):
             # 무시할 디렉토리 필터링
-            dirs[:] = [d for d in dirs if d not in {'.git', 'venv', '__pycache__', 'logs', 'build', 'dist'}]
+            dirs[:] = [d for d in dirs if d not in self.IGNORED_DIRS]
             
             for file in files:
                 if file.endswith(".py"):
                     full_path = os.path.join(root, file)
                     rel_path = os.path.relpath(full_path, self.root_dir)
-                    try:
-                        with open(full_path, "r", encoding='utf-8') as f:
-                            tree = ast.parse(f.read())
-                            new_index[rel_path] = self._analyze_tree(tree)
-                    except Exception as e:
-                        logger.error(f"Failed to index {rel_path}: {e}")
-        
-        self.index = new_index
-        self._save_index()
-        logger.info(f"✅ Indexing complete. Indexed {len(new_index)} files.")
+                    seen.add(rel_path)
+                    job = self._stat_changed(full_path, rel_path, known.get(rel_path))
+                    if job:
+                        pending.append(job)
+
+        if parallel is None:
+            parallel = len(pending) >= settings.INDEXER_PARALLEL_THRESHOLD
+        changed = self._parse_pending(pending, parallel)
+
+        removed = [path for path in known if path not in seen]
+        for rel_path in removed:
+            store.remove(rel_path)
+        store.commit()
+        self._scanned = True
+        logger.info(f"✅ Indexing complete. Indexed {len(self.index)} files ({changed} re-parsed, {len(removed)} removed).")
+
+    def update(self, paths: Iterable[str]):
+        """변경된 것으로 알려진 파일들만 다시 인덱싱 (삭제된 파일은 인덱스에서 제거)"""
+        store = self._get_store()
+        pending = []
+        for path in paths:
+            full_path = path if os.path.isabs(path) else os.path.join(self.root_dir, path)
+            rel_path = os.path.relpath(full_path, self.root_dir)
+            if not rel_path.endswith(".py"):
+                continue
+            row = store.meta(rel_path)
+            if os.path.exists(full_path):
+                job = self._stat_changed(full_path, rel_path, row)
+                if job:
+                    pending.append(job)
+            elif row:
+                store.remove(rel_path)
+        self._parse_pending(pending, parallel=False)
+        store.commit()
+
+    @staticmethod
+    def _stat_changed(full_path: str, rel_path: str, meta: Optional[Tuple[float, int, Optional[str]]]) -> Optional[Tuple[str, str, os.stat_result, Optional[str]]]:
+        """mtime/size가 기록(meta)과 다르면 재검사 대상 반환"""
+        try:
+            stat = os.stat(full_path)
+        except OSError:
+            return None
+        if meta and meta[0] == stat.st_mtime and meta[1] == stat.st_size:
+            return None
+        return full_path, rel_path, stat, meta[2] if meta else None
+
+    def _parse_pending(self, pending: List[Tuple[str, str, os.stat_result, Optional[str]]], parallel: bool) -> int:
+        """재검사 대상을 (필요 시 프로세스 풀로) 파싱하여 파일 단위로 저장소에 반영, 인덱스가 바뀐 파일 수 반환"""
+        store = self._get_store()
+        jobs = [(full_path, known_hash) for full_path, _, _, known_hash in pending]
+        changed = 0
+        for (full_path, rel_path, stat, known_hash), (digest, defs, error) in zip(pending, self._parse_results(jobs, parallel)):
+            if digest is None:
+                logger.error(f"Failed to index {rel_path}: {error}")
+                continue
+            if digest == known_hash:
+                store.touch(rel_path, stat.st_mtime, stat.st_size, digest) # 내용은 그대로 (touch 등)
+                continue
+            if error:
+                logger.error(f"Failed to index {rel_path}: {error}")
+            store.put_file(rel_path, defs, stat.st_mtime, stat.st_size, digest)
+            changed += 1
+        return changed
+
+    @staticmethod
+    def _parse_results(jobs: List[Tuple[str, Optional[str]]], parallel: bool) -> Iterator[Tuple[Optional[str], Optional[List[Dict[str, Any]]], Optional[str]]]:
+        """파싱 결과를 입력 순서대로 스트리밍. 병렬 모드는 워커 수의 약 4배 청크로 나누어 프로세스 풀에서 파싱"""
+        done = 0
+        workers = settings.INDEXER_WORKERS or os.cpu_count() or 1
+        if parallel and workers > 1 and len(jobs) > 1:
+            size = max(1, -(-len(jobs) // (workers * 4)))
+            chunks = [jobs[i:i + size] for i in range(0, len(jobs), size)]
+            try:
+                with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as pool:
+                    for batch in pool.map(_parse_batch, chunks):
+                        for result in batch:
+                            done += 1
+                            yield result
+            except Exception as e:
+                logger.warning(f"Parallel indexing failed, falling back to serial: {e}")
+        for full_path, known_hash in jobs[done:]:
+            yield _parse_file(full_path, known_hash)
 
     def _analyze_tree(self, tree: ast.AST) -> List[Dict[str, Any]]:
         """AST를 분석하여 클래스, 함수, 임포트, 호출 정보 추출"""
-        definitions = []
-        for node in ast.walk(tree):
-            if isinstance(node, ast.ClassDef):
-                definitions.append({
-                    "type": "class",
-                    "name": node.name,
-                    "bases": [ast.unparse(b) for b in node.bases],
-                    "line": node.lineno,
-                    "docstring": ast.get_docstring(node)
-                })
-            elif isinstance(node, ast.FunctionDef):
-                # 함수 내부의 다른 함수 호출 수집
-                calls = []
-                for subnode in ast.walk(node):
-                    if isinstance(subnode, ast.Call):
-                        try:
-                            call_name = ast.unparse(subnode.func)
-                            calls.append(call_name)
-                        except Exception:
-                            pass
-                
-                definitions.append({
-                    "type": "function",
-                    "name": node.name,
-                    "line": node.lineno,
-                    "args": [arg.arg for arg in node.args.args],
-                    "calls": list(set(calls)), # 중복 제거
-                    "docstring": ast.get_docstring(node)
-                })
-            elif isinstance(node, ast.Import):
-                for alias in node.names:
-                    definitions.append({"type": "import", "name": alias.name, "line": node.lineno})
-            elif isinstance(node, ast.ImportFrom):
-                definitions.append({"type": "import_from", "module": node.module, "names": [alias.name for alias in node.names], "line": node.lineno})
-        return definitions
+        return _DefinitionCollector().collect(tree)
 
     def generate_call_graph(self) -> Dict[str, Any]:
         """함수 간 호출 관계 그래프 생성"""
@@ -144,12 +518,8 @@ class SynapticIndexer:
         return kg
 
     def _save_index(self):
-        """인덱스를 JSON 파일로 저장"""
-        dirname = os.path.dirname(self.index_path)
-        if dirname:
-            os.makedirs(dirname, exist_ok=True)
-        with open(self.index_path, "w", encoding='utf-8') as f:
-            json.dump(self.index, f, ensure_ascii=False, indent=2)
+        """인덱스를 SQLite 저장소에 기록"""
+        self._get_store().commit()
 
     def search(self, query: str, normalize: bool = False) -> List[Dict[str, Any]]:
         """인덱스 내에서 검색 (지능형 쿼리 정규화 및 점수화 지원)"""
@@ -166,21 +536,8 @@ class SynapticIndexer:
             except Exception:
                 pass
 
-        results = []
-        for file_path, defs in self.index.items():
-            for d in defs:
-                symbol_name = d.get("name", "").lower()
-                # 1. 심볼명 매칭 (가중치 100)
-                name_match = search_query in symbol_name
-                # 2. 독스트링 매칭 (가중치 50)
-                doc_match = d.get("docstring") and search_query in d["docstring"].lower()
-                
-                if name_match or doc_match:
-                    results.append({
-                        "file": file_path,
-                        "score": 100 if name_match else 50,
-                        **d
-                    })
+        self._ensure_scanned()
+        results = self._get_store().match(search_query)
         
         # 점수 순 정렬
         results.sort(key=lambda x: x["score"], reverse=True)
@@ -188,8 +545,7 @@ class SynapticIndexer:
 
     def generate_dependency_graph(self) -> List[Dict[str, str]]:
         """모듈 간의 임포트 의존성 리스트 반환 (A -> B)"""
-        if not self.index:
-            self.scan_project()
+        self._ensure_scanned()
             
         dependencies = []
         for file_path, defs in self.index.items():
@@ -207,89 +563,53 @@ class SynapticIndexer:
 
     def get_impact_radius(self, target_file: str) -> Dict[str, List[str]]:
         """특정 파일 수정 시 영향을 받는 직접/간접 모듈 분석"""
-        if not self.index:
-            self.scan_project()
+        self._ensure_scanned()
             
         target_module = target_file.replace("/", ".").replace(".py", "")
-        direct_impact = []
-        indirect_impact = []
+        table = self._get_store()
         
-        # 1단계: 직접 임포트 또는 호출하는 모듈 찾기
-        for file_path, defs in self.index.items():
-            if file_path == target_file:
-                continue
-            
-            is_direct = False
-            for d in defs:
-                # 임포트 확인
-                if d["type"] == "import" and target_module in d["name"]:
-                    is_direct = True
-                elif d["type"] == "import_from" and d["module"] and target_module.endswith(d["module"]):
-                    is_direct = True
-                # 함수 호출 확인 (단순 이름 기반)
-                target_funcs = [def_item["name"] for def_item in self.index.get(target_file, []) if def_item["type"] == "function"]
-                if d["type"] == "function" and any(tf in d.get("calls", []) for tf in target_funcs):
-                    is_direct = True
-                    
-            if is_direct:
-                direct_impact.append(file_path)
+        # 1단계: 직접 임포트 또는 호출하는 모듈 찾기 (함수 호출은 단순 이름 기반)
+        direct = table.files_importing(target_module)
+        target_funcs = [d["name"] for d in self.index.get(target_file, []) if d["type"] == "function"]
+        direct.update(table.files_calling(target_funcs))
+        direct.pop(target_file, None)
 
-        # 2단계: 간접 영향(직접 영향 받는 모듈을 다시 참조하는 모듈)
-        for file_path, defs in self.index.items():
-            if file_path == target_file or file_path in direct_impact:
-                continue
-            
-            for direct in direct_impact:
-                direct_mod = direct.replace("/", ".").replace(".py", "")
-                if any(d["type"] in ["import", "import_from"] and (direct_mod in str(d.get("name", "")) or direct_mod in str(d.get("module", ""))) for d in defs):
-                    indirect_impact.append(file_path)
-                    break
+        # 2단계: 간접 영향(직접 영향 받는 모듈을 다시 참조하는 모듈) - 직접 영향 집합에서 한 단계 BFS 확장
+        visited = {target_file, *direct}
+        indirect: Dict[str, None] = {}
+        for file_path in direct:
+            direct_mod = file_path.replace("/", ".").replace(".py", "")
+            for importer in table.importers_containing(direct_mod):
+                if importer not in visited:
+                    visited.add(importer)
+                    indirect[importer] = None
                     
         return {
             "target": target_file,
-            "direct": list(set(direct_impact)),
-            "indirect": list(set(indirect_impact))
+            "direct": list(direct),
+            "indirect": list(indirect)
         }
 
     def find_reverse_dependencies(self, symbol_name: str) -> List[Dict[str, Any]]:
         """특정 심볼을 호출하거나 참조하는 모든 위치를 역추적함."""
-        if not self.index:
-            self.scan_project()
+        self._ensure_scanned()
             
+        table = self._get_store()
         dependents = []
-        for file_path, defs in self.index.items():
-            for d in defs:
-                # 1. 함수 호출 추적
-                if d["type"] == "function" and symbol_name in d.get("calls", []):
-                    dependents.append({
-                        "file": file_path,
-                        "type": "call",
-                        "caller": d["name"],
-                        "line": d["line"]
-                    })
-                # 2. 클래스 상속 추적
-                elif d["type"] == "class" and symbol_name in d.get("bases", []):
-                    dependents.append({
-                        "file": file_path,
-                        "type": "inheritance",
-                        "caller": d["name"],
-                        "line": d["line"]
-                    })
-                # 3. 명시적 임포트 추적 (ImportFrom)
-                elif d["type"] == "import_from" and symbol_name in d.get("names", []):
-                    dependents.append({
-                        "file": file_path,
-                        "type": "import",
-                        "caller": "module_scope",
-                        "line": d["line"]
-                    })
+        # 함수 호출 / 클래스 상속 / 명시적 임포트(ImportFrom) 추적
+        for kind, file_path, d in table.references(symbol_name):
+            dependents.append({
+                "file": file_path,
+                "type": _REFERENCE_TYPES[kind],
+                "caller": "module_scope" if kind == "name" else d["name"],
+                "line": d["line"]
+            })
                     
         return dependents
 
     def calculate_intelligence_index(self) -> Dict[str, float]:
         """모듈별 지능 지수(Intelligence Index) 산출"""
-        if not self.index:
-            self.scan_project()
+        self._ensure_scanned()
             
         from gortex.core.evolutionary_memory import EvolutionaryMemory
         evo_mem = EvolutionaryMemory()
@@ -115,13 +115,16 @@ class ContextPruner:
         
         # [MEMORY CONSOLIDATION] 삭제 전 고가치 메시지 백업
         from gortex.utils.vector_store import LongTermMemory
-        ltm = LongTermMemory()
+        archive_texts, archive_meta = [], []
         for e in eval_list[:remove_count]:
             if e["score"] > 0.7: # 비록 순위상 삭제되지만 절대적 가치가 높은 경우
                 msg = self.messages[e["index"]]
                 content = str(msg[1])
-                ltm.memorize(f"Historical Context (Archived): {content}", {"type": "synaptic_archive", "original_index": e["index"]})
+                archive_texts.append(f"Historical Context (Archived): {content}")
+                archive_meta.append({"type": "synaptic_archive", "original_index": e["index"]})
                 logger.info(f"💾 Consolidated high-value message before pruning: idx {e['index']}")
+        if archive_texts:
+            LongTermMemory().memorize_many(archive_texts, archive_meta)
 
         new_messages = [m for i, m in enumerate(self.messages) if i not in to_remove_indices]
         return new_messages
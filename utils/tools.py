@@ -52,7 +52,17 @@ def write_file(path: str, content: str) -> str:
         with open(tmp_path, 'w', encoding='utf-8') as f:
             f.write(content)
         os.replace(tmp_path, path)
-        
+
+        # [SYNAPTIC INDEX] 기존 인덱스가 있으면 바뀐 파일만 다시 인덱싱 (전체 재스캔 방지)
+        if path.endswith(".py"):
+            try:
+                from gortex.utils.indexer import SynapticIndexer
+                indexer = SynapticIndexer()
+                if os.path.exists(indexer.index_path):
+                    indexer.update([path])
+            except Exception as index_e:
+                logger.warning(f"Failed to re-index {path}: {index_e}")
+
         # [DISTRIBUTED SYNC] 변경 사항 전파
         try:
             from gortex.core.mq import mq_bus
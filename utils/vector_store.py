@@ -1,24 +1,582 @@
+import atexit
+import base64
+import contextlib
+import hashlib
 import json
 import os
 import logging
 import math
+import re
+import threading
 import uuid
+import weakref
+import zlib
+import heapq
+from collections import OrderedDict
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple, Optional
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None # Windows: 프로세스 간 잠금 없이 동작
+
 from gortex.core.auth import GortexAuth
+from gortex.config.settings import settings
 
 logger = logging.getLogger("GortexVectorStore")
 
+class ShardMatrix:
+    """
+    샤드의 벡터를 연속된 float32 행렬과 사전 계산된 노름으로 보관하는 유사도 연산용 캐시.
+    새 항목은 행 단위로 증분 추가되며, 유사도는 단일 행렬-벡터 곱으로 계산합니다.
+    항목별로 반영한 vector 객체를 기억해 두어, 검색 결과 항목의 vector가 다른 객체로 교체된 경우를
+    O(k)로 감지합니다 (covers 참고).
+    """
+    def __init__(self, dim: int, capacity: int = 64):
+        self.dim = dim
+        self.size = 0
+        self.vectors = np.zeros((capacity, dim), dtype=np.float32)
+        self.norms = np.zeros(capacity, dtype=np.float32)
+        self.rows: List[int] = []       # 행렬 행 -> 샤드 인덱스
+        self.sources: Optional[List[Any]] = [] # 샤드 인덱스 -> 반영한 vector 객체 (None이면 추적하지 않음)
+        self.synced = 0                 # 반영된 샤드 항목 수
+        self.version = 0                # 구축 시점의 샤드 버전 (LongTermMemory._invalidate 참고)
+        self.ann: Optional["IVFIndex"] = None
+
+    @classmethod
+    def from_array(cls, vectors: np.ndarray, rows: Optional[List[int]] = None) -> "ShardMatrix":
+        """(N, dim) float32 배열(메모리 맵 포함)을 복사 없이 채택 (rows: 행별 샤드 인덱스, 기본값은 행 번호)"""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        matrix = cls(vectors.shape[1], capacity=0)
+        matrix.vectors = vectors
+        matrix.norms = np.linalg.norm(vectors, axis=1).astype(np.float32)
+        matrix.size = len(vectors)
+        matrix.rows = list(range(len(vectors))) if rows is None else rows
+        matrix.sources = None
+        return matrix
+
+    def is_stale(self, shard: List[Dict[str, Any]], version: int) -> bool:
+        """구축 이후 샤드 버전이 바뀌었거나(기존 항목 변경) 샤드가 줄어들었는지 확인"""
+        return version != self.version or len(shard) < self.synced
+
+    def sync(self, shard: List[Dict[str, Any]]):
+        """아직 반영되지 않은 샤드 꼬리 항목들을 행렬에 추가"""
+        for index in range(self.synced, len(shard)):
+            self._append(index, shard[index].get("vector"))
+
+    def covers(self, shard: List[Dict[str, Any]], hits: List[Tuple[float, int]]) -> bool:
+        """검색 결과 항목들의 vector가 행렬에 반영한 객체 그대로인지 확인 (제자리 교체 감지)"""
+        if self.sources is None:
+            return True
+        return all(shard[index].get("vector") is self.sources[index] for _, index in hits)
+
+    def _append(self, index: int, vector: Any):
+        self.synced = index + 1
+        if self.sources is not None:
+            self.sources.append(vector)
+        if vector is None or len(vector) != self.dim:
+            return # 벡터 누락/차원 불일치 항목은 행렬에서 제외
+        if self.size == len(self.vectors):
+            capacity = max(64, len(self.vectors) * 2)
+            self.vectors = np.resize(self.vectors, (capacity, self.dim))
+            self.norms = np.resize(self.norms, capacity)
+        self.vectors[self.size] = vector
+        self.norms[self.size] = np.linalg.norm(self.vectors[self.size])
+        self.rows.append(index)
+        self.size += 1
+
+    def fingerprint(self, count: int) -> int:
+        """앞쪽 count개 행의 표본으로 계산한 체크섬 (영속화된 인덱스 검증용)"""
+        stride = max(1, count // 64)
+        return zlib.crc32(self.vectors[:count:stride].tobytes())
+
+    def top_k(self, query_vector: List[float], limit: int, candidates: Optional[np.ndarray] = None) -> List[Tuple[float, int]]:
+        """코사인 유사도 상위 k개의 (점수, 샤드 인덱스) 목록 반환 (candidates 지정 시 해당 행만 비교)"""
+        query = np.asarray(query_vector, dtype=np.float32)
+        query_norm = np.linalg.norm(query)
+        count = self.size if candidates is None else len(candidates)
+        if count == 0 or limit <= 0 or query_norm == 0:
+            return []
+
+        if candidates is None:
+            vectors, norms = self.vectors[:self.size], self.norms[:self.size]
+        else:
+            vectors, norms = self.vectors[candidates], self.norms[candidates]
+        denom = norms * query_norm
+        dots = vectors @ query
+        scores = np.divide(dots, denom, out=np.zeros_like(dots), where=denom > 0)
+
+        k = min(limit, count)
+        top = np.argpartition(-scores, k - 1)[:k] if k < count else np.arange(count)
+        top = top[np.argsort(-scores[top], kind="stable")]
+        rows = top if candidates is None else candidates[top]
+        return [(float(scores[i]), self.rows[row]) for i, row in zip(top, rows)]
+
+
+class IVFIndex:
+    """
+    역파일(IVF) 방식의 근사 최근접 이웃 인덱스.
+    k-means 중심점으로 벡터 공간을 분할하고, 질의와 가까운 nprobe개 리스트만 정밀 비교합니다.
+    """
+    def __init__(self, centroids: np.ndarray, assignments: np.ndarray, trained_size: int, fingerprint: int):
+        self.centroids = centroids
+        self.assignments = assignments
+        self.trained_size = trained_size
+        self.fingerprint = fingerprint
+        order = np.argsort(assignments, kind="stable")
+        bounds = np.searchsorted(assignments[order], np.arange(len(centroids) + 1))
+        self.lists = [order[bounds[i]:bounds[i + 1]] for i in range(len(centroids))]
+
+    @property
+    def size(self) -> int:
+        return len(self.assignments)
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+    @staticmethod
+    def _assign(centroids: np.ndarray, vectors: np.ndarray, chunk: int = 16384) -> np.ndarray:
+        labels = np.empty(len(vectors), dtype=np.int32)
+        for start in range(0, len(vectors), chunk):
+            labels[start:start + chunk] = np.argmax(vectors[start:start + chunk] @ centroids.T, axis=1)
+        return labels
+
+    @classmethod
+    def build(cls, matrix: ShardMatrix, iterations: int = 8, seed: int = 0) -> "IVFIndex":
+        """행렬 표본에 구면 k-means를 수행하여 sqrt(N)개의 리스트로 분할"""
+        size = matrix.size
+        nlist = max(1, int(math.sqrt(size)))
+        rng = np.random.default_rng(seed)
+        sample = cls._normalize(matrix.vectors[np.sort(rng.choice(size, min(size, nlist * 32), replace=False))])
+        centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+
+        for _ in range(iterations):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            counts = np.bincount(labels, minlength=nlist)
+            filled = counts > 0
+            starts = np.concatenate(([0], np.cumsum(counts)[:-1]))[filled]
+            centroids[filled] = np.add.reduceat(sample[np.argsort(labels, kind="stable")], starts, axis=0)
+            centroids = cls._normalize(centroids)
+
+        assignments = cls._assign(centroids, matrix.vectors[:size])
+        return cls(centroids, assignments, size, matrix.fingerprint(size))
+
+    def add(self, matrix: ShardMatrix):
+        """인덱스 생성 이후 행렬에 추가된 행들을 가장 가까운 리스트에 배정"""
+        if matrix.size <= self.size:
+            return
+        start = self.size
+        labels = self._assign(self.centroids, matrix.vectors[start:matrix.size])
+        self.assignments = np.concatenate((self.assignments, labels))
+        for offset, label in enumerate(labels):
+            self.lists[label] = np.append(self.lists[label], start + offset)
+
+    def search(self, matrix: ShardMatrix, query_vector: List[float], limit: int, nprobe: int) -> List[Tuple[float, int]]:
+        """질의와 가까운 nprobe개 리스트의 후보만 정밀 비교 (nprobe가 클수록 재현율↑, 지연↑)"""
+        query = np.asarray(query_vector, dtype=np.float32)
+        nprobe = max(1, min(nprobe, len(self.centroids)))
+        affinity = self.centroids @ query
+        probe = np.argpartition(-affinity, nprobe - 1)[:nprobe] if nprobe < len(self.centroids) else np.arange(len(self.centroids))
+        candidates = np.concatenate([self.lists[i] for i in probe])
+        return matrix.top_k(query_vector, limit, candidates=candidates)
+
+    def save(self, path: str):
+        with open(path, "wb") as f:
+            np.savez(f, centroids=self.centroids, assignments=self.assignments,
+                     trained_size=self.trained_size, fingerprint=self.fingerprint)
+
+    @classmethod
+    def load(cls, path: str) -> "IVFIndex":
+        with np.load(path) as data:
+            return cls(data["centroids"], data["assignments"], int(data["trained_size"]), int(data["fingerprint"]))
+
+
+class BM25Index:
+    """
+    샤드 content에 대한 BM25 역색인.
+    신규 항목은 증분 반영되며, 질의 시 질의어가 등장하는 문서의 포스팅만 조회합니다.
+    """
+    TOKEN_PATTERN = re.compile(r"\w+")
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Dict[int, int]] = {}
+        self.doc_lengths: List[int] = []
+        self.total_length = 0
+        self.synced = 0   # 반영된 샤드 항목 수
+        self.version = 0  # 구축 시점의 샤드 버전
+
+    @classmethod
+    def tokenize(cls, text: str) -> List[str]:
+        return cls.TOKEN_PATTERN.findall(text.lower())
+
+    def is_stale(self, shard: List[Dict[str, Any]], version: int) -> bool:
+        return version != self.version or len(shard) < self.synced
+
+    def sync(self, shard: List[Dict[str, Any]]):
+        for index in range(self.synced, len(shard)):
+            content = shard[index].get("content")
+            self.synced = index + 1
+            tokens = self.tokenize(content or "")
+            for token in tokens:
+                doc_freqs = self.postings.setdefault(token, {})
+                doc_freqs[index] = doc_freqs.get(index, 0) + 1
+            self.doc_lengths.append(len(tokens))
+            self.total_length += len(tokens)
+
+    def search(self, query: str, limit: int) -> List[Tuple[float, int]]:
+        """BM25 점수 상위 limit개의 (점수, 샤드 인덱스) 목록 반환"""
+        doc_count = len(self.doc_lengths)
+        if doc_count == 0 or limit <= 0:
+            return []
+        avg_length = self.total_length / doc_count or 1.0
+        scores: Dict[int, float] = {}
+        for term in set(self.tokenize(query)):
+            doc_freqs = self.postings.get(term)
+            if not doc_freqs:
+                continue
+            idf = math.log(1 + (doc_count - len(doc_freqs) + 0.5) / (len(doc_freqs) + 0.5))
+            for index, tf in doc_freqs.items():
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[index] / avg_length)
+                scores[index] = scores.get(index, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+        return [(score, index) for index, score in heapq.nlargest(limit, scores.items(), key=lambda x: x[1])]
+
+
+class ShardFile:
+    """
+    LTM 샤드의 바이너리 디스크 포맷.
+    벡터는 float32 원시 파일({namespace}_shard.f32)에 행 단위로 추가되어 메모리 맵으로 로드되고,
+    메타데이터는 추가 전용 JSONL 로그({namespace}_shard.jsonl)에 add/update 레코드로 기록됩니다.
+    같은 디렉터리를 여러 인스턴스/프로세스가 공유하므로 기록은 잠금 파일({namespace}_shard.lock)로 직렬화하고,
+    다른 기록자가 추가한 로그 꼬리를 먼저 읽어 이미 디스크에 있는 항목 ID는 다시 추가하지 않습니다.
+    """
+    MUTABLE_FIELDS = ("metadata", "usage_count", "links")
+
+    def __init__(self, store_dir: str, namespace: str):
+        base = os.path.join(store_dir, f"{namespace}_shard")
+        self.vector_path = base + ".f32"
+        self.log_path = base + ".jsonl"
+        self.lock_path = base + ".lock"
+        self.dim: Optional[int] = None
+        self.records = 0
+        self.ids: set = set()  # 로그에 add 레코드가 있는 항목 ID
+        self._offset = 0       # 읽어 들인 로그의 바이트 위치 (완전한 줄 단위)
+        self._log_id: Optional[Tuple[int, int]] = None # 읽어 들인 로그 파일의 (st_dev, st_ino)
+
+    def exists(self) -> bool:
+        return os.path.exists(self.log_path)
+
+    def load(self) -> Tuple[List[Dict[str, Any]], Optional[np.ndarray], List[Optional[int]]]:
+        """
+        로그를 재생하여 (샤드, 벡터 메모리 맵, 항목별 벡터 행 번호)를 반환.
+        항목의 vector는 메모리 맵 행의 읽기 전용 뷰이며(복사 없음), 같은 ID의 add 레코드가 여러 번 있으면 마지막 것만 유지합니다.
+        """
+        self._log_id = None # 처음부터 다시 읽음
+        records = self._read_records()
+        vectors = self._map_vectors()
+
+        shard, item_rows, positions = [], [], {}
+        for record in records:
+            op = record.get("op")
+            if op == "add":
+                item, row = record["item"], record.get("row")
+                if row is not None:
+                    if vectors is not None and row < len(vectors):
+                        item["vector"] = vectors[row]
+                    else:
+                        row, item["vector"] = None, [] # 벡터 기록이 유실된 항목
+                index = positions.get(item.get("id"))
+                if index is None:
+                    positions[item.get("id")] = len(shard)
+                    shard.append(item)
+                    item_rows.append(row)
+                else:
+                    shard[index], item_rows[index] = item, row
+            elif op == "update" and record.get("id") in positions:
+                shard[positions[record["id"]]].update(record.get("fields", {}))
+        return shard, vectors, item_rows
+
+    def append(self, items: List[Dict[str, Any]]):
+        """신규 항목의 벡터를 파일 끝에 추가한 뒤 메타데이터 레코드를 기록 (이미 디스크에 있는 ID는 제외)"""
+        with self._exclusive():
+            self._read_records()
+            items = [item for item in items if item.get("id") not in self.ids]
+            if not items:
+                return
+            row = self._repair_partial_row()
+            records, blobs = [], []
+            for item in items:
+                vector = item.get("vector")
+                if self.dim is None and vector is not None and len(vector) > 0:
+                    self.dim = len(vector)
+                    records.append({"op": "header", "dim": self.dim, "version": 1})
+                if vector is not None and self.dim and len(vector) == self.dim:
+                    blobs.append(np.asarray(vector, dtype=np.float32).tobytes())
+                    records.append(self._add_record(item, row))
+                    row += 1
+                else:
+                    records.append(self._add_record(item, None))
+            if blobs:
+                with open(self.vector_path, "ab") as f:
+                    f.write(b"".join(blobs))
+            self._write_records(records)
+
+    def update(self, items: List[Dict[str, Any]]):
+        """기존 항목의 가변 필드(사용 횟수, 링크 등) 변경분만 로그에 추가"""
+        if not items:
+            return
+        with self._exclusive():
+            self._read_records()
+            self._write_records([
+                {"op": "update", "id": item.get("id"), "fields": {f: item[f] for f in self.MUTABLE_FIELDS if f in item}}
+                for item in items
+            ])
+
+    def rewrite(self, shard: List[Dict[str, Any]]):
+        """압축: 샤드 전체를 임시 파일에 기록한 뒤 원자적으로 교체 (마지막으로 읽은 뒤 다른 기록자가 추가한 항목은 보존)"""
+        with self._exclusive():
+            known = {item.get("id") for item in shard}
+            vectors = None
+            foreign = []
+            for record in self._read_records():
+                item = record.get("item") if record.get("op") == "add" else None
+                if item is None or item.get("id") in known:
+                    continue
+                if record.get("row") is not None:
+                    vectors = self._map_vectors() if vectors is None else vectors
+                    if vectors is None or record["row"] >= len(vectors):
+                        continue
+                    item["vector"] = vectors[record["row"]]
+                known.add(item.get("id"))
+                foreign.append(item)
+            shard = list(shard) + foreign
+
+            self.dim = next((len(v) for v in (item.get("vector") for item in shard) if v is not None and len(v) > 0), None)
+            records = [{"op": "header", "dim": self.dim, "version": 1}] if self.dim else []
+            row = 0
+            tmp_vector_path, tmp_log_path = self.vector_path + ".tmp", self.log_path + ".tmp"
+            with open(tmp_vector_path, "wb") as f:
+                for item in shard:
+                    vector = item.get("vector")
+                    if vector is not None and self.dim and len(vector) == self.dim:
+                        f.write(np.asarray(vector, dtype=np.float32).tobytes())
+                        records.append(self._add_record(item, row))
+                        row += 1
+                    else:
+                        records.append(self._add_record(item, None))
+            with open(tmp_log_path, "w", encoding='utf-8') as f:
+                f.write("".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records))
+            os.replace(tmp_vector_path, self.vector_path)
+            os.replace(tmp_log_path, self.log_path)
+            stat = os.stat(self.log_path)
+            self._log_id, self._offset = (stat.st_dev, stat.st_ino), stat.st_size
+            self.ids, self.records = known, len(records)
+
+    @contextlib.contextmanager
+    def _exclusive(self):
+        """프로세스 간 배타 잠금 (벡터 행 번호 할당과 추가 기록을 직렬화)"""
+        with open(self.lock_path, "a") as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            yield # 파일을 닫으면 잠금도 해제됨
+
+    def _read_records(self) -> List[Dict[str, Any]]:
+        """마지막으로 읽은 위치 이후의 완전한 로그 레코드를 읽어 반환 (로그가 교체되었으면 처음부터)"""
+        try:
+            stat = os.stat(self.log_path)
+        except FileNotFoundError:
+            self._log_id, self._offset, self.ids, self.records, self.dim = None, 0, set(), 0, None
+            return []
+        log_id = (stat.st_dev, stat.st_ino)
+        if log_id != self._log_id or stat.st_size < self._offset:
+            self._log_id, self._offset, self.ids, self.records, self.dim = log_id, 0, set(), 0, None
+        with open(self.log_path, "rb") as f:
+            f.seek(self._offset)
+            data = f.read()
+        end = data.rfind(b"\n") + 1 # 기록 도중인 마지막 줄은 다음에 읽음
+        self._offset += end
+
+        records = []
+        for line in data[:end].splitlines():
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue # 기록 도중 중단된 줄은 무시
+        for record in records:
+            if record.get("op") == "header":
+                self.dim = record.get("dim")
+            elif record.get("op") == "add":
+                self.ids.add(record["item"].get("id"))
+        self.records += len(records)
+        return records
+
+    def _map_vectors(self) -> Optional[np.ndarray]:
+        rows = self._row_count()
+        if rows == 0:
+            return None
+        return np.memmap(self.vector_path, dtype=np.float32, mode="r", shape=(rows, self.dim))
+
+    def _row_count(self) -> int:
+        """벡터 파일의 완전한 행 수 (읽기 전용, 중단된 부분 행은 무시)"""
+        if not self.dim or not os.path.exists(self.vector_path):
+            return 0
+        return os.path.getsize(self.vector_path) // (4 * self.dim)
+
+    def _repair_partial_row(self) -> int:
+        """추가 전에 중단된 부분 행을 잘라내고 완전한 행 수를 반환 (쓰기 경로 전용)"""
+        rows = self._row_count()
+        if self.dim and os.path.exists(self.vector_path) and os.path.getsize(self.vector_path) != rows * 4 * self.dim:
+            os.truncate(self.vector_path, rows * 4 * self.dim)
+        return rows
+
+    def _add_record(self, item: Dict[str, Any], row: Optional[int]) -> Dict[str, Any]:
+        record_item = {k: v for k, v in item.items() if k != "vector"}
+        if row is None:
+            # 벡터 파일과 차원이 다른 벡터는 로그에 직접 보관
+            vector = item.get("vector")
+            record_item["vector"] = [] if vector is None else np.asarray(vector, dtype=float).tolist()
+        return {"op": "add", "item": record_item, "row": row}
+
+    def _write_records(self, records: List[Dict[str, Any]]):
+        """로그 끝에 레코드를 추가 (호출자가 잠금 보유, 읽은 위치도 함께 전진)"""
+        if not records:
+            return
+        with open(self.log_path, "a", encoding='utf-8') as f:
+            f.write("".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records))
+            self._offset = f.tell()
+        if self._log_id is None:
+            stat = os.stat(self.log_path)
+            self._log_id = (stat.st_dev, stat.st_ino)
+        self.ids.update(r["item"].get("id") for r in records if r.get("op") == "add")
+        self.records += len(records)
+
+
+class EmbeddingCache:
+    """
+    텍스트 해시 기반의 임베딩 LRU 캐시.
+    신규 항목은 JSONL 파일에 추가 기록되어 재시작 후에도 유지되며, 파일이 커지면 현재 내용으로 압축됩니다.
+    저장소 경로별로 하나의 인스턴스를 공유합니다.
+    """
+    _instances: Dict[str, "EmbeddingCache"] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, path: str, max_entries: int):
+        self.path = path
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self.lines = 0
+        self.lock = threading.Lock()
+        self._load()
+
+    @classmethod
+    def for_path(cls, path: str, max_entries: int) -> "EmbeddingCache":
+        with cls._instances_lock:
+            if path not in cls._instances:
+                cls._instances[path] = cls(path, max_entries)
+            return cls._instances[path]
+
+    @staticmethod
+    def make_key(model: str, text: str) -> str:
+        return hashlib.sha256(f"{model}\0{text}".encode("utf-8")).hexdigest()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding='utf-8') as f:
+                for line in f:
+                    self.lines += 1
+                    try:
+                        record = json.loads(line)
+                        vector = np.frombuffer(base64.b64decode(record["v"]), dtype=np.float32)
+                    except (ValueError, KeyError):
+                        continue
+                    self.entries[record["k"]] = vector
+                    self.entries.move_to_end(record["k"])
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        except Exception as e:
+            logger.warning(f"Failed to load embedding cache: {e}")
+
+    def get(self, key: str) -> Optional[List[float]]:
+        with self.lock:
+            vector = self.entries.get(key)
+            if vector is None:
+                return None
+            self.entries.move_to_end(key)
+            return vector.tolist()
+
+    def put_many(self, pairs: List[Tuple[str, List[float]]]):
+        if not pairs:
+            return
+        with self.lock:
+            records = []
+            for key, values in pairs:
+                vector = np.asarray(values, dtype=np.float32)
+                self.entries[key] = vector
+                self.entries.move_to_end(key)
+                records.append({"k": key, "v": base64.b64encode(vector.tobytes()).decode("ascii")})
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+            try:
+                if self.lines + len(records) > 2 * self.max_entries:
+                    self._rewrite()
+                else:
+                    with open(self.path, "a", encoding='utf-8') as f:
+                        f.write("".join(json.dumps(r) + "\n" for r in records))
+                    self.lines += len(records)
+            except Exception as e:
+                logger.warning(f"Failed to persist embedding cache: {e}")
+
+    def _rewrite(self):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding='utf-8') as f:
+            for key, vector in self.entries.items():
+                f.write(json.dumps({"k": key, "v": base64.b64encode(vector.tobytes()).decode("ascii")}) + "\n")
+        os.replace(tmp_path, self.path)
+        self.lines = len(self.entries)
+
+
 class LongTermMemory:
     """
     세션이 종료되어도 유지되는 의미 기반 지식 저장소 (장기 기억).
     Redis와 연동하여 분산 환경에서 지식을 실시간 동기화합니다.
     """
-    def __init__(self, store_dir: str = "logs/memory"):
+    EMBEDDING_MODEL = "models/embedding-001"
+    EMBEDDING_DIM = 768
+    _live_instances: "weakref.WeakSet[LongTermMemory]" = weakref.WeakSet()
+
+    def __init__(self, store_dir: str = "logs/memory", ann_threshold: Optional[int] = None, ann_nprobe: Optional[int] = None):
         self.store_dir = store_dir
+        # 샤드 크기가 임계값 이상일 때만 근사 검색(IVF) 사용, nprobe는 재현율/지연 트레이드오프
+        self.ann_threshold = ann_threshold if ann_threshold is not None else settings.LTM_ANN_THRESHOLD
+        self.ann_nprobe = ann_nprobe if ann_nprobe is not None else settings.LTM_ANN_NPROBE
         os.makedirs(self.store_dir, exist_ok=True)
         self.auth = GortexAuth()
+        self.embedding_cache = EmbeddingCache.for_path(
+            os.path.join(self.store_dir, "embedding_cache.jsonl"), settings.LTM_EMBED_CACHE_SIZE
+        )
         self.shards: Dict[str, List[Dict[str, Any]]] = {}
+        self._matrices: Dict[str, Tuple[List[Dict[str, Any]], ShardMatrix]] = {}
+        self._lexical: Dict[str, Tuple[List[Dict[str, Any]], BM25Index]] = {}
+        self._files: Dict[str, ShardFile] = {}
+        # 디스크에 반영된 (샤드 객체, 항목 수)와 가변 필드가 바뀐 항목 ID
+        self._persisted: Dict[str, Tuple[List[Dict[str, Any]], int]] = {}
+        self._dirty: Dict[str, set] = {}
+        # 다른 인스턴스/노드가 변경한 항목 ID (None이면 샤드 전체 교체)
+        self._remote_updates: Dict[str, Optional[set]] = {}
+        # 기존 항목이 바뀔 수 있는 경로에서 증가시키는 샤드 버전 (검색용 캐시 무효화)
+        self._versions: Dict[str, int] = {}
+        self.instance_id = str(uuid.uuid4())[:8]
+        # [WRITE-BEHIND] recall의 사용 횟수 갱신은 모아서 주기/임계치/종료 시점에 기록
+        self._lock = threading.RLock()
+        self._flush_timer: Optional[threading.Timer] = None
+        LongTermMemory._live_instances.add(self)
         
         # [DISTRIBUTED] MQ 연동 및 백그라운드 리스너 시작
         from gortex.core.mq import mq_bus
@@ -27,75 +585,276 @@ class LongTermMemory:
         self._start_sync_listener()
 
     def _start_sync_listener(self):
-        """실시간 지식 동기화를 위한 백그라운드 스레드 시작"""
-        import threading
-        
-        def _listen():
-            def handle_sync(msg):
-                payload = msg.get("payload", {})
-                namespace = payload.get("namespace")
-                if namespace:
-                    logger.debug(f"♻️ Received knowledge sync for '{namespace}'. Refreshing...")
-                    # 로컬 샤드 캐시 무효화 (다음 로드 시 Redis/파일에서 최신본 읽음)
-                    if namespace in self.shards:
-                        del self.shards[namespace]
-            
-            try:
-                self.mq.listen("gortex:memory_sync", handle_sync)
-            except Exception as e:
-                logger.error(f"Memory sync listener failed: {e}")
+        """실시간 지식 동기화 구독 등록 (버스의 공유 리스너 루프에서 실행, 인스턴스별 스레드 없음)"""
+        # 콜백이 인스턴스를 붙잡지 않도록 약한 참조로 연결하고, 수거되면 구독도 해제
+        ref = weakref.ref(self)
+
+        def handle_sync(msg):
+            memory = ref()
+            if memory is not None:
+                memory._handle_sync(msg)
+
+        self._sync_listener = self.mq.add_listener(("gortex:memory_sync",), handle_sync)
+        weakref.finalize(self, self._sync_listener.close)
 
-        thread = threading.Thread(target=_listen, daemon=True)
-        thread.start()
+    def _handle_sync(self, msg: Dict[str, Any]):
+        payload = msg.get("payload", {})
+        namespace = payload.get("namespace")
+        if namespace and payload.get("origin") != self.instance_id:
+            logger.debug(f"♻️ Received knowledge sync for '{namespace}'. Refreshing...")
+            # 반영 전에 아직 기록되지 않은 사용 횟수 갱신을 먼저 기록
+            if self._dirty.get(namespace):
+                self._save_shard(namespace)
+            ids = payload.get("ids")
+            with self._lock:
+                shard = self.shards.get(namespace)
+                if shard is not None and ids and payload.get("op") != "replace":
+                    # 로드된 샤드는 변경된 항목만 제자리에서 반영 (캐시·유사도 행렬 유지)
+                    self._apply_remote_items(namespace, shard, set(ids))
+                    return
+                # 전체 교체이거나 아직 로드되지 않은 샤드는 다음 로드 시 반영
+                self.shards.pop(namespace, None)
+                if payload.get("op") == "replace" or not ids:
+                    self._remote_updates[namespace] = None
+                elif self._remote_updates.get(namespace, set()) is not None:
+                    self._remote_updates.setdefault(namespace, set()).update(ids)
 
     def _get_shard_path(self, namespace: str) -> str:
+        """구버전 JSON 샤드 경로 (마이그레이션 용도)"""
         return os.path.join(self.store_dir, f"{namespace}_shard.json")
 
+    def _get_item_key_prefix(self, namespace: str) -> str:
+        return f"gortex:ltm:item:{namespace}:"
+
     def _load_shard(self, namespace: str) -> List[Dict[str, Any]]:
         if namespace in self.shards:
             return self.shards[namespace]
-            
-        # 1. Storage Provider 확인
-        try:
-            redis_key = f"gortex:ltm:shard:{namespace}"
-            data_str = self.mq.storage.get(redis_key)
-            if data_str:
-                data = json.loads(data_str)
-                self.shards[namespace] = data
-                return data
-        except Exception as e:
-            logger.warning(f"Failed to load LTM shard from Storage: {e}")
 
-        # 2. 로컬 파일 (Fallback)
+        remote_ids = self._remote_updates.pop(namespace, set())
+        shard_file = ShardFile(self.store_dir, namespace)
+        self._files[namespace] = shard_file
+
+        # 1. 로컬 바이너리 샤드 (벡터는 메모리 맵으로 복사 없이 로드)
+        if remote_ids is not None and shard_file.exists():
+            try:
+                shard, vectors, item_rows = shard_file.load()
+                self._register_loaded_shard(namespace, shard, vectors, item_rows)
+                # 이 노드가 중단된 동안 다른 노드가 기록한 항목도 Storage에서 보충
+                missing = remote_ids | self._missing_storage_ids(namespace, shard)
+                if missing:
+                    self._apply_remote_items(namespace, shard, missing)
+                return shard
+            except Exception as e:
+                logger.warning(f"Failed to load LTM shard file '{namespace}': {e}")
+
+        # 2. Storage Provider (다른 노드가 기록한 항목)
+        shard = self._load_storage_items(namespace)
+        if shard:
+            self.shards[namespace] = shard
+            with self._lock:
+                self._persist_local(namespace, compact=True)
+            return shard
+
+        # 3. 구버전 JSON 샤드 (바이너리 포맷으로 마이그레이션)
         path = self._get_shard_path(namespace)
         if os.path.exists(path):
             try:
                 with open(path, "r", encoding='utf-8') as f:
-                    data = json.load(f)
-                    self.shards[namespace] = data
-                    return data
+                    shard = json.load(f)
             except Exception:
                 return []
+            self.shards[namespace] = shard
+            self._save_shard(namespace, compact=True)
+            return shard
         return []
 
-    def _save_shard(self, namespace: str):
-        if namespace not in self.shards:
+    def _register_loaded_shard(self, namespace: str, shard: List[Dict[str, Any]], vectors: Optional[np.ndarray], item_rows: List[Optional[int]]):
+        """로드된 샤드를 캐시에 등록하고 메모리 맵을 유사도 행렬로 그대로 채택"""
+        self.shards[namespace] = shard
+        self._persisted[namespace] = (shard, len(shard))
+        if vectors is None:
             return
-        data = self.shards[namespace]
-        
-        # 1. Storage Provider 싱크
+        row_to_index: List[Optional[int]] = [None] * len(vectors)
+        for index, row in enumerate(item_rows):
+            if row is not None:
+                row_to_index[row] = index
+        if None in row_to_index:
+            return # 참조되지 않는 행이 있으면 최초 검색 시 행렬을 새로 구성
+        matrix = ShardMatrix.from_array(vectors, rows=row_to_index)
+        matrix.sources = [item.get("vector") for item in shard]
+        matrix.synced = len(shard)
+        matrix.version = self._versions.get(namespace, 0)
+        self._matrices[namespace] = (shard, matrix)
+
+    def _encode_item(self, item: Dict[str, Any], seq: int) -> str:
+        record = {k: v for k, v in item.items() if k != "vector"}
+        vector = item.get("vector")
+        if vector is not None and len(vector) > 0:
+            record["vector_b64"] = base64.b64encode(np.asarray(vector, dtype=np.float32).tobytes()).decode("ascii")
+        record["seq"] = seq
+        return json.dumps(record, ensure_ascii=False)
+
+    def _decode_item(self, data: str) -> Tuple[int, Dict[str, Any]]:
+        record = json.loads(data)
+        seq = record.pop("seq", 0)
+        encoded = record.pop("vector_b64", None)
+        if encoded:
+            record["vector"] = np.frombuffer(base64.b64decode(encoded), dtype=np.float32).tolist()
+        return seq, record
+
+    def _load_storage_items(self, namespace: str) -> List[Dict[str, Any]]:
+        try:
+            prefix = self._get_item_key_prefix(namespace)
+            keys = list(self.mq.storage.scan_iter(prefix + "*"))
+            entries = [self._decode_item(data) for data in self.mq.storage.mget(keys) if data]
+            if entries:
+                entries.sort(key=lambda e: e[0])
+                return [item for _, item in entries]
+
+            legacy = self.mq.storage.get(f"gortex:ltm:shard:{namespace}")
+            if legacy:
+                return json.loads(legacy)
+        except Exception as e:
+            logger.warning(f"Failed to load LTM shard from Storage: {e}")
+        return []
+
+    def _missing_storage_ids(self, namespace: str, shard: List[Dict[str, Any]]) -> set:
+        """Storage의 항목 키 중 로컬 샤드에 없는 항목 ID"""
+        prefix = self._get_item_key_prefix(namespace)
+        try:
+            stored = {key[len(prefix):] for key in self.mq.storage.scan_iter(prefix + "*")}
+        except Exception as e:
+            logger.warning(f"Failed to list LTM items for '{namespace}': {e}")
+            return set()
+        return stored - {item.get("id") for item in shard}
+
+    def _apply_remote_items(self, namespace: str, shard: List[Dict[str, Any]], ids: set):
+        """다른 노드가 변경한 항목만 Storage에서 가져와 로컬 샤드에 반영"""
+        prefix = self._get_item_key_prefix(namespace)
+        by_id = {item.get("id"): item for item in shard}
+        ids = list(ids)
+        changed = False
+        try:
+            values = self.mq.storage.mget([prefix + item_id for item_id in ids])
+        except Exception as e:
+            logger.warning(f"Failed to fetch LTM items {ids}: {e}")
+            values = []
+        added = []
+        for item_id, data in zip(ids, values):
+            if not data:
+                continue
+            seq, remote = self._decode_item(data)
+            local = by_id.get(item_id)
+            if local is None:
+                added.append((seq, remote))
+                continue
+            fields = {f: remote[f] for f in ShardFile.MUTABLE_FIELDS if f in remote and local.get(f) != remote[f]}
+            if fields:
+                local.update(fields)
+                self._dirty.setdefault(namespace, set()).add(item_id)
+                changed = True
+        added.sort(key=lambda e: e[0])
+        shard.extend(item for _, item in added)
+        if changed:
+            self._invalidate(namespace)
+        with self._lock:
+            self._persist_local(namespace)
+
+    def _persist_local(self, namespace: str, compact: bool = False) -> Tuple[List[int], bool]:
+        """
+        샤드 변경분을 로컬 파일에 반영하고 (변경된 항목 인덱스, 전체 교체 여부)를 반환.
+        같은 샤드 객체에 대한 추가/가변 필드 변경은 추가 전용으로 기록하고,
+        샤드가 교체되었거나 compact 요청 시에만 전체를 다시 씁니다.
+        """
+        shard = self.shards[namespace]
+        shard_file = self._files.setdefault(namespace, ShardFile(self.store_dir, namespace))
+        dirty = self._dirty.pop(namespace, set())
+        persisted = self._persisted.get(namespace)
+
+        if not compact and persisted and persisted[0] is shard and persisted[1] <= len(shard):
+            count = persisted[1]
+            updated = [i for i in range(count) if shard[i].get("id") in dirty] if dirty else []
+            if shard_file.records > 2 * len(shard) + 64:
+                shard_file.rewrite(shard) # 누적된 update 레코드 압축
+                self._invalidate(namespace)
+            else:
+                shard_file.append(shard[count:])
+                shard_file.update([shard[i] for i in updated])
+            self._persisted[namespace] = (shard, len(shard))
+            return updated + list(range(count, len(shard))), False
+
+        shard_file.rewrite(shard)
+        if compact:
+            self._invalidate(namespace) # 항목이 직접 수정되었을 수 있는 전체 재기록
+        self._persisted[namespace] = (shard, len(shard))
+        return list(range(len(shard))), True
+
+    def _invalidate(self, namespace: str):
+        """샤드 버전을 올려 다음 검색 시 유사도 행렬을 재구축하도록 표시"""
+        self._versions[namespace] = self._versions.get(namespace, 0) + 1
+
+    def _sync_storage(self, namespace: str, indices: List[int], replace: bool):
+        """변경된 항목만 항목 단위 키로 Storage에 반영하고 동기화 이벤트 발행"""
+        if not indices and not replace:
+            return
+        shard = self.shards[namespace]
+        prefix = self._get_item_key_prefix(namespace)
         try:
-            redis_key = f"gortex:ltm:shard:{namespace}"
-            self.mq.storage.set(redis_key, json.dumps(data, ensure_ascii=False, indent=2), ex=3600*48)
+            if replace:
+                live = {prefix + shard[i].get("id", "") for i in indices}
+                stale = [key for key in self.mq.storage.scan_iter(prefix + "*") if key not in live]
+                self.mq.storage.delete_many(stale + [f"gortex:ltm:shard:{namespace}"])
+            if indices:
+                self.mq.storage.mset({prefix + shard[i].get("id", ""): self._encode_item(shard[i], i) for i in indices}, ex=3600*48)
             # 동기화 이벤트 발행
-            self.mq.publish_event("gortex:memory_sync", "Memory", "ltm_updated", {"namespace": namespace})
+            self.mq.publish_event("gortex:memory_sync", "Memory", "ltm_updated", {
+                "namespace": namespace,
+                "op": "replace" if replace else "append",
+                "ids": [shard[i].get("id") for i in indices],
+                "origin": self.instance_id
+            })
         except Exception as e:
             logger.error(f"Failed to sync LTM to Storage: {e}")
 
-        # 2. 로컬 파일 저장
-        path = self._get_shard_path(namespace)
-        with open(path, "w", encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+    def _save_shard(self, namespace: str, compact: bool = False):
+        with self._lock:
+            if namespace not in self.shards:
+                self._dirty.pop(namespace, None)
+                return
+            indices, replaced = self._persist_local(namespace, compact)
+        self._sync_storage(namespace, indices, replaced)
+
+    def _mark_dirty(self, namespace: str, item_id: str):
+        """가변 필드 변경을 쓰기 지연 버퍼에 등록하고, 임계치 도달 시 즉시/아니면 타이머로 flush 예약"""
+        with self._lock:
+            self._dirty.setdefault(namespace, set()).add(item_id)
+            pending = sum(len(ids) for ids in self._dirty.values())
+            if pending < settings.LTM_FLUSH_THRESHOLD:
+                if self._flush_timer is None:
+                    self._flush_timer = threading.Timer(settings.LTM_FLUSH_INTERVAL, self.flush)
+                    self._flush_timer.daemon = True
+                    self._flush_timer.start()
+                return
+        self.flush()
+
+    def flush(self):
+        """버퍼링된 사용 횟수 갱신을 네임스페이스별로 한 번에 기록"""
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            namespaces = [ns for ns, ids in self._dirty.items() if ids]
+        for namespace in namespaces:
+            try:
+                self._save_shard(namespace)
+            except Exception as e:
+                logger.error(f"Failed to flush LTM shard '{namespace}': {e}")
+
+    @classmethod
+    def flush_all(cls):
+        """프로세스 종료 시 살아 있는 모든 인스턴스의 버퍼를 기록"""
+        for instance in list(cls._live_instances):
+            instance.flush()
 
     @property
     def memory(self) -> List[Dict[str, Any]]:
@@ -105,37 +864,131 @@ class LongTermMemory:
     @memory.setter
     def memory(self, value: List[Dict[str, Any]]):
         self.shards["global"] = value
+        self._invalidate("global")
 
     def _save_store(self):
-        """AnalystAgent 등에서 호출하는 저장 메서드 (global 샤드 저장)"""
-        self._save_shard("global")
+        """AnalystAgent 등에서 호출하는 저장 메서드 (항목이 직접 수정될 수 있으므로 global 샤드 전체 재기록)"""
+        self._save_shard("global", compact=True)
 
     def _get_embedding(self, text: str) -> List[float]:
-        """Gemini API를 사용하여 텍스트 임베딩 생성"""
+        """Gemini API를 사용하여 텍스트 임베딩 생성 (캐시 우선)"""
+        return self.embed_batch([text])[0]
+
+    def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        """
+        여러 텍스트의 임베딩을 한 번에 생성.
+        캐시에 없는 텍스트만 중복 제거 후 LTM_EMBED_BATCH_SIZE 단위로 API에 요청하며,
+        실패한 항목은 영벡터로 대체합니다 (영벡터는 캐시하지 않음).
+        """
+        # 텍스트가 너무 길면 절삭
+        clean_texts = [text[:2000] for text in texts]
+        keys = [EmbeddingCache.make_key(self.EMBEDDING_MODEL, text) for text in clean_texts]
+        vectors: Dict[str, List[float]] = {}
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, clean_texts):
+            if key in vectors or key in missing:
+                continue
+            cached = self.embedding_cache.get(key)
+            if cached is not None:
+                vectors[key] = cached
+            else:
+                missing[key] = text
+
+        pending = list(missing.items())
+        batch_size = max(1, settings.LTM_EMBED_BATCH_SIZE)
+        for start in range(0, len(pending), batch_size):
+            batch = pending[start:start + batch_size]
+            embeddings = self._request_embeddings([text for _, text in batch])
+            if embeddings is None:
+                continue
+            fresh = list(zip([key for key, _ in batch], embeddings))
+            self.embedding_cache.put_many(fresh)
+            vectors.update(fresh)
+
+        return [vectors.get(key) or [0.0] * self.EMBEDDING_DIM for key in keys]
+
+    def _request_embeddings(self, texts: List[str]) -> Optional[List[List[float]]]:
         try:
-            # 텍스트가 너무 길면 절삭
-            clean_text = text[:2000]
             # GortexAuth를 통해 현재 활성 클라이언트 획득
             client = self.auth.get_current_client()
             if not client:
                 logger.warning("No active client for embedding. Falling back to zero-vector.")
-                return [0.0] * 768
+                return None
 
             response = client.models.embed_content(
-                model="models/embedding-001",
-                contents=clean_text
+                model=self.EMBEDDING_MODEL,
+                contents=texts
             )
-            return response.embeddings[0].values
+            return [list(embedding.values) for embedding in response.embeddings]
         except Exception as e:
             logger.warning(f"Embedding failed: {e}. Falling back to zero-vector.")
-            return [0.0] * 768 # 기본 차원
+            return None
 
-    def memorize(self, text: str, metadata: Dict[str, Any] = None, namespace: str = "global"):
-        """특정 네임스페이스(샤드)에 지식을 저장"""
-        vector = self._get_embedding(text)
-        shard = self._load_shard(namespace)
-        
-        shard.append({
+    def _get_matrix(self, namespace: str, shard: List[Dict[str, Any]], dim: int) -> ShardMatrix:
+        """샤드의 벡터 행렬을 반환 (신규 항목은 증분 반영, 샤드 교체/버전 변경 시 재구축)"""
+        cached = self._matrices.get(namespace)
+        version = self._versions.get(namespace, 0)
+        if cached and cached[0] is shard and cached[1].dim == dim and not cached[1].is_stale(shard, version):
+            matrix = cached[1]
+        else:
+            matrix = ShardMatrix(dim, capacity=max(64, len(shard)))
+            matrix.version = version
+            self._matrices[namespace] = (shard, matrix)
+        matrix.sync(shard)
+        return matrix
+
+    def _get_lexical_index(self, namespace: str, shard: List[Dict[str, Any]]) -> BM25Index:
+        """샤드의 BM25 역색인을 반환 (신규 항목은 증분 반영, 샤드 교체/버전 변경 시 재구축)"""
+        cached = self._lexical.get(namespace)
+        version = self._versions.get(namespace, 0)
+        if cached and cached[0] is shard and not cached[1].is_stale(shard, version):
+            index = cached[1]
+        else:
+            index = BM25Index()
+            index.version = version
+            self._lexical[namespace] = (shard, index)
+        index.sync(shard)
+        return index
+
+    def _get_ann_path(self, namespace: str) -> str:
+        return os.path.join(self.store_dir, f"{namespace}_ivf.npz")
+
+    def _get_ann_index(self, namespace: str, matrix: ShardMatrix) -> Optional[IVFIndex]:
+        """임계값 이상 샤드의 IVF 인덱스를 지연 로드/생성 (규모가 두 배로 커지면 재학습)"""
+        if matrix.size < self.ann_threshold:
+            return None
+
+        index = matrix.ann
+        if index is None:
+            index = self._load_ann_index(namespace, matrix)
+        if index is None or matrix.size > index.trained_size * 2:
+            index = IVFIndex.build(matrix)
+            try:
+                index.save(self._get_ann_path(namespace))
+            except Exception as e:
+                logger.warning(f"Failed to persist ANN index for '{namespace}': {e}")
+            logger.info(f"🧭 Built IVF index for '{namespace}' ({matrix.size} vectors, {len(index.centroids)} lists)")
+        else:
+            index.add(matrix)
+        matrix.ann = index
+        return index
+
+    def _load_ann_index(self, namespace: str, matrix: ShardMatrix) -> Optional[IVFIndex]:
+        path = self._get_ann_path(namespace)
+        if not os.path.exists(path):
+            return None
+        try:
+            index = IVFIndex.load(path)
+        except Exception as e:
+            logger.warning(f"Failed to load ANN index for '{namespace}': {e}")
+            return None
+        if index.centroids.shape[1] != matrix.dim or index.size > matrix.size \
+                or index.fingerprint != matrix.fingerprint(index.trained_size):
+            return None
+        return index
+
+    def _new_item(self, text: str, vector: List[float], metadata: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        return {
             "id": str(uuid.uuid4())[:8],
             "content": text,
             "vector": vector,
@@ -143,13 +996,35 @@ class LongTermMemory:
             "timestamp": datetime.now().isoformat(),
             "usage_count": 0,
             "links": []
-        })
+        }
+
+    def memorize(self, text: str, metadata: Dict[str, Any] = None, namespace: str = "global"):
+        """특정 네임스페이스(샤드)에 지식을 저장"""
+        vector = self._get_embedding(text)
+        shard = self._load_shard(namespace)
+        
+        shard.append(self._new_item(text, vector, metadata))
         self.shards[namespace] = shard
+        self._get_matrix(namespace, shard, len(vector))
         self._save_shard(namespace)
         logger.info(f"🧠 Knowledge memorized in shard: {namespace}")
 
-    def search(self, query: str = "", limit: int = 10, namespace: str = "global") -> List[Dict[str, Any]]:
-        """UI와 호환되는 검색 인터페이스 (recall의 별칭 및 확장)"""
+    def memorize_many(self, texts: List[str], metadatas: Optional[List[Dict[str, Any]]] = None, namespace: str = "global"):
+        """여러 지식을 배치 임베딩 후 한 번의 추가 기록으로 저장"""
+        if not texts:
+            return
+        metadatas = metadatas or [None] * len(texts)
+        vectors = self.embed_batch(texts)
+        shard = self._load_shard(namespace)
+
+        shard.extend(self._new_item(text, vector, metadata) for text, vector, metadata in zip(texts, vectors, metadatas))
+        self.shards[namespace] = shard
+        self._get_matrix(namespace, shard, len(vectors[0]))
+        self._save_shard(namespace)
+        logger.info(f"🧠 {len(texts)} knowledge items memorized in shard: {namespace}")
+
+    def search(self, query: str = "", limit: int = 10, namespace: str = "global", mode: str = "vector") -> List[Dict[str, Any]]:
+        """UI와 호환되는 검색 인터페이스 (recall의 별칭 및 확장, mode: vector/lexical/hybrid)"""
         if not query:
             # 쿼리가 없으면 최근 지식 반환
             shard = self._load_shard(namespace)
@@ -164,48 +1039,75 @@ class LongTermMemory:
                 })
             return list(reversed(results))
             
-        results = self.recall(query, limit=limit, namespace=namespace)
+        results = self.recall(query, limit=limit, namespace=namespace, mode=mode)
         for r in results:
             r["is_global"] = self.mq.is_connected
         return results
 
-    def recall(self, query: str, limit: int = 3, namespace: str = "global") -> List[Dict[str, Any]]:
-        """특정 네임스페이스(샤드)에서 지식 소환"""
+    RRF_K = 60
+    VECTOR_MIN_SCORE = 0.3 # vector 모드에서 이 코사인 유사도 이하의 결과는 버림
+    RECALL_MODES = ("vector", "lexical", "hybrid")
+
+    def recall(self, query: str, limit: int = 3, namespace: str = "global", mode: str = "vector") -> List[Dict[str, Any]]:
+        """
+        특정 네임스페이스(샤드)에서 지식 소환.
+        mode: "vector"(코사인 유사도 > 0.3), "lexical"(BM25), "hybrid"(두 순위의 Reciprocal Rank Fusion)
+        항목의 vector를 새 객체로 교체하면 해당 항목이 상위 결과에 오를 때 감지되어 행렬을 재구축합니다.
+        벡터 리스트의 원소를 직접 고치거나, 교체로 순위가 새로 올라와야 하는 경우에는
+        _save_shard(namespace, compact=True)로 저장해 명시적으로 무효화해야 합니다.
+        """
+        if mode not in self.RECALL_MODES:
+            raise ValueError(f"Unknown recall mode: {mode!r} (expected one of {', '.join(self.RECALL_MODES)})")
         shard = self._load_shard(namespace)
         if not shard:
             return []
-            
-        query_vector = self._get_embedding(query)
-        scored_results = []
-        
-        for item in shard:
-            if "vector" in item and len(item["vector"]) == len(query_vector):
-                dot_product = sum(a * b for a, b in zip(query_vector, item["vector"]))
-                norm_a = math.sqrt(sum(a * a for a in query_vector))
-                norm_b = math.sqrt(sum(b * b for b in item["vector"]))
-                similarity = dot_product / (norm_a * norm_b) if norm_a > 0 and norm_b > 0 else 0
-                scored_results.append((similarity, item))
-            else:
-                match_score = 0.1 if any(p in item["content"].lower() for p in query.lower().split()) else 0
-                scored_results.append((match_score, item))
-        
-        scored_results.sort(key=lambda x: x[0], reverse=True)
-        
+
+        # hybrid는 융합 후보를 넉넉히 확보
+        pool = limit * 5 if mode == "hybrid" else limit
+        vector_hits: List[Tuple[float, int]] = []
+        if mode != "lexical":
+            query_vector = self._get_embedding(query)
+            for _ in range(2):
+                matrix = self._get_matrix(namespace, shard, len(query_vector))
+                ann = self._get_ann_index(namespace, matrix)
+                hits = ann.search(matrix, query_vector, pool, self.ann_nprobe) if ann else matrix.top_k(query_vector, pool)
+                if matrix.covers(shard, hits):
+                    break
+                self._invalidate(namespace) # 결과 항목의 벡터가 제자리에서 교체됨: 재구축 후 다시 검색
+            vector_hits = [(score, index) for score, index in hits if score > self.VECTOR_MIN_SCORE]
+        lexical_hits = self._get_lexical_index(namespace, shard).search(query, pool) if mode != "vector" else []
+
+        similarity = {index: score for score, index in vector_hits}
+        if mode == "vector":
+            ranked = vector_hits
+        elif mode == "lexical":
+            top = lexical_hits[0][0] if lexical_hits else 1.0
+            ranked = [(score / top, index) for score, index in lexical_hits]
+        else:
+            fused: Dict[int, float] = {}
+            for hits in (vector_hits, lexical_hits):
+                for rank, (_, index) in enumerate(hits):
+                    fused[index] = fused.get(index, 0.0) + 1.0 / (self.RRF_K + rank + 1)
+            # 두 순위 모두 1위인 항목이 1.0이 되도록 정규화
+            scale = (self.RRF_K + 1) / 2
+            ranked = sorted(((score * scale, index) for index, score in fused.items()), key=lambda x: x[0], reverse=True)
+
         final_results = []
-        for score, item in scored_results[:limit]:
-            if score > 0.3:
-                if score > 0.5:
-                    item["usage_count"] = item.get("usage_count", 0) + 1
-                final_results.append({
-                    "content": item["content"], 
-                    "metadata": item.get("metadata", {}), 
-                    "score": round(score, 2)
-                })
-            
-        if final_results:
-            self._save_shard(namespace)
+        for score, index in ranked[:limit]:
+            item = shard[index]
+            if similarity.get(index, 0) > 0.5:
+                item["usage_count"] = item.get("usage_count", 0) + 1
+                self._mark_dirty(namespace, item.get("id"))
+            final_results.append({
+                "content": item["content"], 
+                "metadata": item.get("metadata", {}), 
+                "score": round(score, 2)
+            })
         return final_results
 
+
+atexit.register(LongTermMemory.flush_all)
+
 if __name__ == "__main__":
     # 독립 실행 테스트
     ltm = LongTermMemory()